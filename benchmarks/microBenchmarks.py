@@ -0,0 +1,102 @@
+"""
+Micro-benchmarks of the primitives used on the solvers hot paths, run from the root of the repository:
+
+    python -m benchmarks.microBenchmarks --output micro.json
+    python -m benchmarks.microBenchmarks --output micro.json --compare previous.json
+"""
+import argparse
+import numpy as np
+
+from dypro.dypro.utils import sampling, nearestSample
+from dypro.dypro.randomVariable import RandomVariable
+from dypro.dypro.hydroelectricProduction import HydroelectricProduction
+from dypro.dypro.discreteDynamicProblem import DiscreteDynamicProblem
+from dypro.dypro.grid import Grid
+from dypro.dypro.valueStore import ValueStore
+from dypro.dypro.benchmark import measure, writeReport, readReport, compareReports, printComparison
+
+SIZES = [100, 1000, 10000]
+
+class StockProblem(DiscreteDynamicProblem):
+    """
+    Stock from 0 to size-1, buys 0 to size-1 itens per stage to meet a demand of size/2
+    """
+    def __init__(self, size:int):
+        super().__init__(1, inf=np.inf, F=dict(), policy=dict())
+        self.__size = size
+
+    def state(self, k:int) -> np.array:
+        return range(self.__size)
+
+    def decision(self, k:int) -> np.array:
+        return range(self.__size)
+
+    def elementaryCost(self, k:int, state:np.array, decision:np.array) -> float:
+        return 2*decision + state
+
+    def finalStateCost(self, state:np.array) -> float:
+        return 0
+
+    def transitionFunction(self, k:int, state:np.array, decision:np.array) -> np.array:
+        return state + decision - self.__size//2
+
+    def initialState(self) -> np.array:
+        return 0
+
+def hydroelectricPlant() -> HydroelectricProduction:
+    # same plant of HydroelectricProductionProblem
+    return HydroelectricProduction(efficiency=0.88, gravity=10, minReservatoryVolume=12800,
+        maxReservatoryVolume=21200, minTurbineFlow=1400, maxTurbineFlow=7955, maxProductionCapacity=3230,
+        uprightPolinomy=lambda x: (303.04+(0.0015519*x) - (0.17377e-7)*(x**2)),
+        downstreamPolinomy=lambda x: (279.84 +(0.22130e-3)*x))
+
+def cases(sizes:list):
+    """
+    Yields (name, size, function) of each benchmark, each function processes size items
+    """
+    plant = hydroelectricPlant()
+
+    for size in sizes:
+        values = np.linspace(-0.5, size + 0.5, size).tolist()
+        keys = [(1, x) for x in range(size)]
+        FMap = dict.fromkeys(keys, 1.0)
+        store = ValueStore(1, Grid(0, size - 1, 1))
+        volumes = np.linspace(12800, 21200, size).tolist()
+        randomVariable = RandomVariable(list(range(size)), [1/size]*size)
+
+        yield ('sampling', size, lambda: list(sampling(0, size - 1, 1)))
+        yield ('nearestSample', size, lambda: [nearestSample(v, 0, size - 1, 1) for v in values])
+        yield ('randomValueIterator', size, lambda: sum(w.getValue()*w.getProbability() for w in randomVariable.randomValueIterator()))
+        yield ('randomVariableExpectation', size, lambda: randomVariable.expectation(randomVariable.values()))
+        yield ('generatedEnergy', size, lambda: [plant.generatedEnergy(v, 5000) for v in volumes])
+        yield ('generatedEnergyBatch', size, lambda: plant.generatedEnergyBatch(np.asarray(volumes), 5000))
+        yield ('dictFMapLookup', size, lambda: [FMap[key] for key in keys])
+        yield ('storeFMapLookup', size, lambda view=store.accOptimalCost(): [view[key] for key in keys])
+
+    # a stage evaluates size*size decisions, so it has smaller sizes
+    for size in [s//10 for s in sizes if s <= 1000]:
+        yield ('bellmanStage', size, lambda: StockProblem(size).solve())
+
+def run(sizes:list=SIZES, repeat:int=5) -> list:
+    results = list()
+    for name, size, function in cases(sizes):
+        result = dict(name=name, parameters={'size': size}, **measure(function, repeat=repeat))
+        result['perItem'] = result['min']/size
+        results.append(result)
+        print(f"{name:24} size={size:<8} {result['min']:12.3e} sec {result['perItem']:12.3e} sec/item")
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the solvers primitives")
+    parser.add_argument('--output', default='micro.json', help="json report of the results")
+    parser.add_argument('--compare', help="json report of a previous run, to print the speedup of each benchmark")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    arguments = parser.parse_args()
+
+    results = run(arguments.sizes, arguments.repeat)
+    writeReport(arguments.output, results, suite='micro', sizes=arguments.sizes, repeat=arguments.repeat)
+
+    if arguments.compare:
+        printComparison(compareReports(readReport(arguments.compare), readReport(arguments.output)))
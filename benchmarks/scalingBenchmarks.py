@@ -0,0 +1,267 @@
+"""
+Scaling benchmarks of the bundled problems versus grid size and number of workers, run from the root of the repository:
+
+    python -m benchmarks.scalingBenchmarks --output scaling.json
+    python -m benchmarks.scalingBenchmarks --problems hydroelectric --sizes 50 100 --workers 1 2
+
+Each run is solved on its own process, so its peak memory is measured alone, and the runs are also kept on a
+csv file that is resumed if the benchmark is interrupted. The optimal costs are compared with the reference
+costs of benchmarks/referenceCosts.json to catch accuracy regressions, --update-references rewrites them.
+Failed runs are on the report with their error, and the benchmark exits with status 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import numpy as np
+
+from dypro.dypro.discreteDynamicProblem import generatorFromLIst, generatorFromLists
+from dypro.dypro.randomVariable import RandomVariable
+from dypro.dypro.sweep import sweep, readResults, DURATION, PEAK_MEMORY
+from dypro.dypro.benchmark import writeReport, readReport, compareReports, printComparison
+
+from simpleProductionProblem import SimpleProductionProblem
+from delayProducerPlanning import DelayProducerPlanning
+from simpleStochasticProductionProblem import SimpleStochasticDiscreteDynamicProblem
+from hydroelectricProductionProblem import HydroelectricProductionProblem
+from hydroelectricStochasticProductionProblem import HydroelectricStochasticProductionProblem
+from hydroelectricProductionProblem2 import HydroelectricProductionProblem2
+from hydroelectricCascadeProblem import HydroelectricCascadeProblem
+
+SEED = 342
+REFERENCE_COSTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'referenceCosts.json')
+
+def simpleProduction(size:int, workers:int):
+    """
+    size stocks and productions, with random costs and demands
+    """
+    stages = 4
+    rng = np.random.default_rng(SEED)
+    productionCost = np.cumsum(rng.uniform(1, 10, (stages, size)), axis=1)
+    stockCost = rng.uniform(0, 2, stages)
+    demand = rng.integers(0, size//2 + 1, stages)
+
+    dp = SimpleProductionProblem(stages, 0, lambda k: demand[k], lambda k: generatorFromLIst(range(size)),
+        lambda k: generatorFromLIst(range(size)), lambda state: 0, lambda k, decision: productionCost[k, decision],
+        lambda k, state: stockCost[k]*state, F=dict(), policy=dict())
+
+    def solve():
+        dp.solve(workers=workers)
+        return dp.F(0, dp.initialState())
+
+    return (dp, solve, stages, 1)
+
+def delayProducerPlanning(size:int, workers:int):
+    """
+    size stocks and productions, the state also has the last production
+    """
+    stages = 3
+    rng = np.random.default_rng(SEED)
+    productionCost = rng.uniform(1, 10, stages)
+    demand = rng.integers(0, size//2 + 1, stages)
+
+    dp = DelayProducerPlanning(stages, (0, 0), lambda k: demand[k], lambda k: generatorFromLIst(range(size)),
+        lambda k: generatorFromLists(range(size), range(size)), lambda state: 0, lambda k, decision: productionCost[k]*decision,
+        lambda k, state: state[0] if state[0] < size else np.inf, lambda k, state, decision: 2*abs(decision - state[1]),
+        F=dict(), policy=dict())
+
+    def solve():
+        dp.solve(workers=workers)
+        return dp.F(0, dp.initialState())
+
+    return (dp, solve, stages, 1)
+
+def simpleStochastic(size:int, workers:int):
+    """
+    size stocks and productions with a random demand of 3 values. The problem keeps the stock between 0 and 4
+    """
+    stages = 3
+    rng = np.random.default_rng(SEED)
+    demands = [RandomVariable(sorted(rng.integers(0, size, 3).tolist()), (0.2, 0.5, 0.3)) for k in range(stages)]
+    productionCost = rng.uniform(1, 10, stages)
+
+    dp = SimpleStochasticDiscreteDynamicProblem(stages, lambda k: generatorFromLIst(range(size)), lambda k: generatorFromLIst(range(size)),
+        lambda k, decision: productionCost[k]*decision, lambda k, state: -5*state if state < 0 else state, 0,
+        lambda k: demands[k], lambda state: 0, inf=np.inf, F=dict(), policy=dict())
+
+    def solve():
+        dp.solve()
+        return dp.F(0, dp.initialState())
+
+    return (dp, solve, stages, 3)
+
+def hydroelectric(size:int, workers:int):
+    """
+    size volumes of the reservoir
+    """
+    h = HydroelectricProductionProblem(numberOfStages=12, year=2021, maxFlow=10000,
+        stateSampling=(21200 - 12800)/(size - 1), decisionSampling=100, inf=10000)
+
+    def solve():
+        fmap, policy = h.solve(workers=workers)
+        return h.costOfSolution(h.initialState(), fmap)[1]
+
+    return (h, solve, h.numberOfStages, 1)
+
+def hydroelectricVectorized(size:int, workers:int):
+    h, _, _, _ = hydroelectric(size, workers)
+
+    def solve():
+        fmap, policy = h.solveVectorized()
+        return h.costOfSolution(h.initialState(), fmap)[1]
+
+    return (h, solve, h.numberOfStages, 1)
+
+def hydroelectricStochastic(size:int, workers:int):
+    """
+    size volumes of the reservoir, with 5 inflows per stage
+    """
+    h = HydroelectricStochasticProductionProblem(numberOfStages=12, year=2021, maxFlow=15000,
+        stateSampling=(21200 - 12800)/(size - 1), decisionSampling=200, inf=100000)
+
+    def solve():
+        fmap, policy = h.solve(workers=workers)
+        return h.costOfSolution(h.initialState(), fmap)[1]
+
+    return (h, solve, h.numberOfStages, 5)
+
+def hydroelectric2(size:int, workers:int):
+    """
+    About size volumes of each reservoir
+    """
+    h = HydroelectricProductionProblem2(stateSampling=round(8400/(size - 1)), decisionSampling=800, inf=1000000)
+
+    def solve():
+        fmap, policy = h.solveHidro(workers=workers)
+        return h.costOfSolution(h.initialState(), fmap)[1]
+
+    return (h, solve, 12, 1)
+
+def hydroelectricCascade(size:int, workers:int):
+    """
+    About size volumes of each reservoir of the cascade
+    """
+    h = HydroelectricCascadeProblem(stateSampling=(round(6600/(size - 1)), round(8400/(size - 1))), inf=1000000)
+
+    def solve():
+        fmap, policy = h.solve()
+        return h.costOfSolution(h.initialState(), fmap)[1]
+
+    return (h, solve, h.numberOfStages, 1)
+
+# builder, default sizes and if it can be solved by more than 1 worker
+PROBLEMS = {
+    'simpleProduction': (simpleProduction, [50, 100, 200], True),
+    'delayProducerPlanning': (delayProducerPlanning, [5, 10, 20], True),
+    'simpleStochastic': (simpleStochastic, [25, 50, 100], False),
+    'hydroelectric': (hydroelectric, [25, 50, 100], True),
+    'hydroelectricVectorized': (hydroelectricVectorized, [100, 1000, 10000], False),
+    'hydroelectricStochastic': (hydroelectricStochastic, [25, 50, 100], True),
+    'hydroelectric2': (hydroelectric2, [4, 8], True),
+    'hydroelectricCascade': (hydroelectricCascade, [10, 20, 40], False),
+    }
+
+def runCase(problem:str, size:int, workers:int) -> dict:
+    """
+    Solves a problem and returns its cost, the solve time and the number of states and Bellman evaluations
+    """
+    build, _, _ = PROBLEMS[problem]
+    dp, solve, numberOfStages, randomValues = build(size, workers)
+
+    states = sum(len(list(dp.state(k))) for k in range(numberOfStages))
+    evaluations = sum(len(list(dp.state(k)))*len(list(dp.decision(k)))*randomValues for k in range(numberOfStages))
+
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cost = solve()
+    solveTime = time.time() - start
+
+    return {'cost': float(cost), 'states': states, 'evaluations': evaluations, 'solveTime': solveTime,
+            'statesPerSecond': states/solveTime, 'evaluationsPerSecond': evaluations/solveTime}
+
+def _referenceKey(problem, size) -> str:
+    return f"{problem}[size={size}]"
+
+def report(rows:list, references:dict, failed:list=()) -> list:
+    """
+    Converts the csv rows of runCase to the results of the json report, with the error to the reference cost.
+    The failed (configuration, error) are reported with their error and without measures
+    """
+    results = list()
+    for row in rows:
+        result = {'name': row['problem'], 'parameters': {'size': int(row['size']), 'workers': int(row['workers'])}}
+        for key in ['cost', 'solveTime', 'statesPerSecond', 'evaluationsPerSecond', DURATION]:
+            result[key] = float(row[key])
+        for key in ['states', 'evaluations', PEAK_MEMORY]:
+            result[key] = int(row[key]) if row[key] not in ('', None) else None
+
+        reference = references.get(_referenceKey(row['problem'], row['size']))
+        result['referenceCost'] = reference
+        result['costError'] = None if reference is None else abs(result['cost'] - reference)/max(1.0, abs(reference))
+        results.append(result)
+
+    for configuration, error in failed:
+        results.append({'name': configuration['problem'],
+                        'parameters': {'size': configuration['size'], 'workers': configuration['workers']}, 'error': error})
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scaling benchmarks of the bundled problems")
+    parser.add_argument('--output', default='scaling.json', help="json report of the results")
+    parser.add_argument('--results', default='scaling.csv', help="csv of the runs, the runs already on it are not repeated")
+    parser.add_argument('--problems', nargs='+', default=list(PROBLEMS), choices=list(PROBLEMS))
+    parser.add_argument('--sizes', type=int, nargs='+', help="grid sizes, defaults to the sizes of each problem")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--compare', help="json report of a previous run, to print the speedup of each run")
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="relative error of the cost to the reference")
+    parser.add_argument('--update-references', action='store_true', help="saves the costs as the reference costs")
+    arguments = parser.parse_args()
+
+    configurations = list()
+    for problem in arguments.problems:
+        _, sizes, parallel = PROBLEMS[problem]
+        for size in arguments.sizes or sizes:
+            for workers in (arguments.workers if parallel else [1]):
+                configurations.append({'problem': problem, 'size': size, 'workers': workers})
+
+    # one run at a time, so the runs do not compete for the processors
+    failed = list()
+    sweep(runCase, configurations, arguments.results, workers=1, failed=failed)
+
+    keys = {(c['problem'], str(c['size']), str(c['workers'])) for c in configurations}
+    rows = [row for row in readResults(arguments.results) if (row['problem'], row['size'], row['workers']) in keys]
+
+    references = dict()
+    if os.path.exists(REFERENCE_COSTS):
+        with open(REFERENCE_COSTS) as file:
+            references = json.load(file)
+
+    if arguments.update_references:
+        references.update({_referenceKey(row['problem'], row['size']): float(row['cost']) for row in rows})
+        with open(REFERENCE_COSTS, 'w') as file:
+            json.dump(references, file, indent=2, sort_keys=True)
+
+    results = report(rows, references, failed)
+    writeReport(arguments.output, results, suite='scaling', seed=SEED)
+
+    for result in results:
+        if 'error' in result:
+            print(f"{result['name']:24} size={result['parameters']['size']:<6} workers={result['parameters']['workers']:<3} "
+                f"FAILED {result['error']}")
+            continue
+
+        error = result['costError']
+        status = 'no reference' if error is None else ('ok' if error <= arguments.tolerance else 'ACCURACY REGRESSION')
+        print(f"{result['name']:24} size={result['parameters']['size']:<6} workers={result['parameters']['workers']:<3} "
+            f"{result['solveTime']:10.3f} sec {result['statesPerSecond']:12.1f} states/sec {result['evaluationsPerSecond']:12.1f} evaluations/sec "
+            f"{(result[PEAK_MEMORY] or 0)/2**20:8.1f} MiB cost={result['cost']:.6g} {status}")
+
+    if arguments.compare:
+        printComparison(compareReports(readReport(arguments.compare), readReport(arguments.output), key='solveTime'))
+
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import numpy as np
+
+def gitCommit() -> str:
+    """
+    Return the hash of the current git commit, or None if it is not a git repository
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> dict:
+    """
+    Return the versions and the machine that ran the benchmarks, to compare reports of the same machine
+    """
+    return {'commit': gitCommit(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count()}
+
+def measure(function, repeat:int=5, number:int=None) -> dict:
+    """
+    Times a function without arguments with timeit
+
+    Args:
+        function (function): code to be timed
+        repeat (int, optional): number of measures, the minimum is the least noisy. Defaults to 5.
+        number (int, optional): calls of each measure. Defaults to None, that calls it for at least 0.2 sec.
+
+    Returns:
+        dict: min, median and max seconds per call, number and repeat
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+
+    times = [t/number for t in timer.repeat(repeat=repeat, number=number)]
+
+    return {'min': min(times), 'median': statistics.median(times), 'max': max(times), 'number': number, 'repeat': repeat}
+
+def benchmarkName(result:dict) -> str:
+    """
+    Return the name of a result with its parameters, e.g. sampling[size=1000]
+    """
+    parameters = ','.join(f"{key}={value}" for (key, value) in sorted(result.get('parameters', dict()).items()))
+    return f"{result['name']}[{parameters}]"
+
+def writeReport(path:str, results:list, **extra):
+    """
+    Writes the results and the environment as json
+
+    Args:
+        path (str): json file, its directory is created if it does not exist
+        results (list): dicts with name, parameters and the measures of each benchmark
+        extra: other information of the report, e.g. the command line options
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as file:
+        json.dump(dict(extra, environment=environment(), results=results), file, indent=2)
+
+def readReport(path:str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+def compareReports(base:dict, report:dict, key:str='min') -> list:
+    """
+    Compares the benchmarks that are on both reports
+
+    Returns:
+        list: (name, base seconds, seconds, speedup) of each benchmark, speedup < 1 is a regression
+    """
+    baseResults = {benchmarkName(result): result for result in base['results']}
+    comparison = list()
+    for result in report['results']:
+        name = benchmarkName(result)
+        # failed runs have no measures
+        if name in baseResults and key in baseResults[name] and key in result:
+            comparison.append((name, baseResults[name][key], result[key], baseResults[name][key]/result[key]))
+
+    return comparison
+
+def printComparison(comparison:list, file=sys.stdout):
+    for name, baseSeconds, seconds, speedup in comparison:
+        print(f"{name:60} {baseSeconds:12.3e} {seconds:12.3e} {speedup:8.2f}x", file=file)
@@ -0,0 +1,143 @@
+import numpy as np
+
+from .grid import Grid
+from .solve import solve, solveVectorized
+
+def corridorGrids(trajectory:list, minState, maxState, period, corridorWidth:int) -> list:
+    """
+    Grids of each stage around a trajectory, with corridorWidth samples of size period on each
+    side of the state, limited to [min, max]. Stage 0 only has the first state of the trajectory.
+
+    Args:
+        trajectory (list): state of each stage, from 0 to numberOfStages
+        minState, maxState: bounds of the state
+        period: step of the grid, a scalar or a tuple for tuple states
+        corridorWidth (int): number of samples on each side of the trajectory
+
+    Returns:
+        list: Grid of each stage
+    """
+    toState = (lambda a: a.item()) if np.ndim(minState) == 0 else (lambda a: tuple(a.tolist()))
+    period = np.broadcast_to(period, np.shape(minState))
+
+    # the first state is the initial state, that may not be on the steps of period
+    grids = [Grid(trajectory[0], trajectory[0], toState(period))]
+    for state in trajectory[1:]:
+        low = np.maximum(np.asarray(state) - corridorWidth*period, minState)
+        high = np.minimum(np.asarray(state) + corridorWidth*period, maxState)
+        grids.append(Grid(toState(low), toState(high), toState(period)))
+
+    return grids
+
+def _trajectory(grids:list, policy, transitionFunction, vectorized:bool):
+    """
+    Optimal trajectory from the state of stage 0, snapping each next state to the grid of its stage
+    """
+    states = [grids[0].state(0)]
+    decisions = list()
+    for k in range(len(grids) - 1):
+        decision = policy[k, states[-1]]
+        if decision is None:
+            return (None, None)
+
+        nextState = transitionFunction(k, np.asarray(states[-1]), np.asarray(decision)) if vectorized else transitionFunction(k, states[-1], decision)
+        index, feasible = grids[k+1].snap(nextState)
+        if not feasible:
+            return (None, None)
+
+        decisions.append(decision)
+        states.append(grids[k+1].state(int(index)))
+
+    return (states, decisions)
+
+def solveCorridor(numberOfStages:int, minState, maxState, periods:list, initialState, finalStateCost, decision, transitionFunction,
+                    elementaryCost, corridorWidth:int=5, tolerance:float=1e-6, maxIterations:int=20, vectorized:bool=False, inf=np.inf):
+    """ Discrete differential dynamic programming. Solves the problem on a coarse grid, then solves it
+    again on grids restricted to a corridor around the optimal trajectory, refining the step of the
+    grid with periods, until the optimal cost converges on the finest step.
+
+    Parameters
+
+    numberOfStages : int
+            Number of stages
+
+    minState, maxState : scalar or tuple
+            Bounds of the state, next states outside of them are infeasible
+
+    periods : list
+            Steps of the grid from coarse to fine, scalars or tuples. The first one is solved on all the bounds
+
+    initialState : scalar or tuple
+            It does not need to be on the steps of periods, the cost of stage 0 is of this state
+
+    finalStateCost, decision, transitionFunction, elementaryCost : function
+            Callbacks of solve, or of solveVectorized if vectorized is True
+
+    corridorWidth : int
+            Number of samples on each side of the trajectory, it is doubled when the corridor has no feasible trajectory
+
+    tolerance : float
+            Relative change of the optimal cost that stops the refinement on the finest step
+
+    maxIterations : int
+
+    vectorized : bool
+            If the callbacks work with arrays, to solve with solveVectorized
+
+    inf : float
+
+    Returns:
+        [(Map of costs : dict, policy : dict, history : list)]: solution of the last feasible iteration, and
+        the history of iterations as dicts with period, cost, trajectory and decisions, that are None when
+        the iteration has no feasible trajectory
+    """
+    # stage 0 only has the initial state as given, on all the iterations, so the cost is of the initial state
+    # and not of its nearest sample on the coarse grid. The first iteration covers all the state space
+    grids = [Grid(initialState, initialState, periods[0])] + [Grid(minState, maxState, periods[0])]*numberOfStages
+    history = list()
+    solution = None
+
+    for iteration in range(maxIterations):
+        period = periods[min(iteration, len(periods) - 1)]
+        if solution is not None:
+            grids = corridorGrids(solution[2], minState, maxState, period, corridorWidth)
+
+        FMap, policy = _solveOnGrids(grids, numberOfStages, finalStateCost, decision, transitionFunction, elementaryCost, vectorized, inf)
+        trajectory, decisions = _trajectory(grids, policy, transitionFunction, vectorized)
+        cost = FMap[0, grids[0].state(0)]
+        history.append({'period': period, 'cost': cost, 'trajectory': trajectory, 'decisions': decisions})
+
+        if trajectory is None:
+            # the corridor may be too narrow to reach the feasible final states, it is widened
+            # until it covers all the state space
+            if solution is None or np.all(corridorWidth*np.asarray(period) >= np.asarray(maxState) - np.asarray(minState)):
+                break
+            corridorWidth = max(1, 2*corridorWidth)
+            continue
+
+        previousCost = solution[3] if solution is not None else None
+        solution = (FMap, policy, trajectory, cost)
+
+        finest = iteration >= len(periods) - 1
+        if finest and previousCost is not None and abs(previousCost - cost) <= tolerance*abs(cost):
+            break
+
+    if solution is None:
+        return (FMap, policy, history)
+
+    return (solution[0], solution[1], history)
+
+def _solveOnGrids(grids, numberOfStages, finalStateCost, decision, transitionFunction, elementaryCost, vectorized, inf):
+    if vectorized:
+        return solveVectorized(lambda k: grids[k], numberOfStages, finalStateCost, decision, transitionFunction, elementaryCost, inf=inf)
+
+    def solveInfeasibility(k, state, FMap):
+        index, feasible = grids[k].snap(state)
+        if not feasible:
+            return (state, inf)
+
+        sampledState = grids[k].state(int(index))
+        return (sampledState, FMap[k, sampledState])
+
+    return solve(lambda k: grids[k].states(), numberOfStages, finalStateCost, decision, solveInfeasibility,
+        transitionFunction, elementaryCost, inf=inf)
@@ -1,17 +1,26 @@
 import abc
+import functools
 import logging
 import numpy as np
 
+from .parallel import parallelStage
+from .instrumentation import Instrumentation, StageCounters
+
 logging.basicConfig(level=logging.ERROR)
 
 class DiscreteDynamicProblem(metaclass=abc.ABCMeta):
     
-    def __init__(self, numberOfStages:int, inf=np.inf, F=dict(), policy=dict()):
+    def __init__(self, numberOfStages:int, inf=np.inf, F=dict(), policy=dict(), store=None):
         self.__numberOfStages = numberOfStages
         self.__inf = inf
         self.__F = F # accumulated optimal cost
         self.__policy = policy # best decision on stage k, state u_k
 
+        if store is not None:
+            # array backed views, states must be on the grids of the store
+            self.__F = store.accOptimalCost()
+            self.__policy = store.allPolicy()
+
     def inf(self):
         """
         Return the used infinite value
@@ -28,11 +37,7 @@ class DiscreteDynamicProblem(metaclass=abc.ABCMeta):
         Returns:
             float: the accumulated optimal cost
         """
-        if (k, state) in self.__F:
-            return self.__F[k, state]
-        else:
-            self.__F[k, state] = self.inf()
-            return self.inf()
+        return self.__F.get((k, state), self.inf())
     
     def policy(self, k:int, state:np.array) -> np.array:
         """
@@ -134,27 +139,75 @@ class DiscreteDynamicProblem(metaclass=abc.ABCMeta):
         """
         pass
 
-    def solve(self):
+    def solve(self, workers:int=1, instrumentation:Instrumentation=None):
         """
         Solves the optimality recursive equation using a backward strategy
+
+        Args:
+            workers (int, optional): number of processes that solve the states of each stage. Defaults to 1.
+            instrumentation (Instrumentation, optional): receives the metrics of each stage. With workers > 1
+                the counters and the time of the callbacks of the workers are not collected. Defaults to None.
         """
-        for xk in self.state(self.numberOfStages()):
-            self.__F[self.numberOfStages(), xk] = self.finalStateCost(xk)
+        counters = None
+        state, finalStateCost = (self.state, self.finalStateCost)
+        if instrumentation is not None:
+            counters = StageCounters(instrumentation, type(self).__name__, self.numberOfStages())
+            state, finalStateCost = (counters.timed(state), counters.timed(finalStateCost))
+        collected = workers <= 1
+
+        for xk in state(self.numberOfStages()):
+            self.__F[self.numberOfStages(), xk] = finalStateCost(xk)
         
         for k in self.__stagesGenerator(): #n-1 to 0
-            for xk in self.state(k):
-                F_aux = self.inf()
-                u_aux = None
-                # Calculates the best decision on stage k and state uk
-                for uk in self.decision(k):
-                    xk_next = self.transitionFunction(k, xk, uk)
-                    F_aux_uk = self.elementaryCost(k, xk, uk) + self.F(k+1, xk_next)
-
-                    if F_aux > F_aux_uk:
-                        F_aux = F_aux_uk
-                        u_aux = uk
+            states = list(state(k))
+            if counters is not None and collected:
+                results = [self.bestDecision(k, xk, counters) for xk in states]
+            else:
+                results = parallelStage(functools.partial(self.bestDecision, k), states, workers)
+
+            for xk, (F_aux, u_aux) in zip(states, results):
                 self.__F[k, xk] = F_aux
                 self.__policy[k, xk] = u_aux
+
+            if counters is not None:
+                counters.stageSolved(k, len(states), len(list(self.decision(k))), collected=collected)
+
+        if counters is not None:
+            counters.solveFinished()
+
+    def bestDecision(self, k:int, xk:np.array, counters:StageCounters=None):
+        """
+        Calculates the best decision on stage k and state xk, given the costs of stage k+1
+
+        Args:
+            counters (StageCounters, optional): counts the evaluations, the infeasible transitions and the time of the callbacks
+
+        Returns:
+            (float, np.array): accumulated optimal cost and decision
+        """
+        decision, transitionFunction, elementaryCost = (self.decision, self.transitionFunction, self.elementaryCost)
+        if counters is not None:
+            decision, elementaryCost = (counters.timed(decision), counters.timed(elementaryCost))
+            transitionFunction = counters.timed(transitionFunction, 'evaluations')
+
+        F_aux = self.inf()
+        u_aux = None
+        for uk in decision(k):
+            xk_next = transitionFunction(k, xk, uk)
+            F_next = self.F(k+1, xk_next)
+            # a next state without a finite cost-to-go can't be optimal, its elementary cost is not evaluated
+            if F_next >= self.inf():
+                if counters is not None:
+                    counters.counts['infeasibleTransitions'] += 1
+                continue
+
+            F_aux_uk = elementaryCost(k, xk, uk) + F_next
+
+            if F_aux > F_aux_uk:
+                F_aux = F_aux_uk
+                u_aux = uk
+
+        return (F_aux, u_aux)
     
     def optimalTrajectory(self, initialState:np.array):
         """
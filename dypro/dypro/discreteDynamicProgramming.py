@@ -77,6 +77,67 @@ class DiscreteDynamicProgramming(metaclass=abc.ABCMeta):
         """
         pass
 
+    def elementaryCostBatch(self, k:int, states:np.array, decisions:np.array) -> np.array:
+        """
+        Calculate the elementary costs of arrays of states and decisions that broadcast to (states, decisions):
+        states have shape (S, 1) and decisions (1, D), the components of tuple states or decisions are on the last axis.
+        Problems override it with numpy to solve a stage without a python call per pair, the default calls elementaryCost.
+
+        Args:
+            k (int): current stage
+            states (np.array): states of shape (S, 1)
+            decisions (np.array): decisions of shape (1, D)
+
+        Returns:
+            np.array: costs that broadcast to (S, D)
+        """
+        return _scalarBatch(self.elementaryCost, k, states, decisions)
+
+    def transitionBatch(self, k:int, states:np.array, decisions:np.array) -> np.array:
+        """
+        Calculate the next states of arrays of states and decisions, with the shapes of elementaryCostBatch.
+        The default calls transitionFunction.
+
+        Returns:
+            np.array: next states of shape (S, D), or (S, D, n) for tuple states
+        """
+        return _scalarBatch(self.transitionFunction, k, states, decisions)
+
+    def finalStateCostBatch(self, states:np.array) -> np.array:
+        """
+        Calculate the cost of an array of final states, of shape (S,) or (S, n) for tuple states.
+        The default calls finalStateCost.
+
+        Returns:
+            np.array: costs of shape (S,)
+        """
+        states = np.asarray(states)
+        return np.array([self.finalStateCost(x) for x in _toValues(states, 1)], dtype=float)
+
+    def decisionBounds(self, k:int, state:np.array):
+        """
+        Calculate the (low, high) decisions of a state, componentwise for tuple decisions, so the solvers only
+        evaluate the decisions between them, e.g. the flows that keep a reservoir between its volumes. It may be
+        called with a state or with an array of states of shape (S, 1), as on elementaryCostBatch.
+        The default returns None, all the decisions of the stage.
+
+        Args:
+            k (int): stage
+            state (np.array): state of stage k
+
+        Returns:
+            (np.array, np.array): low and high decisions, or None
+        """
+        return None
+
+    def batchCallbacks(self) -> dict:
+        """
+        Return the batch callbacks overridden by the problem, as keyword arguments of solve.solve,
+        that calls the scalar callbacks of the others
+        """
+        return {name: getattr(self, name) for name in ['elementaryCostBatch', 'transitionBatch']
+                if getattr(type(self), name) is not getattr(DiscreteDynamicProgramming, name)}
+
     @abc.abstractmethod
     def initialState(self) -> np.array:
         """
@@ -85,4 +146,26 @@ class DiscreteDynamicProgramming(metaclass=abc.ABCMeta):
         Returns:
             np.array: initial state
         """
-        pass
\ No newline at end of file
+        pass
+
+def _toValues(array:np.array, ndim:int) -> list:
+    """
+    Converts an array to nested lists of python values, where the components of the last axis are tuples
+    if the array has more than ndim axes
+    """
+    def toTuples(values, depth):
+        return tuple(values) if depth == 0 else [toTuples(v, depth - 1) for v in values]
+
+    return array.tolist() if array.ndim == ndim else toTuples(array.tolist(), ndim)
+
+def _scalarBatch(function, k:int, states:np.array, decisions:np.array) -> np.array:
+    """
+    Calls a scalar callback of (k, state, decision) for each pair of the arrays of a batch callback
+    """
+    states, decisions = (np.asarray(states), np.asarray(decisions))
+    shape = np.broadcast_shapes(states.shape[:2], decisions.shape[:2])
+    states = _toValues(np.broadcast_to(states, shape + states.shape[2:]), 2)
+    decisions = _toValues(np.broadcast_to(decisions, shape + decisions.shape[2:]), 2)
+
+    return np.array([[function(k, xk, uk) for (xk, uk) in zip(rowStates, rowDecisions)]
+                     for (rowStates, rowDecisions) in zip(states, decisions)])
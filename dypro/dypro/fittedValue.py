@@ -0,0 +1,224 @@
+import itertools
+import logging
+import time
+import numpy as np
+
+from .solve import _vectorizedStage
+
+class PolynomialBasis:
+    """
+    Monomials of the states up to a total degree, on the states scaled to [-1, 1] inside of the bounds
+    """
+
+    def __init__(self, low, high, degree:int=2):
+        self.__low = np.atleast_1d(np.asarray(low, dtype=float))
+        self.__width = np.atleast_1d(np.asarray(high, dtype=float)) - self.__low
+        self.__width[self.__width == 0] = 1.0
+        self.__exponents = [list(c) for d in range(degree + 1)
+                            for c in itertools.combinations_with_replacement(range(len(self.__low)), d)]
+
+    def size(self) -> int:
+        return len(self.__exponents)
+
+    def __call__(self, points:np.array) -> np.array:
+        """
+        Return the features of the points of shape (..., ndim), with shape (..., size)
+        """
+        z = 2*(points - self.__low)/self.__width - 1
+
+        return np.stack([np.prod(z[..., c], axis=-1) for c in self.__exponents], axis=-1)
+
+class RadialBasis:
+    """
+    Gaussians centered on points sampled inside of the bounds, plus an affine term that extrapolates
+    """
+
+    def __init__(self, low, high, centers:int=50, width:float=None, seed=None):
+        self.__low = np.atleast_1d(np.asarray(low, dtype=float))
+        self.__width = np.atleast_1d(np.asarray(high, dtype=float)) - self.__low
+        self.__width[self.__width == 0] = 1.0
+
+        n = len(self.__low)
+        self.__centers = np.random.default_rng(seed).uniform(-1, 1, (centers, n))
+        # mean distance between the centers on the scaled states
+        self.__sigma = 2*centers**(-1/n) if width is None else width
+
+    def size(self) -> int:
+        return 1 + len(self.__low) + len(self.__centers)
+
+    def __call__(self, points:np.array) -> np.array:
+        """
+        Return the features of the points of shape (..., ndim), with shape (..., size)
+        """
+        z = 2*(points - self.__low)/self.__width - 1
+        distances = np.sum((z[..., np.newaxis, :] - self.__centers)**2, axis=-1)
+
+        return np.concatenate([np.ones(z.shape[:-1] + (1,)), z, np.exp(-distances/(2*self.__sigma**2))], axis=-1)
+
+class FittedValue:
+    """
+    Fitted value iteration: an approximate dynamic programming for states of many dimensions, whose grids
+    would have too many states. The cost-to-go of each stage is a linear combination of a basis of functions of the
+    state, fitted by least squares to the Bellman targets of states sampled inside of the bounds of the stage.
+    So the cost grows with the number of samples instead of the size of the grid, and the result is an
+    approximation, whose error depends on how well the basis fits the cost-to-go.
+
+    The callbacks are the same of solveVectorized, that work on arrays of states (S, 1) and decisions (1, D),
+    with the components on the last axis for tuple states or decisions. Next states outside of the bounds are
+    infeasible. Sampled states without a feasible decision are left out of the fit, and the fitted cost is finite
+    on the whole bounds, so it is better to penalize the infeasible states with a finite cost.
+    """
+
+    def __init__(self, stateBounds, numberOfStages:int, finalStateCost, decision, transitionFunction, elementaryCost,
+                    samples:int=1000, basis=PolynomialBasis, inf=np.inf, chunkSize:int=2**22, decisionBounds=None,
+                    stateSampler=None, seed=None):
+        """
+        Args:
+            stateBounds (function of k): (low, high) states of stage k, scalars or tuples
+            numberOfStages (int): number of stages
+            finalStateCost (function of states): cost of an array of final states, that is not fitted
+            decision (function of k): all possible decisions of the stage
+            transitionFunction (function of (k, states, decisions)): array of next states
+            elementaryCost (function of (k, states, decisions)): array of costs of the decisions on the states
+            samples (int, optional): number of sampled states of each stage. Defaults to 1000.
+            basis (function of (low, high), optional): returns the basis of a stage from its bounds, e.g.
+                functools.partial(RadialBasis, centers=100). Defaults to PolynomialBasis of degree 2.
+            inf (float, optional): cost of the infeasible states. Defaults to np.inf.
+            chunkSize (int, optional): maximum number of (state, decision) pairs evaluated at once. Defaults to 2**22.
+            decisionBounds (function of (k, states), optional): (low, high) decisions of the states, as on solveVectorized
+            stateSampler (function of (k, samples, rng), optional): returns the sampled states of stage k, e.g.
+                around the trajectories of a policy. Defaults to uniform states inside of the bounds.
+            seed (optional): seed of the sampled states
+        """
+        self.__numberOfStages = numberOfStages
+        self.__finalStateCost = finalStateCost
+        self.__decision = decision
+        self.__transitionFunction = transitionFunction
+        self.__elementaryCost = elementaryCost
+        self.__samples = samples
+        self.__inf = inf
+        self.__chunkSize = chunkSize
+        self.__decisionBounds = decisionBounds
+        self.__stateSampler = stateSampler
+        self.__rng = np.random.default_rng(seed)
+
+        self.__bounds = [stateBounds(k) for k in range(numberOfStages + 1)]
+        self.__isScalar = np.ndim(self.__bounds[0][0]) == 0
+        self.__bases = [basis(low, high) for (low, high) in self.__bounds[:-1]]
+        self.__coefficients = [None]*numberOfStages
+        self.__history = list()
+
+    def __points(self, states) -> np.array:
+        """
+        Return the states with the components on the last axis, also for scalar states
+        """
+        points = np.asarray(states, dtype=float)
+
+        return points[..., np.newaxis] if self.__isScalar else points
+
+    def __sample(self, k:int) -> np.array:
+        if self.__stateSampler is not None:
+            return np.asarray(self.__stateSampler(k, self.__samples, self.__rng), dtype=float)
+
+        low, high = (np.atleast_1d(np.asarray(b, dtype=float)) for b in self.__bounds[k])
+        states = self.__rng.uniform(low, high, (self.__samples, len(low)))
+
+        return states[:, 0] if self.__isScalar else states
+
+    def values(self, k:int, states:np.array) -> np.array:
+        """
+        Return the fitted cost-to-go of an array of states of stage k, the final cost on k = numberOfStages
+        and inf on the states outside of the bounds
+        """
+        points = self.__points(states)
+        low, high = self.__bounds[k]
+        inside = np.all((points >= np.asarray(low, dtype=float)) & (points <= np.asarray(high, dtype=float)), axis=-1)
+        if k == self.__numberOfStages:
+            return np.where(inside, self.__finalStateCost(states), self.__inf)
+        if self.__coefficients[k] is None:
+            return np.full(inside.shape, self.__inf, dtype=float)
+
+        return np.where(inside, self.__bases[k](points) @ self.__coefficients[k], self.__inf)
+
+    def solve(self) -> list:
+        """
+        Fits the cost-to-go of the stages backward, from numberOfStages-1 to 0
+
+        Returns:
+            list: history()
+        """
+        for k in range(self.__numberOfStages-1, -1, -1):
+            start_time = time.time()
+
+            states = self.__sample(k)
+            decisions = np.asarray(list(self.__decision(k)))
+            nextCost = lambda block, X, U: self.values(k+1, self.__transitionFunction(k, X, U))
+            F, _ = _vectorizedStage(k, states, decisions, nextCost, self.__elementaryCost, self.__inf, self.__chunkSize,
+                self.__decisionBounds)
+
+            feasible = F < self.__inf
+            rmse = None
+            if np.any(feasible):
+                features = self.__bases[k](self.__points(states[feasible]))
+                self.__coefficients[k] = np.linalg.lstsq(features, F[feasible], rcond=None)[0]
+                rmse = float(np.sqrt(np.mean((features @ self.__coefficients[k] - F[feasible])**2)))
+
+            self.__history.insert(0, {'stage': k, 'samples': len(states), 'feasible': int(np.count_nonzero(feasible)),
+                                      'rmse': rmse, 'time': time.time() - start_time})
+            logging.info(f"Stage {k} fitted on {self.__history[0]['feasible']} states with rmse {rmse}, "
+                         f"elapsed {self.__history[0]['time']} sec")
+
+        return self.history()
+
+    def history(self) -> list:
+        """
+        Return the dicts of the fitted stages, from stage 0, with the number of samples, of feasible samples,
+        the root mean square error of the fit on them and the time of the stage
+        """
+        return [dict(h) for h in self.__history]
+
+    def coefficients(self, k:int) -> np.array:
+        return self.__coefficients[k]
+
+    def F(self, k:int, state) -> float:
+        """
+        Returns the fitted accumulated optimal cost of stage k and state, as on DiscreteDynamicProblem
+        """
+        return float(self.values(k, np.asarray(state, dtype=float)))
+
+    def policy(self, k:int, state):
+        """
+        Return the best decision of stage k on the state, given the fitted cost of stage k+1, None if there is
+        no feasible decision. The state doesn't need to be a sampled one
+        """
+        decisions = np.asarray(list(self.__decision(k)))
+        nextCost = lambda block, X, U: self.values(k+1, self.__transitionFunction(k, X, U))
+        _, best = _vectorizedStage(k, np.asarray([state], dtype=float), decisions, nextCost, self.__elementaryCost,
+            self.__inf, self.__chunkSize, self.__decisionBounds)
+
+        if best[0] < 0:
+            return None
+        decision = decisions[best[0]].tolist()
+        return decision if decisions.ndim == 1 else tuple(decision)
+
+    def optimalTrajectory(self, initialState):
+        """
+        Simulates the policy from the initial state, until the last stage or a state without a feasible decision
+
+        Returns:
+            u_optimal: states of the trajectory
+            policy_optimal: decisions of the trajectory
+        """
+        u_optimal = [initialState]
+        policy_optimal = list()
+        for k in range(self.__numberOfStages):
+            decision = self.policy(k, u_optimal[-1])
+            if decision is None:
+                break
+
+            policy_optimal.append(decision)
+            nextState = np.asarray(self.__transitionFunction(k, np.asarray(u_optimal[-1], dtype=float),
+                np.asarray(decision, dtype=float))).tolist()
+            u_optimal.append(nextState if self.__isScalar else tuple(nextState))
+
+        return (u_optimal, policy_optimal, )
@@ -0,0 +1,213 @@
+import numpy as np
+
+
+class Grid:
+    """
+    Regular grid of states, one axis per dimension. Each axis has the same samples
+    produced by utils.sampling and snaps values the same way utils.nearestSample does
+    """
+
+    def __init__(self, min, max, period=1):
+        self.__min = np.atleast_1d(min)
+        self.__max = np.atleast_1d(max)
+        self.__period = np.broadcast_to(np.atleast_1d(period), self.__min.shape)
+        self.__isScalar = np.ndim(min) == 0
+
+        if self.__min.shape != self.__max.shape:
+            raise Exception("Number of minimums is not equal maximums")
+
+        self.__axes = [self.__buildAxis(a, b, p) for (a, b, p) in zip(self.__min, self.__max, self.__period)]
+        self.__shape = tuple(len(axis) for axis in self.__axes)
+
+        self.__scalarMin = self.__min[0].item()
+        self.__scalarPeriod = self.__period[0].item()
+        self.__scalarSize = self.__shape[0]
+        self.__scalarAxis = self.__axes[0].tolist()
+
+    @staticmethod
+    def __buildAxis(min, max, period):
+        """
+        Same values of utils.sampling(min, max, period), keeping integers when possible
+        """
+        count = int(np.ceil((max - min)/period)) + 1
+        axis = np.minimum(min + period*np.arange(count), max)
+
+        if all(float(v).is_integer() for v in (min, max, period)):
+            axis = axis.astype(np.int64)
+
+        return axis
+
+    def ndim(self) -> int:
+        """
+        Return the number of dimensions of the state
+        """
+        return len(self.__axes)
+
+    def isScalar(self) -> bool:
+        """
+        Return True if the states are scalars instead of tuples
+        """
+        return self.__isScalar
+
+    def shape(self) -> tuple:
+        """
+        Return the number of samples of each axis
+        """
+        return self.__shape
+
+    def size(self) -> int:
+        """
+        Return the total number of states of the grid
+        """
+        return int(np.prod(self.__shape))
+
+    def min(self) -> np.array:
+        return self.__min
+
+    def max(self) -> np.array:
+        return self.__max
+
+    def period(self) -> np.array:
+        return self.__period
+
+    def axis(self, i:int=0) -> np.array:
+        """
+        Return the samples of the i-th axis
+        """
+        return self.__axes[i]
+
+    def points(self) -> np.array:
+        """
+        Return all the states of the grid in row-major order
+
+        Returns:
+            np.array: shape (size,) for scalar states or (size, ndim) for tuples
+        """
+        if self.__isScalar:
+            return self.__axes[0]
+
+        mesh = np.meshgrid(*self.__axes, indexing='ij')
+        return np.stack([m.ravel() for m in mesh], axis=-1)
+
+    def states(self) -> list:
+        """
+        Return all the states of the grid as python scalars or tuples, as used on FMap keys
+        """
+        points = self.points().tolist()
+
+        return points if self.__isScalar else [tuple(p) for p in points]
+
+    def snap(self, points:np.array):
+        """
+        Vectorized version of nearestSample for all axes
+
+        Args:
+            points (np.array): shape (...) for scalar states or (..., ndim) for tuples
+
+        Returns:
+            index: flat index of the nearest state on the grid
+            feasible: False where the point is outside of [min, max] on some axis
+        """
+        points = np.asarray(points, dtype=float)
+        if self.__isScalar:
+            points = points[..., np.newaxis]
+
+        feasible = np.all((points >= self.__min) & (points <= self.__max), axis=-1)
+
+        axesIndex = np.rint((points - self.__min)/self.__period).astype(np.int64)
+        axesIndex = np.clip(axesIndex, 0, np.array(self.__shape) - 1)
+
+        index = np.ravel_multi_index(tuple(np.moveaxis(axesIndex, -1, 0)), self.__shape)
+
+        return (index, feasible)
+
+    def interpolate(self, values:np.array, points:np.array, inf=np.inf):
+        """
+        Linear interpolation of the values of the states on points, multilinear for tuple states
+        (bilinear with 2 axes). Points outside of [min, max] on some axis are infeasible.
+
+        Args:
+            values (np.array): value of each state of the grid, in the order of points()
+            points (np.array): shape (...) for scalar states or (..., ndim) for tuples
+            inf (float, optional): value of the infeasible points. Defaults to np.inf.
+
+        Returns:
+            np.array: interpolated values of shape (...), inf if a state used by the interpolation is inf or more
+        """
+        points = np.asarray(points, dtype=float)
+        if self.__isScalar:
+            points = points[..., np.newaxis]
+        values = np.asarray(values, dtype=float).reshape(self.__shape)
+
+        feasible = np.all((points >= self.__min) & (points <= self.__max), axis=-1)
+
+        lower = list()
+        weight = list()
+        for i, axis in enumerate(self.__axes):
+            if len(axis) == 1:
+                lower.append(np.zeros(points.shape[:-1], dtype=np.int64))
+                weight.append(np.zeros(points.shape[:-1]))
+                continue
+
+            # the last cell may be shorter, since sampling clips the axis on max
+            j = np.clip(np.floor((points[..., i] - self.__min[i])/self.__period[i]).astype(np.int64), 0, len(axis) - 2)
+            lower.append(j)
+            weight.append(np.clip((points[..., i] - axis[j])/(axis[j+1] - axis[j]), 0, 1))
+
+        interpolated = np.zeros(points.shape[:-1])
+        for corner in np.ndindex(*(2,)*len(self.__axes)):
+            cornerWeight = np.ones(points.shape[:-1])
+            for i, c in enumerate(corner):
+                cornerWeight = cornerWeight*(weight[i] if c else 1 - weight[i])
+            cornerIndex = tuple(np.minimum(j + c, len(axis) - 1) for (j, c, axis) in zip(lower, corner, self.__axes))
+            # corners without weight are skipped, a single infeasible corner makes the point infeasible
+            cornerValue = np.where(cornerWeight > 0, values[cornerIndex], 0)
+            feasible = feasible & (cornerValue < inf)
+            interpolated = interpolated + cornerWeight*cornerValue
+
+        return np.where(feasible, interpolated, inf)
+
+    def index(self, state) -> int:
+        """
+        Return the flat index of a state that lies on the grid, or -1 if it does not
+        """
+        if self.__isScalar and np.ndim(state) == 0:
+            # plain python arithmetic, it is called once per lookup of the solvers
+            i = round((state - self.__scalarMin)/self.__scalarPeriod)
+            if i < 0 or i >= self.__scalarSize or abs(self.__scalarAxis[i] - state) > 1e-9 + 1e-12*abs(state):
+                return -1
+            return i
+
+        point = np.atleast_1d(np.asarray(state, dtype=float))
+        if point.shape != self.__min.shape:
+            return -1
+
+        axesIndex = np.rint((point - self.__min)/self.__period).astype(np.int64)
+        for i, axis in enumerate(self.__axes):
+            if axesIndex[i] < 0 or axesIndex[i] >= len(axis):
+                return -1
+            if not np.isclose(axis[axesIndex[i]], point[i], rtol=1e-12, atol=1e-9):
+                return -1
+
+        return int(np.ravel_multi_index(tuple(axesIndex), self.__shape))
+
+    def state(self, index:int):
+        """
+        Return the state of a flat index as python scalar or tuple
+        """
+        axesIndex = np.unravel_index(index, self.__shape)
+        values = tuple(axis[i].item() for (axis, i) in zip(self.__axes, axesIndex))
+
+        return values[0] if self.__isScalar else values
+
+    def __eq__(self, other):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.__isScalar == other.isScalar() and np.array_equal(self.__min, other.min())
+                and np.array_equal(self.__max, other.max()) and np.array_equal(self.__period, other.period()))
+
+    def __hash__(self):
+        return hash((self.__isScalar, tuple(self.__min.tolist()), tuple(self.__max.tolist()), tuple(self.__period.tolist())))
+
+    def __repr__(self):
+        return f"Grid(min={self.__min.tolist()}, max={self.__max.tolist()}, period={self.__period.tolist()})"
@@ -0,0 +1,145 @@
+import numpy as np
+
+from .grid import Grid
+from .hydroelectricProduction import HydroelectricProduction
+
+class HydroelectricCascade:
+    """
+    Plants on a river, where the release of each plant flows into the reservoir of the plant downstream of it.
+    Volumes and releases are arrays with one component per plant on the last axis, so all the states and
+    decisions of a stage are routed at once, e.g. volumes (S, 1, n) and releases (1, D, n) as on solveVectorized.
+    """
+
+    def __init__(self, plants:list, downstream:list, incrementalInflow, secondsOfStage):
+        """
+        Args:
+            plants (list): HydroelectricProduction of each plant
+            downstream (list): index of the plant that receives the release of each plant, None at the end of the river
+            incrementalInflow (function of k): natural inflow of each plant that does not come from the plants upstream [m^3/s]
+            secondsOfStage (function of k): duration of the stage
+        """
+        if len(plants) != len(downstream):
+            raise Exception("Number of plants is not equal downstream plants")
+
+        self.__plants = list(plants)
+        self.__downstream = list(downstream)
+        self.__incrementalInflow = incrementalInflow
+        self.__secondsOfStage = secondsOfStage
+        self.__order = self.__topologicalOrder()
+
+        # routing[i, j] is 1 if the release of plant i flows into plant j
+        self.__routing = np.zeros((len(plants), len(plants)))
+        for i, j in enumerate(self.__downstream):
+            if j is not None:
+                self.__routing[i, j] = 1
+
+        self.__capacity = np.array([plant.maxProductionCapacity() for plant in self.__plants], dtype=float)
+
+    def __topologicalOrder(self) -> list:
+        """
+        Return the indexes of the plants from upstream to downstream
+        """
+        upstream = {i: [j for (j, d) in enumerate(self.__downstream) if d == i] for i in range(len(self.__plants))}
+        for j in self.__downstream:
+            if j is not None and not 0 <= j < len(self.__plants):
+                raise Exception(f"Unknown downstream plant {j}")
+
+        order = list()
+        pending = [i for i in upstream if not upstream[i]]
+        while pending:
+            i = pending.pop(0)
+            order.append(i)
+            j = self.__downstream[i]
+            if j is not None and all(u in order for u in upstream[j]):
+                pending.append(j)
+
+        if len(order) != len(self.__plants):
+            raise Exception("The topology of the cascade has a cycle")
+
+        return order
+
+    def numberOfPlants(self) -> int:
+        return len(self.__plants)
+
+    def plant(self, i:int) -> HydroelectricProduction:
+        return self.__plants[i]
+
+    def downstream(self, i:int) -> int:
+        return self.__downstream[i]
+
+    def order(self) -> list:
+        """
+        Return the indexes of the plants from upstream to downstream
+        """
+        return list(self.__order)
+
+    def minVolumes(self) -> tuple:
+        return tuple(plant.minReservatoryVolume() for plant in self.__plants)
+
+    def maxVolumes(self) -> tuple:
+        return tuple(plant.maxReservatoryVolume() for plant in self.__plants)
+
+    def maxProductionCapacity(self) -> float:
+        return float(self.__capacity.sum())
+
+    def stateGrid(self, period) -> Grid:
+        """
+        Return the Grid of the volumes of all reservoirs, period is the sampling of each reservoir
+        """
+        return Grid(self.minVolumes(), self.maxVolumes(), period)
+
+    def secondsOfStage(self, k:int) -> float:
+        return self.__secondsOfStage(k)
+
+    def incrementalInflow(self, k:int) -> np.array:
+        return np.asarray(self.__incrementalInflow(k), dtype=float)
+
+    def routedInflow(self, k:int, releases:np.array) -> np.array:
+        """
+        Return the inflow of each reservoir, its incremental inflow plus the releases of the plants upstream of it [m^3/s]
+
+        Args:
+            releases (np.array): released flow of each plant on the last axis [m^3/s]
+        """
+        return self.incrementalInflow(k) + np.asarray(releases) @ self.__routing
+
+    def nextVolumes(self, k:int, volumes:np.array, releases:np.array) -> np.array:
+        """
+        Return the volumes at the end of stage k [10^6 m^3], the mass balance of each reservoir with the
+        routed inflows. Volumes and releases broadcast together, e.g. (S, 1, n) and (1, D, n) to (S, D, n)
+        """
+        return np.asarray(volumes) + (self.routedInflow(k, releases) - releases)*self.__secondsOfStage(k)*1e-6
+
+    def releaseBounds(self, k:int, volumes:np.array) -> tuple:
+        """
+        Return the (low, high) releases of each plant on the last axis that keep its volume at the end of stage k
+        between its min and max volumes, for any releases of the plants upstream of it inside of their bounds [m^3/s]
+        """
+        volumes = np.asarray(volumes, dtype=float)
+        incrementalInflow = np.broadcast_to(self.incrementalInflow(k), volumes.shape)
+        low, high = (np.empty(volumes.shape), np.empty(volumes.shape))
+
+        for i in self.__order:
+            upstream = self.__routing[:, i] > 0
+            lowInflow = incrementalInflow[..., i] + low[..., upstream].sum(axis=-1)
+            highInflow = incrementalInflow[..., i] + high[..., upstream].sum(axis=-1)
+            low[..., i] = self.__plants[i].turbinedFlowBounds(volumes[..., i], lowInflow, self.__secondsOfStage(k))[0]
+            high[..., i] = self.__plants[i].turbinedFlowBounds(volumes[..., i], highInflow, self.__secondsOfStage(k))[1]
+
+        return (low, high)
+
+    def plantEnergy(self, volumes:np.array, releases:np.array) -> np.array:
+        """
+        Return the energy generated by each plant on the last axis, limited by its production capacity
+        """
+        volumes, releases = (np.asarray(volumes), np.asarray(releases))
+        energy = np.stack(np.broadcast_arrays(*(plant.generatedEnergyBatch(volumes[..., i], releases[..., i])
+            for (i, plant) in enumerate(self.__plants))), axis=-1)
+
+        return np.minimum(energy, self.__capacity)
+
+    def generatedEnergy(self, volumes:np.array, releases:np.array) -> np.array:
+        """
+        Return the total energy generated by the cascade
+        """
+        return self.plantEnergy(volumes, releases).sum(axis=-1)
@@ -1,9 +1,14 @@
-from dypro.dypro.utils import limit
+from .utils import limit
+import numpy as np
 
 class HydroelectricProduction:
     def __init__(self, efficiency, gravity, minReservatoryVolume, maxReservatoryVolume, 
                     minTurbineFlow, maxTurbineFlow, maxProductionCapacity, 
                     uprightPolinomy, downstreamPolinomy):
+        """
+        The polinomies are the coefficients from the constant one, e.g. (303.04, 0.0015519, -0.17377e-7) for
+        303.04 + 0.0015519*x - 0.17377e-7*x^2, or functions, that work but can't be on parameters()
+        """
         self.__efficiency = efficiency
         self.__gravity = gravity
         self.__minReservatoryVolume = minReservatoryVolume #10^6 m^3
@@ -11,8 +16,10 @@ class HydroelectricProduction:
         self.__minTurbineFlow = minTurbineFlow #m^3/s
         self.__maxTurbineFlow = maxTurbineFlow #m^3/s
         self.__maxProductionCapacity = maxProductionCapacity
-        self.__uprightPolinomy = uprightPolinomy
-        self.__downstreamPolinomy = downstreamPolinomy
+        self.__uprightCoefficients = None if callable(uprightPolinomy) else tuple(float(c) for c in uprightPolinomy)
+        self.__downstreamCoefficients = None if callable(downstreamPolinomy) else tuple(float(c) for c in downstreamPolinomy)
+        self.__uprightPolinomy = uprightPolinomy if callable(uprightPolinomy) else np.polynomial.Polynomial(self.__uprightCoefficients)
+        self.__downstreamPolinomy = downstreamPolinomy if callable(downstreamPolinomy) else np.polynomial.Polynomial(self.__downstreamCoefficients)
 
     def maxProductionCapacity(self) -> float:
         return self.__maxProductionCapacity
@@ -32,7 +39,42 @@ class HydroelectricProduction:
         flowThatGenerateEnergy = limit(turbinedFlow, self.__minTurbineFlow, self.__maxTurbineFlow)
 
         return (self.rho() * (self.uprightHeight(reservatoryVolume) - self.downstreamHeight(turbinedFlow)) * flowThatGenerateEnergy)
+
+    def generatedEnergyBatch(self, reservatoryVolume:np.array, turbinedFlow:np.array) -> np.array:
+        """
+        Same as generatedEnergy for arrays of volumes and flows that broadcast together
+        """
+        limitedVolume = np.clip(reservatoryVolume, self.__minReservatoryVolume, self.__maxReservatoryVolume)
+        flowThatGenerateEnergy = np.clip(turbinedFlow, self.__minTurbineFlow, self.__maxTurbineFlow)
+
+        return (self.rho() * (self.__uprightPolinomy(limitedVolume) - self.downstreamHeight(turbinedFlow)) * flowThatGenerateEnergy)
     
+    def turbinedFlowBounds(self, reservatoryVolume, inflow, secondsOfStage) -> tuple:
+        """
+        Return the (low, high) turbined flows that keep the volume at the end of the stage between the min and max
+        volumes, given the volume and the inflow of the stage [m^3/s]. Works with arrays of volumes and inflows.
+        The bounds are widened by 1e-6 m^3/s, so the rounding of the mass balance does not exclude a feasible flow.
+        """
+        flowOfVolume = 1e6/secondsOfStage # flow that changes the volume by 10^6 m^3 on the stage
+
+        return (inflow + (reservatoryVolume - self.__maxReservatoryVolume)*flowOfVolume - 1e-6,
+                inflow + (reservatoryVolume - self.__minReservatoryVolume)*flowOfVolume + 1e-6)
+
+    def parameters(self) -> dict:
+        """
+        Return the data that defines the plant, with the coefficients of the polinomies. Raises TypeError if
+        the polinomies are functions, whose values on a few volumes don't define them
+        """
+        if self.__uprightCoefficients is None or self.__downstreamCoefficients is None:
+            raise TypeError("the polinomies must be coefficients to define the plant")
+
+        return {'efficiency': self.__efficiency, 'gravity': self.__gravity,
+                'minReservatoryVolume': self.__minReservatoryVolume, 'maxReservatoryVolume': self.__maxReservatoryVolume,
+                'minTurbineFlow': self.__minTurbineFlow, 'maxTurbineFlow': self.__maxTurbineFlow,
+                'maxProductionCapacity': self.__maxProductionCapacity,
+                'uprightPolinomy': list(self.__uprightCoefficients),
+                'downstreamPolinomy': list(self.__downstreamCoefficients)}
+
     def minReservatoryVolume(self):
         return self.__minReservatoryVolume
     
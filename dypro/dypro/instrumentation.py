@@ -0,0 +1,173 @@
+import json
+import sys
+import time
+import numpy as np
+
+class Instrumentation:
+    """
+    Receives the metrics of each stage solved by the solvers. Subclasses override the callbacks they need.
+    Solvers called without an instrumentation do not wrap the callbacks nor count anything.
+
+    The metrics of a stage are a dict with:
+        solver, stage, states, decisions,
+        evaluations: Bellman evaluations, e.g. states*decisions*random values of a full scan
+        infeasibleTransitions: evaluations whose next state is infeasible
+        infeasibleMapHits, infeasibleMapMisses: lookups of next states out of the FMap that were on the
+            cache of solveInfeasibility, and calls of solveInfeasibility
+        callbackTime: seconds spent on the callbacks of the problem
+        engineTime: seconds spent on the solver, elapsed - callbackTime
+        elapsed: seconds to solve the stage
+        storeBytes: memory of the ValueStore, None without a store
+    Counters that are not measured by a solver are None, e.g. the counters of the workers of a process pool.
+    """
+
+    def solveStarted(self, solver:str, numberOfStages:int):
+        pass
+
+    def stageSolved(self, metrics:dict):
+        pass
+
+    def solveFinished(self, metrics:dict):
+        """
+        Receives the sum of the metrics of all stages
+        """
+        pass
+
+class MetricsRecorder(Instrumentation):
+    """
+    Keeps the metrics of the stages and of the solves in memory
+    """
+
+    def __init__(self):
+        self.stages = list()
+        self.solves = list()
+
+    def stageSolved(self, metrics:dict):
+        self.stages.append(metrics)
+
+    def solveFinished(self, metrics:dict):
+        self.solves.append(metrics)
+
+class StageCallback(Instrumentation):
+    """
+    Calls a function with the metrics of each stage, e.g. StageCallback(print)
+    """
+
+    def __init__(self, function):
+        self.__function = function
+
+    def stageSolved(self, metrics:dict):
+        self.__function(metrics)
+
+class JsonSink(Instrumentation):
+    """
+    Writes one json object per line for each event, with an 'event' key that is 'solveStarted',
+    'stageSolved' or 'solveFinished'
+    """
+
+    def __init__(self, file=sys.stdout):
+        """
+        Args:
+            file (str or file, optional): path of the file, that is appended, or an open file. Defaults to sys.stdout.
+        """
+        self.__file = file
+
+    def __write(self, event:str, data:dict):
+        line = json.dumps(dict(data, event=event)) + '\n'
+        if isinstance(self.__file, str):
+            with open(self.__file, 'a') as file:
+                file.write(line)
+        else:
+            self.__file.write(line)
+            self.__file.flush()
+
+    def solveStarted(self, solver:str, numberOfStages:int):
+        self.__write('solveStarted', {'solver': solver, 'numberOfStages': numberOfStages, 'time': time.time()})
+
+    def stageSolved(self, metrics:dict):
+        self.__write('stageSolved', metrics)
+
+    def solveFinished(self, metrics:dict):
+        self.__write('solveFinished', metrics)
+
+COUNTERS = ['evaluations', 'infeasibleTransitions', 'infeasibleMapHits', 'infeasibleMapMisses']
+
+class StageCounters:
+    """
+    Counters of the stage being solved, used by the solvers when they have an instrumentation.
+    The callbacks of the problem are wrapped by timed, that adds their time to callbackTime.
+    """
+
+    def __init__(self, instrumentation:Instrumentation, solver:str, numberOfStages:int, store=None):
+        self.__instrumentation = instrumentation
+        self.__solver = solver
+        self.__store = store
+        self.__stages = list()
+        self.__start = time.perf_counter()
+        self.reset()
+        instrumentation.solveStarted(solver, numberOfStages)
+
+    def reset(self):
+        self.callbackTime = 0.0
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.__stageStart = time.perf_counter()
+
+    def timed(self, function, counter:str=None):
+        """
+        Return function that adds its time to callbackTime and counts its calls on counter
+        """
+        if function is None:
+            return None
+
+        def timedFunction(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.callbackTime += time.perf_counter() - start
+                if counter is not None:
+                    self.counts[counter] += 1
+
+        return timedFunction
+
+    def countInfeasible(self, costs:np.array, inf) -> np.array:
+        """
+        Counts the next costs that are infeasible and returns them
+        """
+        self.counts['infeasibleTransitions'] += int(np.count_nonzero(np.asarray(costs) >= inf))
+        return costs
+
+    def stageSolved(self, k:int, states:int, decisions:int, collected:bool=True, **counts):
+        """
+        Sends the metrics of stage k to the instrumentation and resets the counters
+
+        Args:
+            collected (bool, optional): False if the callbacks ran on other processes, so their counters are None
+            counts: counters that are not counted by the callbacks, e.g. the evaluations of a vectorized stage
+        """
+        elapsed = time.perf_counter() - self.__stageStart
+        self.counts.update(counts)
+
+        metrics = {'solver': self.__solver, 'stage': k, 'states': states, 'decisions': decisions}
+        metrics.update({name: (value if collected or name in counts else None) for (name, value) in self.counts.items()})
+        metrics.update({'callbackTime': self.callbackTime if collected else None,
+                        'engineTime': elapsed - self.callbackTime if collected else None,
+                        'elapsed': elapsed,
+                        'storeBytes': self.__store.nbytes() if self.__store is not None else None})
+
+        self.__stages.append(metrics)
+        self.__instrumentation.stageSolved(metrics)
+        self.reset()
+
+    def solveFinished(self):
+        """
+        Sends the sum of the metrics of all stages to the instrumentation
+        """
+        metrics = {'solver': self.__solver, 'numberOfStages': len(self.__stages)}
+        for name in ['states', 'evaluations', 'infeasibleTransitions', 'infeasibleMapHits', 'infeasibleMapMisses', 'callbackTime', 'engineTime']:
+            values = [stage[name] for stage in self.__stages]
+            metrics[name] = None if None in values else sum(values)
+        metrics['elapsed'] = time.perf_counter() - self.__start
+        metrics['storeBytes'] = self.__store.nbytes() if self.__store is not None else None
+
+        self.__instrumentation.solveFinished(metrics)
@@ -0,0 +1,160 @@
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+logging.basicConfig(level=logging.ERROR)
+
+# Bellman evaluation of the stage being solved, inherited by the forked workers
+_STAGE_EVALUATE = None
+
+# Shared memory of the costs of stage k+1 attached by a worker of SharedStagePool
+_ATTACHED = dict()
+
+def canFork() -> bool:
+    """
+    Return True if the platform can start processes by fork, that is required to share the callbacks
+    """
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+def splitChunks(items:list, numberOfChunks:int) -> list:
+    """
+    Split a list in at most numberOfChunks contiguous lists of similar sizes
+    """
+    size, remainder = divmod(len(items), max(1, numberOfChunks))
+    chunks = list()
+    start = 0
+    for i in range(max(1, numberOfChunks)):
+        end = start + size + (1 if i < remainder else 0)
+        if end > start:
+            chunks.append(items[start:end])
+        start = end
+
+    return chunks
+
+def _evaluateChunk(chunk:list) -> list:
+    return [_STAGE_EVALUATE(xk) for xk in chunk]
+
+def parallelStage(evaluate, states:list, workers:int=1, chunksPerWorker:int=4) -> list:
+    """
+    Evaluates all the states of a stage, splitting them in chunks that are solved by a pool of processes.
+    The pool is forked for each stage, so the workers see a frozen copy of the costs of stage k+1
+    without pickling them, and only the chunks of states and its results are transferred.
+
+    Args:
+        evaluate (function of xk): returns (F, decision) of the state xk
+        states (list): states of the stage
+        workers (int, optional): number of processes. Defaults to 1, that evaluates on this process.
+        chunksPerWorker (int, optional): number of chunks of each worker, to balance the load. Defaults to 4.
+
+    Returns:
+        list: (F, decision) of each state, in the same order of states
+    """
+    global _STAGE_EVALUATE
+
+    if workers <= 1 or len(states) <= 1:
+        return [evaluate(xk) for xk in states]
+
+    if not canFork():
+        logging.warning("Processes can not be forked on this platform, solving with 1 worker")
+        return [evaluate(xk) for xk in states]
+
+    _STAGE_EVALUATE = evaluate
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            results = executor.map(_evaluateChunk, splitChunks(states, workers*chunksPerWorker))
+            return list(itertools.chain.from_iterable(results))
+    finally:
+        _STAGE_EVALUATE = None
+
+
+def _attach(name:str, size:int, dtype:str) -> np.array:
+    """
+    Attach the shared memory of a stage on a worker, releasing the one of the previous stage
+    """
+    if _ATTACHED.get('name') != name:
+        if 'memory' in _ATTACHED:
+            _ATTACHED.pop('values')
+            _ATTACHED.pop('memory').close()
+        memory = shared_memory.SharedMemory(name=name)
+        _ATTACHED.update(name=name, memory=memory, values=np.ndarray((size,), dtype=dtype, buffer=memory.buf))
+
+    return _ATTACHED['values']
+
+def _evaluateSharedChunk(name:str, size:int, dtype:str, k:int, chunk:list) -> list:
+    nextValues = _attach(name, size, dtype)
+    return [_STAGE_EVALUATE(k, xk, nextValues) for xk in chunk]
+
+class SharedStagePool:
+    """
+    Pool of processes that is forked once and solves all stages. On each stage the costs of
+    stage k+1 are published once on shared memory, so the workers read them without pickling,
+    and only the blocks of states and its results are transferred.
+
+    Use it as a context manager:
+
+        with SharedStagePool(evaluate, workers) as pool:
+            results = pool.solveStage(k, nextValues, states)
+    """
+
+    def __init__(self, evaluate, workers:int, chunksPerWorker:int=4):
+        """
+        Args:
+            evaluate (function of (k, xk, nextValues)): returns (F, decision) of the state xk,
+                where nextValues is the array of costs of stage k+1
+            workers (int): number of processes
+            chunksPerWorker (int, optional): number of blocks of states of each worker. Defaults to 4.
+        """
+        self.__evaluate = evaluate
+        self.__workers = workers
+        self.__chunksPerWorker = chunksPerWorker
+        self.__executor = None
+
+    def __enter__(self):
+        global _STAGE_EVALUATE
+
+        if self.__workers > 1 and canFork():
+            _STAGE_EVALUATE = self.__evaluate
+            # the workers must share the tracker of this process, else each one unlinks the memory it attached
+            resource_tracker.ensure_running()
+            try:
+                self.__executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.__workers, 
+                    mp_context=multiprocessing.get_context('fork'))
+                # starts all workers now, while _STAGE_EVALUATE is set
+                list(self.__executor.map(len, [[]]*self.__workers))
+            finally:
+                _STAGE_EVALUATE = None
+        elif self.__workers > 1:
+            logging.warning("Processes can not be forked on this platform, solving with 1 worker")
+
+        return self
+
+    def __exit__(self, *args):
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def solveStage(self, k:int, nextValues:np.array, states:list) -> list:
+        """
+        Evaluates all the states of stage k given the costs of stage k+1
+
+        Returns:
+            list: (F, decision) of each state, in the same order of states
+        """
+        if self.__executor is None:
+            return [self.__evaluate(k, xk, nextValues) for xk in states]
+
+        nextValues = np.ascontiguousarray(nextValues)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, nextValues.nbytes))
+        try:
+            np.ndarray(nextValues.shape, dtype=nextValues.dtype, buffer=memory.buf)[:] = nextValues
+
+            chunks = splitChunks(states, self.__workers*self.__chunksPerWorker)
+            results = self.__executor.map(_evaluateSharedChunk, itertools.repeat(memory.name), itertools.repeat(nextValues.size), 
+                itertools.repeat(nextValues.dtype.str), itertools.repeat(k), chunks)
+            return list(itertools.chain.from_iterable(results))
+        finally:
+            memory.close()
+            memory.unlink()
@@ -0,0 +1,87 @@
+import itertools
+import numpy as np
+
+class ProductSpace:
+    """
+    Cartesian product of the samples of each axis, e.g. the volumes of each reservoir, with the tuples in
+    row-major order as itertools.product. The tuples are not materialized: they are computed from their
+    index, and iterating over the space yields them one by one.
+    """
+
+    def __init__(self, *axes):
+        """
+        Args:
+            axes (sequence): samples of each axis, e.g. ProductSpace(range(0, 10), [0.5, 1.5])
+        """
+        if len(axes) == 0:
+            raise Exception("A product space must have at least 1 axis")
+
+        self.__axes = [list(axis) for axis in axes]
+        self.__shape = tuple(len(axis) for axis in self.__axes)
+        self.__size = int(np.prod(self.__shape))
+        self.__axisIndex = [{value: i for (i, value) in enumerate(axis)} for axis in self.__axes]
+        # number of tuples between consecutive samples of each axis
+        self.__strides = tuple(int(np.prod(self.__shape[i+1:])) for i in range(len(self.__shape)))
+
+    def ndim(self) -> int:
+        return len(self.__axes)
+
+    def shape(self) -> tuple:
+        return self.__shape
+
+    def axis(self, i:int) -> list:
+        return list(self.__axes[i])
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self):
+        return itertools.product(*self.__axes)
+
+    def __getitem__(self, index:int) -> tuple:
+        """
+        Return the tuple of a flat index, negative indexes count from the end
+        """
+        if not -self.__size <= index < self.__size:
+            raise IndexError(f"Index {index} out of a product space of {self.__size} tuples")
+        index = index % self.__size
+
+        return tuple(axis[(index // stride) % n] for (axis, stride, n) in zip(self.__axes, self.__strides, self.__shape))
+
+    def index(self, value:tuple) -> int:
+        """
+        Return the flat index of a tuple of the space, or -1 if it is not on the space
+        """
+        if len(value) != len(self.__axes):
+            return -1
+
+        flatIndex = 0
+        for component, axisIndex, stride in zip(value, self.__axisIndex, self.__strides):
+            i = axisIndex.get(component)
+            if i is None:
+                return -1
+            flatIndex += i*stride
+
+        return flatIndex
+
+    def __contains__(self, value) -> bool:
+        return self.index(value) >= 0
+
+    def coordinates(self) -> tuple:
+        """
+        Return an array with the component of each axis of all the tuples, in the order of the flat indexes
+        """
+        return tuple(mesh.ravel() for mesh in np.meshgrid(*(np.asarray(axis) for axis in self.__axes), indexing='ij'))
+
+    def points(self) -> np.array:
+        """
+        Return all the tuples as an array of shape (size, ndim)
+        """
+        return np.stack(self.coordinates(), axis=-1)
+
+    def __array__(self, dtype=None, copy=None):
+        points = self.points()
+        return points if dtype is None else points.astype(dtype)
+
+    def __repr__(self):
+        return f"ProductSpace(shape={self.__shape})"
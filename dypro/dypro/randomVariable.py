@@ -1,3 +1,5 @@
+import numpy as np
+
 class ValueProbability():
     def __init__(self, value:tuple, probability:float):
             self.value = value
@@ -15,29 +17,99 @@ class ValueProbability():
         return f"{self.getValue()}:{self.getProbability()}"
 
 class RandomVariable():
+    """
+    Discrete random variable, kept as read-only arrays of the values and the probabilities of its atoms.
+    Tuple values are rows of the values array.
+    """
+    __slots__ = ('__values', '__probabilities', '__randomValue')
+
     def __init__(self, values:list, probabilities:list):
         if len(values) != len(probabilities):
             raise Exception("Number of values is not equal probabilities")
         elif round(sum(probabilities), 2)!=1:
             raise Exception("Sum of probabilities is not 1")
-        else:
-            self.__randomValue = [ValueProbability(a, b) for (a, b) in zip(values, probabilities)]
-    
-    def randomValue(self):
-        return self.__randomValue
-    
+
+        probabilities = np.array(probabilities, dtype=float)
+        if np.any((probabilities > 1) | (probabilities < 0)):
+            raise TypeError("Invalid probability value")
+
+        values = np.array(values)
+        for array in (values, probabilities):
+            array.flags.writeable = False
+
+        object.__setattr__(self, '_RandomVariable__values', values)
+        object.__setattr__(self, '_RandomVariable__probabilities', probabilities)
+        object.__setattr__(self, '_RandomVariable__randomValue', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RandomVariable is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RandomVariable is immutable")
+
+    def __reduce__(self):
+        return (RandomVariable, (self.valueList(), self.__probabilities.tolist()))
+
+    def __len__(self) -> int:
+        return len(self.__probabilities)
+
+    def values(self) -> np.array:
+        """
+        Return the values of the atoms, of shape (atoms,) or (atoms, n) for tuple values
+        """
+        return self.__values
+
+    def probabilities(self) -> np.array:
+        """
+        Return the probabilities of the atoms, of shape (atoms,)
+        """
+        return self.__probabilities
+
+    def valueList(self) -> list:
+        """
+        Return the values of the atoms as python values, tuple values as tuples
+        """
+        values = self.__values.tolist()
+        return values if self.__values.ndim == 1 else [tuple(value) for value in values]
+
+    def expectation(self, outcomes:np.array, axis:int=-1) -> np.array:
+        """
+        Return the expectation of outcomes over the axis of the atoms, e.g. E[cost + F(next)] of a batch of
+        (state, decision) pairs from an array of shape (states, decisions, atoms)
+
+        Args:
+            outcomes (np.array): outcome of each atom on axis
+            axis (int, optional): axis of the atoms. Defaults to -1.
+
+        Returns:
+            np.array: outcomes without the axis of the atoms
+        """
+        return np.moveaxis(np.asarray(outcomes, dtype=float), axis, -1) @ self.__probabilities
+
+    def mean(self) -> np.array:
+        """
+        Return the expected value, of shape (n,) for tuple values
+        """
+        return self.expectation(self.__values, axis=0)
+
+    def randomValue(self) -> list:
+        if self.__randomValue is None:
+            object.__setattr__(self, '_RandomVariable__randomValue',
+                tuple(ValueProbability(a, b) for (a, b) in zip(self.valueList(), self.__probabilities.tolist())))
+        return list(self.__randomValue)
+
     def randomValueIterator(self)->ValueProbability:
         """
         Return all values and your probability
         Yields:
             Iterator[ValueProbability]: return the value and your probability
         """
-        for valueProb in self.__randomValue:
+        for valueProb in self.randomValue():
             yield valueProb
-    
+
     def __str__(self):
         return f"{'{'}{', '.join([str(v) for v in self.randomValue()])}{'}'}"
 
 if __name__ == "__main__":
     a = RandomVariable([1,2,3], [0.2,0.5,0.3])
-    print(a)
\ No newline at end of file
+    print(a)
@@ -0,0 +1,158 @@
+import itertools
+import numpy as np
+
+from .grid import Grid
+
+def _cornerIndexes(grid:Grid, points:np.array) -> tuple:
+    """
+    Return the flat indexes of the corners of the cells of the points, that are used to interpolate them,
+    and if each point is inside of the grid
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, grid.ndim())
+    feasible = np.all((points >= grid.min()) & (points <= grid.max()), axis=-1)
+    position = (points[feasible] - grid.min())/grid.period()
+    shape = np.array(grid.shape())
+
+    low = np.clip(np.floor(position).astype(np.int64), 0, shape - 1)
+    high = np.clip(np.ceil(position).astype(np.int64), 0, shape - 1)
+
+    corners = [np.ravel_multi_index(tuple(np.where(np.array(corner), high, low).T), grid.shape())
+               for corner in itertools.product([False, True], repeat=grid.ndim())]
+
+    return (np.concatenate(corners), feasible)
+
+def _nextStates(k:int, grid:Grid, points:np.array, decisions:list, transitionFunction, vectorized:bool, chunkSize:int):
+    """
+    Yields the blocks of points of the grid and the next states of all their decisions
+    """
+    blockSize = max(1, chunkSize // max(1, len(decisions)))
+    for start in range(0, len(points), blockSize):
+        block = points[start:start + blockSize]
+        if vectorized:
+            nextStates = transitionFunction(k, block[:, np.newaxis, ...], np.asarray(decisions)[np.newaxis, ...])
+        else:
+            states = block.tolist() if grid.isScalar() else [tuple(p) for p in block.tolist()]
+            nextStates = [transitionFunction(k, xk, uk) for xk in states for uk in decisions]
+
+        yield (block, nextStates)
+
+def reachableIndexes(initialState, numberOfStages:int, stateGrid, decision, transitionFunction, vectorized:bool=False,
+                        interpolate:bool=False, chunkSize:int=2**22) -> list:
+    """
+    Forward pass from the initial state that finds the states of each stage that can be reached by some
+    sequence of decisions. Next states are snapped to the nearest state of the grid as solve and solveVectorized do,
+    and next states outside of the grid are not reachable. The backward solvers only need to evaluate these states
+    to get the optimal cost and policy of the trajectories from the initial state.
+
+    Args:
+        initialState: state of stage 0, snapped to stateGrid(0)
+        numberOfStages (int): number of stages
+        stateGrid (function of k): Grid of the states of the stage
+        decision (function of k): all possible decisions of the stage
+        transitionFunction (function of (k, xk, uk)): next state, or of arrays of states (S, 1) and decisions (1, D) if vectorized
+        vectorized (bool, optional): if transitionFunction works with arrays. Defaults to False.
+        interpolate (bool, optional): if the costs of the next states are interpolated, so the corners of the
+            cell of each next state are reachable. Defaults to False.
+        chunkSize (int, optional): maximum number of (state, decision) pairs evaluated at once. Defaults to 2**22.
+
+    Returns:
+        list: sorted array of the flat indexes on stateGrid(k) of the reachable states of each stage, from 0 to numberOfStages
+    """
+    grid = stateGrid(0)
+    index, feasible = grid.snap(initialState)
+    if not feasible:
+        raise Exception(f"The initial state {initialState} is outside of the grid of stage 0")
+
+    reachable = [np.array([index]).ravel()]
+    for k in range(numberOfStages):
+        grid, nextGrid = (stateGrid(k), stateGrid(k+1))
+        decisions = list(decision(k))
+        points = grid.points()[reachable[-1]]
+
+        nextIndexes = list()
+        for _, nextStates in _nextStates(k, grid, points, decisions, transitionFunction, vectorized, chunkSize):
+            if interpolate:
+                corners, _ = _cornerIndexes(nextGrid, nextStates)
+                nextIndexes.append(corners)
+            else:
+                index, feasible = nextGrid.snap(nextStates)
+                nextIndexes.append(np.asarray(index)[np.asarray(feasible)].ravel())
+
+        reachable.append(np.unique(np.concatenate(nextIndexes)) if nextIndexes else np.array([], dtype=np.int64))
+
+    return reachable
+
+def feasibleIndexes(numberOfStages:int, stateGrid, finalStateCost, decision, transitionFunction, vectorized:bool=False,
+                        interpolate:bool=False, inf=np.inf, chunkSize:int=2**22) -> list:
+    """
+    Backward pass from the final states that finds the states of each stage that can reach a final state with
+    a cost less than inf by some sequence of decisions. The cost of the other states is inf on every solver,
+    so they and the decisions to them can be skipped: the feasible indexes can be passed as reachable to
+    solveVectorized, or their states to solve. Only the transitions are evaluated, not the costs.
+
+    Args:
+        numberOfStages (int): number of stages
+        stateGrid (function of k): Grid of the states of the stage
+        finalStateCost (function of state): cost of a final state, or of the array of final states if vectorized
+        decision (function of k): all possible decisions of the stage
+        transitionFunction (function of (k, xk, uk)): next state, or of arrays of states (S, 1) and decisions (1, D) if vectorized
+        vectorized (bool, optional): if transitionFunction and finalStateCost work with arrays. Defaults to False.
+        interpolate (bool, optional): if the costs of the next states are interpolated, so all the corners used
+            by the interpolation must be feasible. Defaults to False.
+        inf (float, optional): cost of the infeasible final states. Defaults to np.inf.
+        chunkSize (int, optional): maximum number of (state, decision) pairs evaluated at once. Defaults to 2**22.
+
+    Returns:
+        list: sorted array of the flat indexes on stateGrid(k) of the feasible states of each stage, from 0 to numberOfStages
+    """
+    grid = stateGrid(numberOfStages)
+    if vectorized:
+        finalCosts = np.broadcast_to(np.asarray(finalStateCost(grid.points()), dtype=float), (grid.size(),))
+    else:
+        finalCosts = np.array([finalStateCost(xk) for xk in grid.states()], dtype=float)
+
+    # 0 on the feasible states and inf on the others, so the feasibility of a next state is its cost
+    costs = np.where(finalCosts < inf, 0, np.inf)
+    feasible = [np.flatnonzero(costs < np.inf)]
+    for k in range(numberOfStages-1, -1, -1):
+        grid, nextGrid = (stateGrid(k), grid)
+        decisions = list(decision(k))
+
+        isFeasible = list()
+        for block, nextStates in _nextStates(k, grid, grid.points(), decisions, transitionFunction, vectorized, chunkSize):
+            if interpolate:
+                nextCosts = nextGrid.interpolate(costs, nextStates)
+            else:
+                index, ok = nextGrid.snap(nextStates)
+                nextCosts = np.where(ok, costs[index], np.inf)
+            isFeasible.append(np.any(np.reshape(nextCosts, (len(block), len(decisions))) < np.inf, axis=1))
+
+        costs = np.where(np.concatenate(isFeasible), 0, np.inf) if isFeasible else np.full(grid.size(), np.inf)
+        feasible.insert(0, np.flatnonzero(costs < np.inf))
+
+    return feasible
+
+def reachableStates(initialState, numberOfStages:int, stateGrid, decision, transitionFunction, vectorized:bool=False,
+                        interpolate:bool=False) -> list:
+    """
+    Same as reachableIndexes, returning the reachable states of each stage as python scalars or tuples,
+    as used on FMap keys
+    """
+    return [[stateGrid(k).state(i) for i in indexes.tolist()] for (k, indexes) in
+            enumerate(reachableIndexes(initialState, numberOfStages, stateGrid, decision, transitionFunction, vectorized, interpolate))]
+
+def reachableBounds(stateGrid, reachable:list) -> list:
+    """
+    Return the (min, max) of each dimension of the reachable states of each stage, None for a stage without states
+    """
+    bounds = list()
+    for k, indexes in enumerate(reachable):
+        if len(indexes) == 0:
+            bounds.append(None)
+            continue
+
+        points = stateGrid(k).points()[indexes]
+        low, high = (points.min(axis=0), points.max(axis=0))
+        bounds.append((low.item(), high.item()) if stateGrid(k).isScalar() else (tuple(low.tolist()), tuple(high.tolist())))
+
+    return bounds
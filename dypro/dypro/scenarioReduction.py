@@ -0,0 +1,76 @@
+import numpy as np
+
+from .randomVariable import RandomVariable
+
+def _atoms(distribution) -> tuple:
+    """
+    Return the distinct values of a RandomVariable or of an array of equiprobable samples, as an array of shape
+    (atoms, n), and their probabilities
+    """
+    if isinstance(distribution, RandomVariable):
+        values, probabilities = (distribution.values(), distribution.probabilities())
+    else:
+        values = np.asarray(distribution)
+        probabilities = np.full(len(values), 1/len(values))
+
+    values = np.asarray(values).reshape(len(values), -1)
+    values, inverse = np.unique(values, axis=0, return_inverse=True)
+
+    return (values, np.bincount(inverse.ravel(), weights=probabilities, minlength=len(values)))
+
+def _toRandomVariable(values:np.array, probabilities:np.array, isScalar:bool) -> RandomVariable:
+    values = values[:, 0].tolist() if isScalar else [tuple(v) for v in values.tolist()]
+    return RandomVariable(values, (probabilities/probabilities.sum()).tolist())
+
+def _isScalar(distribution) -> bool:
+    values = distribution.values() if isinstance(distribution, RandomVariable) else np.asarray(distribution)
+    return values.ndim == 1
+
+def reduceScenarios(distribution, numberOfAtoms:int, order:int=1) -> tuple:
+    """
+    Reduces a discrete distribution to numberOfAtoms of its atoms by fast forward selection: the atom that
+    most decreases the Wasserstein distance to the original distribution is selected at each step, and the
+    probability of each atom that is not selected is moved to its nearest selected atom, that is the optimal
+    transport to the selected atoms.
+
+    Args:
+        distribution (RandomVariable or np.array): distribution or equiprobable samples, of shape (samples,)
+            or (samples, n) for tuple values, e.g. the historical inflows of a month
+        numberOfAtoms (int): atoms of the reduced distribution
+        order (int, optional): order r of the Wasserstein distance, the euclidean distance between values
+            is raised to r. Defaults to 1.
+
+    Returns:
+        (RandomVariable, float): reduced distribution and its Wasserstein distance of order r to the original one
+    """
+    if numberOfAtoms < 1:
+        raise Exception("The number of atoms must be at least 1")
+
+    isScalar = _isScalar(distribution)
+    values, probabilities = _atoms(distribution)
+
+    if numberOfAtoms >= len(values):
+        return (_toRandomVariable(values, probabilities, isScalar), 0.0)
+
+    points = values.astype(float)
+    cost = np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=-1)**order
+
+    # cost of transporting each atom to its nearest selected atom
+    transport = np.full(len(values), np.inf)
+    selected = list()
+    for _ in range(numberOfAtoms):
+        candidate = np.minimum(transport[:, np.newaxis], cost) # transport if each atom is selected
+        distance = probabilities @ candidate
+        distance[selected] = np.inf
+        best = int(np.argmin(distance))
+
+        selected.append(best)
+        transport = candidate[:, best]
+
+    selected = np.sort(selected)
+    nearest = selected[np.argmin(cost[:, selected], axis=1)]
+    reducedProbabilities = np.bincount(nearest, weights=probabilities, minlength=len(values))[selected]
+
+    error = float(probabilities @ transport)**(1/order)
+
+    return (_toRandomVariable(values[selected], reducedProbabilities, isScalar), error)
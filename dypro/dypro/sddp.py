@@ -0,0 +1,322 @@
+import logging
+import time
+import numpy as np
+
+from .hydroelectricCascade import HydroelectricCascade
+from .randomVariable import RandomVariable
+
+try:
+    from scipy.optimize import linprog
+except ImportError:
+    # SDDP solves the LPs of the stages with HiGHS of scipy
+    linprog = None
+
+def _tangents(function, points:np.array) -> tuple:
+    """
+    Return the (values, slopes) of a function on points, the slopes by central differences that don't leave
+    the interval of the points, e.g. the generated energy is flat below the min turbined flow
+    """
+    points = np.asarray(points, dtype=float)
+    low, high = (float(points.min()), float(points.max()))
+    step = 1e-4*max(1.0, high - low)
+    values = np.array([function(x) for x in points.tolist()], dtype=float)
+    slopes = np.array([(function(min(x + step, high)) - function(max(x - step, low)))/(min(x + step, high) - max(x - step, low))
+        for x in points.tolist()], dtype=float)
+
+    return (values, slopes)
+
+class SDDP:
+    """
+    Stochastic Dual Dynamic Programming of a HydroelectricCascade with stagewise independent inflows.
+    The cost-to-go of each stage is a function of the volumes of all reservoirs, approximated from below by
+    Benders cuts. Each iteration simulates the policy of the cuts on sampled inflows (forward pass), that
+    estimates an upper bound of the optimal cost, and adds a cut on each visited volumes (backward pass).
+    The cost-to-go of stage 0 is a lower bound of the optimal cost.
+
+    Each stage is a linear program solved by HiGHS, so the hydro model is linearized:
+    * the energy of each plant is the concave envelope of the tangents of generatedEnergy on some flows,
+      at a reference volume, and is limited by its production capacity
+    * the thermal cost is the convex envelope of its tangents on some thermal energies
+    * the water released beyond the turbined flow is spilled, without energy
+    * a virtual inflow keeps the volumes above their minimum, at a cost of deficitPenalty per 10^6 m^3
+
+    The costs must be non-negative, since the cost-to-go starts at 0.
+    """
+
+    def __init__(self, cascade:HydroelectricCascade, numberOfStages:int, inflows, demand, thermalCost, initialVolumes,
+                    maxFlows=None, finalVolumes=None, finalCuts=None, referenceVolumes=None, flowBreakpoints:int=5,
+                    thermalBreakpoints:int=20, deficitPenalty:float=1e3, seed=None):
+        """
+        Args:
+            cascade (HydroelectricCascade): plants of the river, a single plant is a cascade without downstream plants
+            numberOfStages (int): number of stages
+            inflows (function of k): RandomVariable of the incremental inflows of stage k, scalars for a single
+                plant or tuples with the inflow of each plant [m^3/s]
+            demand (function of k): energy demand of stage k
+            thermalCost (function of energy): convex cost of the thermal energy of a stage
+            initialVolumes (tuple): volume of each reservoir at the beginning of stage 0 [10^6 m^3]
+            maxFlows (tuple, optional): max turbined flow of each plant. Defaults to the maxTurbineFlow of the plants.
+            finalVolumes (tuple, optional): min volume of each reservoir at the end of the last stage. Defaults to the min volumes.
+            finalCuts (list, optional): (alpha, beta) of the cuts of a convex cost of the final volumes, that is the max of
+                alpha + beta @ volumes. Defaults to no cost.
+            referenceVolumes (tuple, optional): volumes of the linearized energy of the plants. Defaults to the middle volumes.
+            flowBreakpoints (int, optional): flows of the tangents of the energy of each plant. Defaults to 5.
+            thermalBreakpoints (int, optional): thermal energies of the tangents of the thermal cost. Defaults to 20.
+            deficitPenalty (float, optional): cost of the virtual inflow per 10^6 m^3. Defaults to 1e3.
+            seed (optional): seed of the sampled inflows
+        """
+        if linprog is None:
+            raise Exception("SDDP requires scipy, that is not installed")
+
+        self.__cascade = cascade
+        self.__numberOfStages = numberOfStages
+        self.__inflows = inflows
+        self.__demand = demand
+        self.__rng = np.random.default_rng(seed)
+        self.__deficitPenalty = deficitPenalty
+
+        n = cascade.numberOfPlants()
+        plants = [cascade.plant(i) for i in range(n)]
+        self.__initialVolumes = np.array(initialVolumes, dtype=float).reshape(n)
+        self.__minVolumes = np.array(cascade.minVolumes(), dtype=float)
+        self.__maxVolumes = np.array(cascade.maxVolumes(), dtype=float)
+        self.__finalVolumes = self.__minVolumes if finalVolumes is None else np.maximum(np.array(finalVolumes, dtype=float), self.__minVolumes)
+        self.__minFlows = np.array([plant.minTurbineFlow() for plant in plants], dtype=float)
+        self.__maxFlows = np.array([plant.maxTurbineFlow() for plant in plants] if maxFlows is None else maxFlows, dtype=float)
+        self.__capacities = np.array([plant.maxProductionCapacity() for plant in plants], dtype=float)
+
+        if referenceVolumes is None:
+            referenceVolumes = (self.__minVolumes + self.__maxVolumes)/2
+        # the energy has a kink on the max turbine flow, where the flow stops generating
+        breakpoints = [np.union1d(np.linspace(low, high, flowBreakpoints), [plant.maxTurbineFlow()] if low < plant.maxTurbineFlow() < high else [])
+            for (plant, low, high) in zip(plants, self.__minFlows.tolist(), self.__maxFlows.tolist())]
+        self.__energyTangents = [(flows,) + _tangents(lambda q, plant=plant, v=v: float(plant.generatedEnergyBatch(v, q)), flows)
+            for (plant, v, flows) in zip(plants, np.asarray(referenceVolumes, dtype=float).tolist(), breakpoints)]
+
+        maxDemand = max(demand(k) for k in range(numberOfStages))
+        thermalEnergies = np.linspace(0, maxDemand, thermalBreakpoints)
+        self.__thermalTangents = (thermalEnergies,) + _tangents(thermalCost, thermalEnergies)
+
+        # cuts of the cost-to-go at the beginning of each stage, alpha + beta @ volumes
+        self.__cuts = [list() for _ in range(numberOfStages + 1)]
+        self.__cutArrays = [(np.empty(0), np.empty((0, n))) for _ in range(numberOfStages + 1)]
+        for alpha, beta in ([] if finalCuts is None else finalCuts):
+            self.__appendCut(numberOfStages, float(alpha), np.array(beta, dtype=float).reshape(n))
+        self.__history = list()
+
+    # variables of the LP of a stage: next volumes, turbined flows, spilled flows, energies and virtual inflows
+    # of each plant, followed by the thermal energy, the thermal cost and the cost-to-go of the next stage
+    def __variables(self) -> dict:
+        n = self.__cascade.numberOfPlants()
+        return {'volume': slice(0, n), 'turbined': slice(n, 2*n), 'spilled': slice(2*n, 3*n), 'energy': slice(3*n, 4*n),
+                'deficit': slice(4*n, 5*n), 'thermal': 5*n, 'thermalCost': 5*n + 1, 'costToGo': 5*n + 2, 'size': 5*n + 3}
+
+    def __stageProblem(self, k:int) -> dict:
+        """
+        Return the arrays of the LP of stage k that don't depend on the volumes and inflows
+        """
+        n, x = (self.__cascade.numberOfPlants(), self.__variables())
+        flowToVolume = self.__cascade.secondsOfStage(k)*1e-6
+
+        c = np.zeros(x['size'])
+        c[x['deficit']] = self.__deficitPenalty
+        c[x['thermalCost']] = 1
+        c[x['costToGo']] = 1
+
+        # mass balance: next volume + (released - routed inflow)*flowToVolume - virtual inflow = volume + inflow*flowToVolume
+        A_eq = np.zeros((n, x['size']))
+        for i in range(n):
+            A_eq[i, x['volume'].start + i] = 1
+            A_eq[i, x['deficit'].start + i] = -1
+            for j in [i] + [j for j in range(n) if self.__cascade.downstream(j) == i]:
+                sign = 1 if j == i else -1
+                A_eq[i, x['turbined'].start + j] = sign*flowToVolume
+                A_eq[i, x['spilled'].start + j] = sign*flowToVolume
+
+        rows, b_ub = (list(), list())
+        for i, (flows, energies, slopes) in enumerate(self.__energyTangents):
+            for q, e, slope in zip(flows, energies, slopes):
+                row = np.zeros(x['size'])
+                row[x['energy'].start + i], row[x['turbined'].start + i] = (1, -slope)
+                rows.append(row)
+                b_ub.append(e - slope*q)
+
+        row = np.zeros(x['size'])
+        row[x['energy']], row[x['thermal']] = (-1, -1)
+        rows.append(row)
+        b_ub.append(-self.__demand(k))
+
+        for g, cost, slope in zip(*self.__thermalTangents):
+            row = np.zeros(x['size'])
+            row[x['thermal']], row[x['thermalCost']] = (slope, -1)
+            rows.append(row)
+            b_ub.append(slope*g - cost)
+
+        lastStage = k == self.__numberOfStages - 1
+        minVolumes = self.__finalVolumes if lastStage else self.__minVolumes
+        bounds = ([(low, high) for (low, high) in zip(minVolumes.tolist(), self.__maxVolumes.tolist())]
+            + [(low, high) for (low, high) in zip(self.__minFlows.tolist(), self.__maxFlows.tolist())]
+            + [(0, None)]*n + [(0, capacity) for capacity in self.__capacities.tolist()] + [(0, None)]*n
+            + [(0, None), (None, None), (0, None)])
+
+        return {'c': c, 'A_eq': A_eq, 'A_ub': np.array(rows), 'b_ub': np.array(b_ub), 'bounds': bounds,
+                'flowToVolume': flowToVolume}
+
+    def __inflowAtoms(self, k:int) -> tuple:
+        """
+        Return the inflows of stage k as an array of shape (atoms, plants) and their probabilities
+        """
+        inflows = self.__inflows(k)
+        values = np.asarray(inflows.values(), dtype=float).reshape(len(inflows), -1)
+        if values.shape[1] != self.__cascade.numberOfPlants():
+            raise Exception(f"The inflows of stage {k} have {values.shape[1]} plants, the cascade has {self.__cascade.numberOfPlants()}")
+
+        return (values, inflows.probabilities())
+
+    def __solveStage(self, k:int, volumes:np.array, inflow:np.array, problem:dict):
+        """
+        Solves the LP of stage k with the cuts of stage k+1
+
+        Returns:
+            OptimizeResult: solution of linprog, its eqlin.marginals are the derivatives of the cost on the volumes
+        """
+        x = self.__variables()
+        alpha, beta = self.__cutArrays[k+1]
+        # cuts: beta @ next volumes - cost-to-go <= -alpha
+        cuts = np.zeros((len(alpha), x['size']))
+        cuts[:, x['volume']], cuts[:, x['costToGo']] = (beta, -1)
+
+        result = linprog(problem['c'], A_ub=np.vstack([problem['A_ub'], cuts]), b_ub=np.concatenate([problem['b_ub'], -alpha]),
+            A_eq=problem['A_eq'], b_eq=volumes + inflow*problem['flowToVolume'], bounds=problem['bounds'], method='highs')
+        if result.status != 0:
+            raise Exception(f"The LP of stage {k} was not solved: {result.message}")
+
+        return result
+
+    def __stageCost(self, result) -> float:
+        """
+        Cost of a stage without the cost-to-go of the next stages
+        """
+        return result.fun - result.x[self.__variables()['costToGo']]
+
+    def __expectedCost(self, k:int, volumes:np.array, problem:dict) -> tuple:
+        """
+        Return the expected cost from stage k on the volumes, of the LPs of all the inflows, and its derivatives on the volumes
+        """
+        inflows, probabilities = self.__inflowAtoms(k)
+        results = [self.__solveStage(k, volumes, inflow, problem) for inflow in inflows]
+
+        return (float(probabilities @ np.array([result.fun for result in results])),
+                probabilities @ np.array([result.eqlin.marginals for result in results]))
+
+    def __addCut(self, k:int, volumes:np.array, problem:dict):
+        """
+        Adds the cut of the cost-to-go of stage k that is tight on the volumes
+        """
+        cost, derivative = self.__expectedCost(k, volumes, problem)
+        self.__appendCut(k, cost - derivative @ volumes, derivative)
+
+    def __appendCut(self, k:int, alpha:float, beta:np.array):
+        self.__cuts[k].append((alpha, beta))
+        self.__cutArrays[k] = (np.array([a for (a, _) in self.__cuts[k]]), np.array([b for (_, b) in self.__cuts[k]]))
+
+    def __forwardPass(self, scenarios:int, problems:list) -> tuple:
+        """
+        Simulates the policy on sampled inflows
+
+        Returns:
+            (np.array, np.array): cost of each scenario and volumes of shape (scenarios, stages + 1, plants)
+        """
+        n = self.__cascade.numberOfPlants()
+        costs = np.zeros(scenarios)
+        volumes = np.empty((scenarios, self.__numberOfStages + 1, n))
+        volumes[:, 0] = self.__initialVolumes
+
+        for k in range(self.__numberOfStages):
+            inflows, probabilities = self.__inflowAtoms(k)
+            for s, atom in enumerate(self.__rng.choice(len(inflows), size=scenarios, p=probabilities).tolist()):
+                result = self.__solveStage(k, volumes[s, k], inflows[atom], problems[k])
+                costs[s] += self.__stageCost(result)
+                volumes[s, k+1] = result.x[self.__variables()['volume']]
+
+        return (costs, volumes)
+
+    def solve(self, iterations:int=50, forwardScenarios:int=10, tolerance:float=1e-2) -> list:
+        """
+        Alternates forward and backward passes until the upper end of the 95% confidence interval of the
+        upper bound is within tolerance of the lower bound, relative to the upper bound, or the iterations end.
+        The cuts are kept, so solve may be called again to improve them.
+
+        Args:
+            iterations (int, optional): max number of iterations. Defaults to 50.
+            forwardScenarios (int, optional): sampled scenarios of each forward pass. Defaults to 10.
+            tolerance (float, optional): relative gap of the bounds. Defaults to 1e-2.
+
+        Returns:
+            list: history of the bounds of each iteration, as on history()
+        """
+        problems = [self.__stageProblem(k) for k in range(self.__numberOfStages)]
+
+        for _ in range(iterations):
+            start_time = time.time()
+            costs, volumes = self.__forwardPass(forwardScenarios, problems)
+
+            for k in range(self.__numberOfStages - 1, 0, -1):
+                for trialVolumes in np.unique(volumes[:, k], axis=0):
+                    self.__addCut(k, trialVolumes, problems[k])
+            lowerBound, _ = self.__expectedCost(0, self.__initialVolumes, problems[0])
+
+            upperBound, deviation = (float(costs.mean()), float(costs.std(ddof=1)) if forwardScenarios > 1 else 0.0)
+            confidence = 1.96*deviation/np.sqrt(forwardScenarios)
+            self.__history.append({'iteration': len(self.__history), 'lowerBound': lowerBound, 'upperBound': upperBound,
+                'upperBoundConfidence': confidence, 'cuts': sum(len(cuts) for cuts in self.__cuts),
+                'time': time.time() - start_time})
+            logging.info(f"SDDP iteration {len(self.__history) - 1}: lower bound {lowerBound}, upper bound {upperBound} +- {confidence}")
+
+            if upperBound + confidence - lowerBound <= tolerance*abs(upperBound):
+                break
+
+        return self.history()
+
+    def history(self) -> list:
+        """
+        Return the dicts of the iterations, with the lowerBound, the upperBound estimated by the forward pass,
+        the half width of its 95% upperBoundConfidence interval, the number of cuts and the time of the iteration
+        """
+        return [dict(h) for h in self.__history]
+
+    def lowerBound(self) -> float:
+        return self.__history[-1]['lowerBound'] if self.__history else 0.0
+
+    def costToGo(self, k:int, volumes) -> float:
+        """
+        Return the approximation by the cuts of the expected cost from the beginning of stage k on the volumes,
+        the final cost for k = numberOfStages
+        """
+        alpha, beta = self.__cutArrays[k]
+        volumes = np.array(volumes, dtype=float).reshape(self.__cascade.numberOfPlants())
+
+        return float(np.max(alpha + beta @ volumes, initial=0.0))
+
+    def policy(self, k:int, volumes, inflows) -> dict:
+        """
+        Return the decisions of stage k on the volumes and the incremental inflows of the stage: the turbined
+        and spilled flows and the next volumes of each plant, the thermal energy and the cost of the stage
+        """
+        n = self.__cascade.numberOfPlants()
+        x = self.__variables()
+        result = self.__solveStage(k, np.array(volumes, dtype=float).reshape(n), np.array(inflows, dtype=float).reshape(n),
+            self.__stageProblem(k))
+
+        return {'turbinedFlows': result.x[x['turbined']], 'spilledFlows': result.x[x['spilled']],
+                'nextVolumes': result.x[x['volume']], 'thermalEnergy': float(result.x[x['thermal']]),
+                'cost': self.__stageCost(result)}
+
+    def simulate(self, scenarios:int) -> tuple:
+        """
+        Simulates the policy on sampled inflows
+
+        Returns:
+            (np.array, np.array): cost of each scenario and volumes of shape (scenarios, stages + 1, plants)
+        """
+        return self.__forwardPass(scenarios, [self.__stageProblem(k) for k in range(self.__numberOfStages)])
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from .grid import Grid
+from .solutionFile import saveSolution, loadSolution, METADATA_FILE
+
+def _canonical(value):
+    """
+    Converts a problem definition to values with a single json representation
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(value[key]) for key in sorted(value, key=str)}
+    elif isinstance(value, (list, tuple, range)):
+        return [_canonical(v) for v in value]
+    elif isinstance(value, np.ndarray):
+        return {'dtype': value.dtype.str, 'shape': list(value.shape),
+                'sha256': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    elif isinstance(value, Grid):
+        return {'grid': repr(value)}
+    elif isinstance(value, np.generic):
+        return _canonical(value.item())
+    elif isinstance(value, float):
+        # repr keeps all digits and also represents inf and nan
+        return {'float': repr(value)}
+    elif value is None or isinstance(value, (bool, int, str)):
+        return value
+    elif isinstance(value, type):
+        return {'type': f"{value.__module__}.{value.__qualname__}"}
+    else:
+        raise TypeError(f"Can not fingerprint {type(value)}, use the data that defines it instead")
+
+def fingerprint(*parts, **namedParts) -> str:
+    """
+    Return a sha256 of the data that defines a problem, e.g. grid parameters, the tables of
+    each stage, inf and solver options. Equal definitions give equal fingerprints.
+    Functions are not accepted, since their code does not identify their results.
+    """
+    encoded = json.dumps(_canonical([list(parts), namedParts]), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+class SolutionCache:
+    """
+    Cache of solutions on a local directory, keyed by the fingerprint of the problem.
+    When the cache is bigger than maxBytes, the least recently used solutions are removed.
+    """
+
+    def __init__(self, directory:str, maxBytes:int=2**30):
+        """
+        Args:
+            directory (str): directory of the cache, it is created if it does not exist
+            maxBytes (int, optional): maximum size of the cache. Defaults to 1 GiB.
+        """
+        self.__directory = directory
+        self.__maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+
+    def __path(self, key:str) -> str:
+        return os.path.join(self.__directory, key)
+
+    def __contains__(self, key:str) -> bool:
+        return os.path.isfile(os.path.join(self.__path(key), METADATA_FILE))
+
+    def get(self, key:str):
+        """
+        Return the cached ValueStore of the key, or None if it is not on the cache
+        """
+        if key not in self:
+            return None
+
+        # the modification time of the metadata marks the last use
+        os.utime(os.path.join(self.__path(key), METADATA_FILE))
+        return loadSolution(self.__path(key))
+
+    def put(self, key:str, store, metadata:dict=None):
+        """
+        Saves the solution of the key and removes the least recently used ones if the cache is full
+        """
+        temporary = tempfile.mkdtemp(dir=self.__directory, prefix='.tmp-')
+        try:
+            saveSolution(temporary, store, metadata)
+            if key in self:
+                shutil.rmtree(self.__path(key))
+            os.replace(temporary, self.__path(key))
+        finally:
+            if os.path.exists(temporary):
+                shutil.rmtree(temporary)
+
+        self.evict(keep=key)
+
+    def solve(self, key:str, solveFunction, metadata:dict=None):
+        """
+        Return the cached solution of the key, or solves and caches it
+
+        Args:
+            key (str): fingerprint of the problem
+            solveFunction (function): solves the problem and returns the solved ValueStore
+            metadata (dict, optional): extra information saved with the solution
+
+        Returns:
+            ValueStore: read only solution loaded from the cache
+        """
+        store = self.get(key)
+        if store is None:
+            self.put(key, solveFunction(), metadata)
+            store = self.get(key)
+
+        return store
+
+    def entries(self) -> list:
+        """
+        Return (key, size in bytes, last use) of the solutions on the cache
+        """
+        entries = list()
+        for key in os.listdir(self.__directory):
+            if key.startswith('.') or key not in self:
+                continue
+
+            path = self.__path(key)
+            size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+            entries.append((key, size, os.path.getmtime(os.path.join(path, METADATA_FILE))))
+
+        return entries
+
+    def size(self) -> int:
+        """
+        Return the size of the cache in bytes
+        """
+        return sum(size for (_, size, _) in self.entries())
+
+    def evict(self, keep:str=None):
+        """
+        Removes the least recently used solutions until the cache fits on maxBytes
+
+        Args:
+            keep (str, optional): key that is not removed, e.g. the one just added. Defaults to None.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        size = sum(entrySize for (_, entrySize, _) in entries)
+
+        for key, entrySize, _ in entries:
+            if size <= self.__maxBytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.__path(key))
+            size -= entrySize
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self.__path(key))
@@ -0,0 +1,98 @@
+import json
+import os
+import numpy as np
+
+from .grid import Grid
+from .valueStore import ValueStore
+
+FORMAT_VERSION = 1
+METADATA_FILE = 'metadata.json'
+
+def _gridToMetadata(grid:Grid) -> dict:
+    toValue = (lambda a: a.item()) if grid.isScalar() else (lambda a: a.tolist())
+    return {'min': toValue(grid.min()), 'max': toValue(grid.max()), 'period': toValue(grid.period())}
+
+def _gridFromMetadata(metadata:dict) -> Grid:
+    toValue = lambda v: tuple(v) if isinstance(v, list) else v
+    return Grid(toValue(metadata['min']), toValue(metadata['max']), toValue(metadata['period']))
+
+def _arrayFile(kind:str, k:int) -> str:
+    return f"{kind}_{k}.npy"
+
+def saveSolution(path:str, store:ValueStore, metadata:dict=None):
+    """
+    Saves a solved ValueStore on a directory, with one .npy file per stage for the costs, the
+    policy and the decisions, and a metadata.json with the grids of the stages
+
+    Args:
+        path (str): directory of the solution, it is created if it does not exist
+        store (ValueStore): solved store, the stages discarded by a rolling store are not saved
+        metadata (dict, optional): extra information saved with the solution, e.g. the parameters of the problem
+    """
+    os.makedirs(path, exist_ok=True)
+
+    stagesWithValues = [k for k in range(store.numberOfStages() + 1) if store.hasValues(k)]
+    for k in stagesWithValues:
+        np.save(os.path.join(path, _arrayFile('values', k)), store.values(k))
+
+    for k in range(store.numberOfStages()):
+        np.save(os.path.join(path, _arrayFile('policy', k)), store.policyIndex(k))
+        np.save(os.path.join(path, _arrayFile('decisions', k)), np.asarray(store.decisions(k)))
+
+    with open(os.path.join(path, METADATA_FILE), 'w') as file:
+        json.dump({
+            'format': FORMAT_VERSION,
+            'numberOfStages': store.numberOfStages(),
+            'inf': store.inf(),
+            'grids': [_gridToMetadata(store.grid(k)) for k in range(store.numberOfStages() + 1)],
+            'stagesWithValues': stagesWithValues,
+            'metadata': metadata if metadata is not None else dict()
+            }, file)
+
+class SolutionFile:
+    """
+    Solution saved by saveSolution. The arrays of a stage are memory-mapped when they are
+    loaded, so only the pages of the queried states are read from disk
+    """
+
+    def __init__(self, path:str):
+        self.__path = path
+        with open(os.path.join(path, METADATA_FILE)) as file:
+            self.__metadata = json.load(file)
+
+        if self.__metadata.get('format') != FORMAT_VERSION:
+            raise Exception(f"Unknown solution format {self.__metadata.get('format')}")
+
+    def numberOfStages(self) -> int:
+        return self.__metadata['numberOfStages']
+
+    def inf(self):
+        return self.__metadata['inf']
+
+    def grid(self, k:int) -> Grid:
+        return _gridFromMetadata(self.__metadata['grids'][k])
+
+    def stagesWithValues(self) -> list:
+        return self.__metadata['stagesWithValues']
+
+    def metadata(self) -> dict:
+        """
+        Return the extra information saved with the solution
+        """
+        return self.__metadata['metadata']
+
+    def load(self, kind:str, k:int) -> np.array:
+        """
+        Return the read only array of 'values', 'policy' or 'decisions' of stage k
+        """
+        return np.load(os.path.join(self.__path, _arrayFile(kind, k)), mmap_mode='r')
+
+def loadSolution(path:str) -> ValueStore:
+    """
+    Opens a solution saved by saveSolution as a read only ValueStore, that loads the stages on demand.
+    Its accOptimalCost() and allPolicy() views can be used by optimalTrajectory and F lookups.
+    """
+    solution = SolutionFile(path)
+    grids = [solution.grid(k) for k in range(solution.numberOfStages() + 1)]
+
+    return ValueStore(solution.numberOfStages(), lambda k: grids[k], inf=solution.inf(), source=solution)
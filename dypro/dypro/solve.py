@@ -1,11 +1,20 @@
 import numpy as np
+import functools
 import logging
 import sys, time
+from collections.abc import Mapping, Sequence
+
+from .parallel import parallelStage, SharedStagePool
+from .valueStore import StageView
+from .instrumentation import StageCounters
+from .productSpace import ProductSpace
 
 logging.basicConfig(level=logging.ERROR)
 
 def solve(state, numberOfStages:int, finalStateCost, decision, solveInfeasibility, 
-			transitionFunction, elementaryCost, initialFMap=dict(), initialPolicy=dict(), inf=np.inf):
+			transitionFunction, elementaryCost, initialFMap=dict(), initialPolicy=dict(), inf=np.inf, store=None, workers=1,
+			interpolationGrid=None, monotone=None, instrumentation=None, elementaryCostBatch=None, transitionBatch=None,
+			reachable=None, decisionBounds=None):
 	""" Solves the optimality recursive equation using a backward strategy
 
 	Parameters
@@ -35,54 +44,185 @@ def solve(state, numberOfStages:int, finalStateCost, decision, solveInfeasibilit
 
 	initialPolicy : dict
 
+	store : ValueStore, optional
+			Keeps costs and policy on arrays, states must be on the grids of the store
+
+	workers : int
+			Number of processes that solve the states of each stage
+
+	elementaryCostBatch, transitionBatch : function of (k, states, decisions), optional
+			Batched elementaryCost and transitionFunction, with the shapes of DiscreteDynamicProgramming,
+			e.g. from its batchCallbacks(). When given, they are called once for all decisions of a state
+			instead of the scalar callbacks
+
+	interpolationGrid : function of k, optional
+			Returns the Grid of the states of the stage. When given, the cost of the next states is
+			interpolated on the grid of stage k+1 instead of calling solveInfeasibility, and next states
+			outside of the grid are infeasible. The grids of the store are used if it is given
+
+	monotone : str, optional
+			'increasing' or 'decreasing' if the optimal decision is monotone on scalar states, with the
+			decisions sorted in increasing order. Each state only scans the decisions between the optimal
+			decisions of its neighbors, that are solved by divide-and-conquer over the sorted states
+
+	instrumentation : Instrumentation, optional
+			Receives the metrics of each stage. With workers > 1 the counters of the workers are not collected
+
+	reachable : list, optional
+			States of each stage that are reachable from the initial state, e.g. from reachability.reachableStates,
+			or that are feasible, e.g. the states of reachability.feasibleIndexes. Only these states are solved on
+			stages 0 to numberOfStages-1, the cost of the others is inf for solveInfeasibility
+
+	decisionBounds : function of (k, xk), optional
+			Returns the (low, high) decisions of the state, componentwise for tuple decisions, or None for all of them.
+			Only the decisions between low and high are evaluated. The bounds may be wider than the feasible
+			decisions, the next states are still checked
+
 	Returns:
 		[(Map of costs : dict, policy : dict))]: [description]
 	"""    
 
+	if monotone not in (None, 'increasing', 'decreasing'):
+		raise Exception(f"Unknown monotone {monotone}, use 'increasing' or 'decreasing'")
+
 	INFEASIBLE_MAP = dict()
+	DEBUG = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+	if instrumentation is not None:
+		counters = StageCounters(instrumentation, 'solve', numberOfStages, store)
+		state, decision = (counters.timed(state), counters.timed(decision))
+		transitionFunction = counters.timed(transitionFunction, 'evaluations')
+		elementaryCost = counters.timed(elementaryCost)
+		solveInfeasibility = counters.timed(solveInfeasibility, 'infeasibleMapMisses')
+		elementaryCostBatch, transitionBatch = (counters.timed(elementaryCostBatch), counters.timed(transitionBatch))
 
-	FMap = dict.copy(initialFMap)
-	policy = dict.copy(initialPolicy)
+	decisionsOf = _stageDecisions(decision)
+	decisionPointsOf = _stageDecisionPoints(decisionsOf)
+	FMap, policy = _initialMaps(initialFMap, initialPolicy, store)
 
 	for xk in state(numberOfStages):
 		FMap[numberOfStages, xk] = finalStateCost(xk)
 		logging.debug(f"{FMap}")
-	
-	for k in range(numberOfStages-1, -1, -1): #n-1 to 0
-		start_time = time.time()
-		for xk in state(k):
-			F_aux = inf
-			u_aux = None
-			
-			# Calculates the best decision on stage k and state uk
-			for uk in decision(k):
-				xk_next_maybe_infeasible = transitionFunction(k, xk, uk)
-				
-
-				if (k+1, xk_next_maybe_infeasible) not in FMap and (k+1, xk_next_maybe_infeasible) not in INFEASIBLE_MAP:
-					xk_next, _F = solveInfeasibility(k+1, xk_next_maybe_infeasible, FMap)
-					INFEASIBLE_MAP[k+1, xk_next_maybe_infeasible] = (xk_next, _F)
-
-				elif (k+1, xk_next_maybe_infeasible) in INFEASIBLE_MAP:
-					xk_next, _F = INFEASIBLE_MAP[k+1, xk_next_maybe_infeasible]
 
-				else:
-					xk_next, _F = (xk_next_maybe_infeasible, FMap[k+1, xk_next_maybe_infeasible])
+	if store is not None and interpolationGrid is not None:
+		interpolationGrid = store.grid
+
+	# the states that are not solved, e.g. not feasible from reachability.feasibleIndexes, cost inf
+	# when solveInfeasibility snaps a next state to them
+	infeasibilityMap = FMap if reachable is None else _CostOrInf(FMap, inf)
+
+	def nextCost(k, xk_next_maybe_infeasible):
+		if (k+1, xk_next_maybe_infeasible) not in FMap and (k+1, xk_next_maybe_infeasible) not in INFEASIBLE_MAP:
+			xk_next, _F = solveInfeasibility(k+1, xk_next_maybe_infeasible, infeasibilityMap)
+			INFEASIBLE_MAP[k+1, xk_next_maybe_infeasible] = (xk_next, _F)
+
+		elif (k+1, xk_next_maybe_infeasible) in INFEASIBLE_MAP:
+			xk_next, _F = INFEASIBLE_MAP[k+1, xk_next_maybe_infeasible]
+
+		else:
+			xk_next, _F = (xk_next_maybe_infeasible, FMap[k+1, xk_next_maybe_infeasible])
+
+		return _F
+
+	if instrumentation is not None:
+		uncountedNextCost = nextCost
+
+		def nextCost(k, xk_next_maybe_infeasible):
+			if (k+1, xk_next_maybe_infeasible) not in FMap and (k+1, xk_next_maybe_infeasible) in INFEASIBLE_MAP:
+				counters.counts['infeasibleMapHits'] += 1
+			_F = uncountedNextCost(k, xk_next_maybe_infeasible)
+			if _F >= inf:
+				counters.counts['infeasibleTransitions'] += 1
+			return _F
+
+	def bestDecisionIndex(k, xk, decisions, interpolatedCost=None):
+		F_aux = inf
+		i_aux = None
+		if len(decisions) == 0:
+			return (F_aux, i_aux)
+
+		if elementaryCostBatch is not None or transitionBatch is not None:
+			X, U = _batchArguments(xk, decisions)
+
+		if transitionBatch is not None:
+			nextStates = _batchRow(transitionBatch(k, X, U), len(decisions))
+			if instrumentation is not None:
+				counters.counts['evaluations'] += len(decisions)
+		else:
+			nextStates = [transitionFunction(k, xk, uk) for uk in decisions]
+
+		if interpolatedCost is not None:
+			# all the next states of xk are interpolated at once
+			nextCosts = interpolatedCost(nextStates).tolist()
+		else:
+			nextCosts = [nextCost(k, xk_next) for xk_next in nextStates]
+
+		if elementaryCostBatch is not None and any(_F < inf for _F in nextCosts):
+			elementaryCosts = _batchRow(elementaryCostBatch(k, X, U), len(decisions))
+		else:
+			elementaryCosts = None
+		
+		# Calculates the best decision on stage k and state uk
+		for i, (uk, xk_next, _F) in enumerate(zip(decisions, nextStates, nextCosts)):
+			# the decisions to next states without a finite cost-to-go are not evaluated
+			if _F >= inf:
+				continue
+
+			cost = elementaryCost(k, xk, uk) if elementaryCosts is None else elementaryCosts[i]
+			F_aux_uk = cost + _F
 
-				# F_aux_uk = elementaryCost(k, xk, uk) + FMap[k+1, xk_next]
-				F_aux_uk = elementaryCost(k, xk, uk) + _F
+			if DEBUG:
+				logging.debug(f"{k} {xk} {uk} next: {xk_next} {F_aux_uk} {F_aux_uk - _F}")
 
-				logging.debug(f"{k} {xk} {uk} {xk_next_maybe_infeasible} next: {xk_next} {F_aux_uk} {elementaryCost(k, xk, uk)}")
 
+			if F_aux > F_aux_uk:
+				F_aux = F_aux_uk
+				i_aux = i
+		
+		return (F_aux, i_aux)
 
-				if F_aux > F_aux_uk:
-					F_aux = F_aux_uk
-					u_aux = uk
-			
+	def bestDecision(k, xk, interpolatedCost=None):
+		decisions = decisionsOf(k)
+		if decisionBounds is not None:
+			decisions = [decisions[i] for i in _boundedIndexes(decisionPointsOf(k), decisionBounds(k, xk))]
+		F_aux, i_aux = bestDecisionIndex(k, xk, decisions, interpolatedCost)
+
+		return (F_aux, None if i_aux is None else decisions[i_aux])
+
+	def boundedDecisionIndex(k, xk, decisions, interpolatedCost=None):
+		if decisionBounds is None:
+			return bestDecisionIndex(k, xk, decisions, interpolatedCost)
+
+		bounded = _boundedIndexes(np.asarray(decisions), decisionBounds(k, xk))
+		F_aux, i_aux = bestDecisionIndex(k, xk, [decisions[i] for i in bounded], interpolatedCost)
+
+		return (F_aux, None if i_aux is None else int(bounded[i_aux]))
+	
+	for k in range(numberOfStages-1, -1, -1): #n-1 to 0
+		start_time = time.time()
+		states = _reachableStates(state(k), reachable, k)
+		interpolatedCost = _interpolatedCost(k+1, interpolationGrid, FMap, store, inf)
+		if instrumentation is not None and interpolatedCost is not None:
+			uncountedInterpolatedCost = interpolatedCost
+			interpolatedCost = lambda nextStates: counters.countInfeasible(uncountedInterpolatedCost(nextStates), inf)
+
+		if monotone is not None:
+			evaluate = lambda xk, decisions: boundedDecisionIndex(k, xk, decisions, interpolatedCost)
+			results = _monotoneStage(evaluate, states, list(decisionsOf(k)), monotone, workers)
+		else:
+			results = parallelStage(functools.partial(bestDecision, k, interpolatedCost=interpolatedCost), states, workers)
+
+		for xk, (F_aux, u_aux) in zip(states, results):
 			FMap[k, xk] = F_aux
 			policy[k, xk] = u_aux
-		print(f"Stage {k} elapsed {time.time() - start_time} sec")
+		logging.info(f"Stage {k} elapsed {time.time() - start_time} sec")
+
+		if instrumentation is not None:
+			counters.stageSolved(k, len(states), len(decisionsOf(k)), collected=workers <= 1)
 	
+	if instrumentation is not None:
+		counters.solveFinished()
+
 	return (FMap, policy)
 
 
@@ -101,7 +241,8 @@ def solve(state, numberOfStages:int, finalStateCost, decision, solveInfeasibilit
 
 
 def solveStochastic(state, numberOfStages:int, finalStateCost, decision, realizableRandomValues,  solveInfeasibility, 
-			transitionFunction, elementaryCost, initialFMap=dict(), initialPolicy=dict(), inf=np.inf):
+			transitionFunction, elementaryCost, initialFMap=dict(), initialPolicy=dict(), inf=np.inf, store=None, workers=1,
+			interpolationGrid=None, monotone=None, instrumentation=None, decisionBounds=None):
 	""" Solves the optimality recursive equation using a backward strategy
 
 	Parameters
@@ -131,54 +272,619 @@ def solveStochastic(state, numberOfStages:int, finalStateCost, decision, realiza
 
 	initialPolicy : dict
 
+	store : ValueStore, optional
+			Keeps costs and policy on arrays, states must be on the grids of the store
+
+	workers : int
+			Number of processes that solve the states of each stage. Requires a store, the
+			costs of stage k+1 are shared with the workers on shared memory
+
+	interpolationGrid : function of k, optional
+			Returns the Grid of the states of the stage. When given, the cost of the next states is
+			interpolated on the grid of stage k+1 instead of calling solveInfeasibility, and next states
+			outside of the grid are infeasible. The grids of the store are used if it is given
+
+	monotone : str, optional
+			'increasing' or 'decreasing' if the optimal decision is monotone on scalar states, with the
+			decisions sorted in increasing order, as on solve. The expected cost of each decision is scanned
+			only between the optimal decisions of the neighbor states
+
+	instrumentation : Instrumentation, optional
+			Receives the metrics of each stage. With workers > 1 the counters of the workers are not collected
+
+	decisionBounds : function of (k, xk), optional
+			Returns the (low, high) decisions of the state, as on solve. The decisions out of the bounds must be
+			infeasible for all the random values, e.g. the bounds of each random value joined
+
 	Returns:
 		[(Map of costs : dict, policy : dict))]: [description]
 	"""    
 
-	FMap = dict.copy(initialFMap)
-	policy = dict.copy(initialPolicy)
+	if monotone not in (None, 'increasing', 'decreasing'):
+		raise Exception(f"Unknown monotone {monotone}, use 'increasing' or 'decreasing'")
+
+	if workers > 1 and store is None:
+		raise Exception("A ValueStore is required to solve with more than 1 worker")
+
+	if instrumentation is not None:
+		counters = StageCounters(instrumentation, 'solveStochastic', numberOfStages, store)
+		state, decision = (counters.timed(state), counters.timed(decision))
+		realizableRandomValues = counters.timed(realizableRandomValues)
+		transitionFunction = counters.timed(transitionFunction, 'evaluations')
+		elementaryCost = counters.timed(elementaryCost)
+		solveInfeasibility = counters.timed(solveInfeasibility, 'infeasibleMapMisses')
+
+	decisionsOf = _stageDecisions(decision)
+	decisionPointsOf = _stageDecisionPoints(decisionsOf)
+	FMap, policy = _initialMaps(initialFMap, initialPolicy, store)
 
 	for xk in state(numberOfStages):
 		FMap[numberOfStages, xk] = finalStateCost(xk)
 		logging.debug(f"{FMap}")
+
+	if store is not None and interpolationGrid is not None:
+		interpolationGrid = store.grid
+
+	def nextCost(k, xk_next_maybe_infeasible, FNext):
+		if (k+1, xk_next_maybe_infeasible) not in FNext:
+			xk_next, _F = solveInfeasibility(k+1, xk_next_maybe_infeasible, FNext)
+		else:
+			xk_next, _F = (xk_next_maybe_infeasible, FNext[k+1, xk_next_maybe_infeasible])
+
+		return _F
+
+	if instrumentation is not None:
+		uncountedNextCost = nextCost
+
+		def nextCost(k, xk_next_maybe_infeasible, FNext):
+			_F = uncountedNextCost(k, xk_next_maybe_infeasible, FNext)
+			if _F >= inf:
+				counters.counts['infeasibleTransitions'] += 1
+			return _F
+
+	def bestDecisionIndex(k, xk, decisions, FNext, interpolatedCost=None):
+		F_aux = inf
+		i_aux = None
+		if len(decisions) == 0:
+			return (F_aux, i_aux)
+
+		randomVariable = realizableRandomValues(k)
+		randomValues = randomVariable.valueList()
+		nextStates = [[transitionFunction(k, xk, uk, wk) for wk in randomValues] for uk in decisions]
+		if interpolatedCost is not None:
+			# all the next states of xk are interpolated at once
+			nextCosts = interpolatedCost(nextStates)
+		else:
+			nextCosts = [[nextCost(k, xk_next, FNext) for xk_next in row] for row in nextStates]
+
+		# expectation of the cost of each decision, as a weighted sum over the random values
+		elementaryCosts = np.array([elementaryCost(k, xk, uk) for uk in decisions], dtype=float)
+		E_F = randomVariable.expectation(elementaryCosts[:, np.newaxis] + np.asarray(nextCosts, dtype=float).reshape(len(decisions), len(randomVariable))).tolist()
+
+		# Calculates the best decision on stage k and state uk
+		for i, E_F_aux in enumerate(E_F):
+			if F_aux > E_F_aux:
+				F_aux = E_F_aux
+				i_aux = i
+
+		return (F_aux, i_aux)
+
+	def bestDecision(k, xk, FNext, interpolatedCost=None):
+		decisions = decisionsOf(k)
+		if decisionBounds is not None:
+			decisions = [decisions[i] for i in _boundedIndexes(decisionPointsOf(k), decisionBounds(k, xk))]
+		F_aux, i_aux = bestDecisionIndex(k, xk, decisions, FNext, interpolatedCost)
+
+		return (F_aux, None if i_aux is None else decisions[i_aux])
+
+	def boundedDecisionIndex(k, xk, decisions, FNext, interpolatedCost=None):
+		if decisionBounds is None:
+			return bestDecisionIndex(k, xk, decisions, FNext, interpolatedCost)
+
+		bounded = _boundedIndexes(np.asarray(decisions), decisionBounds(k, xk))
+		F_aux, i_aux = bestDecisionIndex(k, xk, [decisions[i] for i in bounded], FNext, interpolatedCost)
+
+		return (F_aux, None if i_aux is None else int(bounded[i_aux]))
+
+	def sharedBestDecision(k, xk, nextValues):
+		# runs on the workers, with the costs of stage k+1 read from shared memory
+		interpolatedCost = _interpolatedCost(k+1, interpolationGrid, None, store, inf, nextValues)
+		return bestDecision(k, xk, StageView(k+1, store.grid(k+1), nextValues), interpolatedCost)
+	
+	with SharedStagePool(sharedBestDecision, workers) as pool:
+		for k in range(numberOfStages-1, -1, -1): #n-1 to 0
+			start_time = time.time()
+			states = list(state(k))
+
+			if workers > 1 and monotone is None:
+				results = pool.solveStage(k, store.values(k+1), states)
+			else:
+				interpolatedCost = _interpolatedCost(k+1, interpolationGrid, FMap, store, inf)
+				if instrumentation is not None and interpolatedCost is not None:
+					uncountedInterpolatedCost = interpolatedCost
+					interpolatedCost = lambda nextStates: counters.countInfeasible(uncountedInterpolatedCost(nextStates), inf)
+
+				if monotone is not None:
+					# the levels of the divide-and-conquer are solved by forked workers, that read FMap
+					evaluate = lambda xk, decisions: boundedDecisionIndex(k, xk, decisions, FMap, interpolatedCost)
+					results = _monotoneStage(evaluate, states, list(decisionsOf(k)), monotone, workers)
+				else:
+					results = (bestDecision(k, xk, FMap, interpolatedCost) for xk in states)
+
+			for xk, (F_aux, u_aux) in zip(states, results):
+				FMap[k, xk] = F_aux
+				policy[k, xk] = u_aux
+			logging.info(f"Stage {k} elapsed {time.time() - start_time} sec")
+
+			if instrumentation is not None:
+				counters.stageSolved(k, len(states), len(decisionsOf(k)), collected=workers <= 1)
+
+	if instrumentation is not None:
+		counters.solveFinished()
+	
+	return (FMap, policy)
+
+def _reachableStates(states, reachable, k) -> list:
+	"""
+	Returns the states of stage k that are reachable, all the states if reachable is None
+	"""
+	if reachable is None:
+		return list(states)
+
+	reachableStates = set(reachable[k])
+	return [xk for xk in states if xk in reachableStates]
+
+class _CostOrInf(Mapping):
+	"""
+	Read only view of FMap, whose missing states cost inf
+	"""
+
+	def __init__(self, FMap, inf):
+		self.__FMap = FMap
+		self.__inf = inf
+
+	def __getitem__(self, key):
+		return self.__FMap.get(key, self.__inf)
+
+	def __contains__(self, key):
+		return key in self.__FMap
+
+	def __iter__(self):
+		return iter(self.__FMap)
+
+	def __len__(self):
+		return len(self.__FMap)
+
+def _stageDecisions(decision):
+	"""
+	Returns a function of k that calls decision(k) once per stage, instead of once per state. Sequences and
+	ProductSpaces are kept as they are, so their decisions are not materialized, other iterables are listed
+	"""
+	cache = dict()
+
+	def decisionsOf(k):
+		if k not in cache:
+			cache.clear()
+			decisions = decision(k)
+			cache[k] = decisions if isinstance(decisions, (Sequence, ProductSpace)) else list(decisions)
+		return cache[k]
+
+	return decisionsOf
+
+def _stageDecisionPoints(decisionsOf):
+	"""
+	Returns a function of k that converts the decisions of the stage to an array once per stage
+	"""
+	cache = dict()
+
+	def decisionPointsOf(k):
+		if k not in cache:
+			cache.clear()
+			cache[k] = np.asarray(decisionsOf(k))
+		return cache[k]
+
+	return decisionPointsOf
+
+def _boundedIndexes(points:np.array, bounds) -> np.array:
+	"""
+	Returns the indexes of the decisions between the (low, high) bounds, componentwise for tuple decisions
+	of shape (D, m), all of them if bounds is None
+	"""
+	if bounds is None:
+		return np.arange(len(points))
+
+	low, high = bounds
+	inside = (points >= low) & (points <= high)
+
+	return np.flatnonzero(inside if inside.ndim == 1 else np.all(inside, axis=-1))
+
+def _batchArguments(xk, decisions:list):
+	"""
+	Returns the arrays of the state xk and of its decisions with the shapes of the batch callbacks, (1, 1) and (1, D)
+	"""
+	return (np.asarray(xk)[np.newaxis, np.newaxis, ...], np.asarray(decisions)[np.newaxis, ...])
+
+def _batchRow(values:np.array, numberOfDecisions:int) -> list:
+	"""
+	Converts the result of a batch callback for 1 state to a list with a python value per decision,
+	tuple states are converted to tuples
+	"""
+	values = np.asarray(values)
+	row = np.broadcast_to(values, (1, numberOfDecisions) + values.shape[2:])[0]
+	if row.ndim == 1:
+		return row.tolist()
+
+	return [tuple(value) for value in row.tolist()]
+
+def _monotoneStage(evaluate, states:list, decisions:list, monotone:str, workers:int) -> list:
+	"""
+	Solves a stage whose optimal decision is monotone on the states. The median state of each
+	interval of sorted states is solved first, and bounds the decisions of the states below and above it.
+	The intervals of each level of the divide-and-conquer are solved together by parallelStage.
+
+	evaluate is a function of (xk, decisions) that returns (F, index of the best decision), the index
+	is None if there is no feasible decision. An infeasible state does not bound its neighbors.
+
+	Returns:
+		list: (F, decision) of each state, in the same order of states
+	"""
+	order = sorted(range(len(states)), key=lambda i: states[i])
+	if monotone == 'decreasing':
+		decisions = decisions[::-1]
+
+	results = [None]*len(states)
+	# (first state, last state, first decision, last decision) on the sorted states and decisions
+	intervals = [(0, len(states) - 1, 0, len(decisions) - 1)] if len(states) > 0 else []
+
+	while intervals:
+		tasks = [((a + b)//2, lo, hi) for (a, b, lo, hi) in intervals]
+		levelResults = parallelStage(lambda task: evaluate(states[order[task[0]]], decisions[task[1]:task[2]+1]), tasks, workers)
+
+		nextIntervals = list()
+		for (a, b, lo, hi), (m, _, _), (F_aux, i_aux) in zip(intervals, tasks, levelResults):
+			best = None if i_aux is None else lo + i_aux
+			results[order[m]] = (F_aux, None if best is None else decisions[best])
+
+			if a < m:
+				nextIntervals.append((a, m - 1, lo, hi if best is None else best))
+			if m < b:
+				nextIntervals.append((m + 1, b, lo if best is None else best, hi))
+		intervals = nextIntervals
+
+	return results
+
+def _interpolatedCost(k, interpolationGrid, FMap, store, inf, values=None):
+	"""
+	Returns a function that interpolates the costs of stage k on a list of states, or None if
+	there is no interpolationGrid
+	"""
+	if interpolationGrid is None:
+		return None
+
+	grid = interpolationGrid(k)
+	if values is None:
+		values = store.values(k) if store is not None else np.array([FMap.get((k, xk), inf) for xk in grid.states()], dtype=float)
+
+	return lambda states: grid.interpolate(values, states, inf)
+
+def _initialMaps(initialFMap, initialPolicy, store):
+	"""
+	Returns the FMap and policy used by the solvers, dicts or views of the store
+	"""
+	if store is None:
+		return (dict.copy(initialFMap), dict.copy(initialPolicy))
+
+	FMap, policy = (store.accOptimalCost(), store.allPolicy())
+	FMap.update(initialFMap)
+	policy.update(initialPolicy)
+
+	return (FMap, policy)
+
+def solveVectorized(stateGrid, numberOfStages:int, finalStateCost, decision, transitionFunction, elementaryCost, 
+			inf=np.inf, chunkSize=2**22, store=None, interpolate=False, instrumentation=None, reachable=None,
+			decisionBounds=None):
+	""" Solves the optimality recursive equation using a backward strategy, evaluating a whole
+	stage as a matrix of states x decisions with numpy
+
+	Callbacks receive arrays that broadcast to (states, decisions): states have shape (S, 1)
+	and decisions (1, D). For problems with tuple states or decisions, the components are
+	on the last axis, e.g. states (S, 1, n) and decisions (1, D, m).
+
+	Parameters
+
+	stateGrid : function of k
+			Returns the Grid of states of the stage
+	
+	numberOfStages : int
+			Number of stages
+	
+	finalStateCost : function of (states)
+			Returns the cost of an array of final states
+	
+	decision : function of k
+			Returns all possible decisions for each stage
+	
+	transitionFunction : function of (k, states, decisions)
+			Returns the array of next states, that is snapped to stateGrid(k+1).
+			Next states outside of the grid are infeasible
+	
+	elementaryCost : function of (k, states, decisions)
+			Returns the array of costs of decisions on states
 	
+	inf : float
+
+	chunkSize : int
+			Maximum number of (state, decision) pairs evaluated at once
+
+	store : ValueStore, optional
+			Keeps costs and policy on arrays instead of dicts, using the grids of the store
+
+	interpolate : bool
+			If the cost of the next states is interpolated on stateGrid(k+1) instead of using the nearest state
+
+	instrumentation : Instrumentation, optional
+			Receives the metrics of each stage
+
+	reachable : list, optional
+			Flat indexes on stateGrid(k) of the states of each stage that are reachable from the initial state,
+			e.g. from reachability.reachableIndexes. Only these states are solved on stages 0 to numberOfStages-1,
+			the others are infeasible
+
+	decisionBounds : function of (k, states), optional
+			Returns the (low, high) decisions of an array of states of shape (S, 1), that broadcast to the decisions
+			of shape (1, D), componentwise on the last axis for tuple decisions. Only the decisions between low
+			and high are evaluated. The bounds may be wider than the feasible decisions, the next states are still checked
+
+	Returns:
+		[(Map of costs : dict, policy : dict))]: same output of solve, views of the store if it is given
+	"""
+
+	FMap = dict()
+	policy = dict()
+	if store is not None:
+		stateGrid = store.grid
+
+	if instrumentation is not None:
+		counters = StageCounters(instrumentation, 'solveVectorized', numberOfStages, store)
+		finalStateCost, decision = (counters.timed(finalStateCost), counters.timed(decision))
+		transitionFunction, elementaryCost = (counters.timed(transitionFunction), counters.timed(elementaryCost))
+
+	grid = stateGrid(numberOfStages)
+	FNext = _saveFinalStage(numberOfStages, grid, finalStateCost, FMap, store)
+
 	for k in range(numberOfStages-1, -1, -1): #n-1 to 0
 		start_time = time.time()
 
-		for xk in state(k):
-			F_aux = inf
-			u_aux = None
+		grid, nextGrid = stateGrid(k), grid
+		decisions = np.asarray(list(decision(k)))
+		if interpolate:
+			nextCost = lambda block, X, U: nextGrid.interpolate(FNext, transitionFunction(k, X, U), inf)
+		else:
+			nextCost = lambda block, X, U: _nextCost(nextGrid.snap(transitionFunction(k, X, U)), FNext, inf)
+		if instrumentation is not None:
+			nextCost = _countedNextCost(nextCost, counters, inf)
+		if reachable is None or len(reachable[k]) == grid.size():
+			F, bestDecision = _vectorizedStage(k, grid.points(), decisions, nextCost, elementaryCost, inf, chunkSize,
+				decisionBounds)
+		else:
+			F, bestDecision = (np.full(grid.size(), inf, dtype=float), np.full(grid.size(), -1, dtype=np.int64))
+			F[reachable[k]], bestDecision[reachable[k]] = _vectorizedStage(k, grid.points()[reachable[k]], decisions, nextCost,
+				elementaryCost, inf, chunkSize, decisionBounds)
+
+		_saveStage(k, grid, decisions, F, bestDecision, FMap, policy, store)
+
+		FNext = F
+		logging.info(f"Stage {k} elapsed {time.time() - start_time} sec")
+
+		if instrumentation is not None:
+			counters.stageSolved(k, grid.size() if reachable is None else len(reachable[k]), len(decisions))
+
+	if instrumentation is not None:
+		counters.solveFinished()
+	
+	if store is not None:
+		return (store.accOptimalCost(), store.allPolicy())
+	return (FMap, policy)
 
-			# Calculates the best decision on stage k and state uk
-			for uk in decision(k):
-				
-				# contains the expectation of the cost
-				E_F_aux = 0.0 
+def solveTable(table, finalStateCost, elementaryCost, inf=np.inf, chunkSize=2**22, store=None, instrumentation=None):
+	""" Solves the optimality recursive equation using a backward strategy, reading the next
+	states from a compiled TransitionTable instead of calling the transition function.
+	The same table can be solved again with other costs.
 
-				for wk in realizableRandomValues(k).randomValueIterator():
-					xk_next_maybe_infeasible = transitionFunction(k, xk, uk, wk.getValue())
-					
+	Parameters
 
-					if (k+1, xk_next_maybe_infeasible) not in FMap:
-						xk_next, _F = solveInfeasibility(k+1, xk_next_maybe_infeasible, FMap)
-					else:
-						xk_next, _F = (xk_next_maybe_infeasible, FMap[k+1, xk_next_maybe_infeasible])
+	table : TransitionTable
+			Index of the next state of each (k, state, decision)
+	
+	finalStateCost : function of (states)
+			Returns the cost of an array of final states
+	
+	elementaryCost : function of (k, states, decisions)
+			Returns the array of costs of decisions on states, with the shapes used by solveVectorized
+	
+	inf : float
 
-					E_F_aux += (elementaryCost(k, xk, uk) + _F)*wk.getProbability()
+	chunkSize : int
+			Maximum number of (state, decision) pairs evaluated at once
 
-					# logging.debug(f"{k} {xk} {uk} {xk_next_maybe_infeasible} next: {xk_next} {F_aux_uk} {elementaryCost(k, xk, uk)}")
+	store : ValueStore, optional
+			Keeps costs and policy on arrays instead of dicts, must have the grids of the table
 
+	instrumentation : Instrumentation, optional
+			Receives the metrics of each stage
 
-				if F_aux > E_F_aux:
-					F_aux = E_F_aux
-					u_aux = uk
+	Returns:
+		[(Map of costs : dict, policy : dict))]: same output of solve, views of the store if it is given
+	"""
 
-			FMap[k, xk] = F_aux
-			policy[k, xk] = u_aux
-		print(f"Stage {k} elapsed {time.time() - start_time} sec")
+	FMap = dict()
+	policy = dict()
+	numberOfStages = table.numberOfStages()
+
+	if instrumentation is not None:
+		counters = StageCounters(instrumentation, 'solveTable', numberOfStages, store)
+		finalStateCost, elementaryCost = (counters.timed(finalStateCost), counters.timed(elementaryCost))
+
+	FNext = _saveFinalStage(numberOfStages, table.grid(numberOfStages), finalStateCost, FMap, store)
+
+	for k in range(numberOfStages-1, -1, -1): #n-1 to 0
+		start_time = time.time()
+
+		nextIndex = table.nextIndex(k)
+		nextCost = lambda block, X, U: _nextCost((nextIndex[block], nextIndex[block] >= 0), FNext, inf)
+		if instrumentation is not None:
+			nextCost = _countedNextCost(nextCost, counters, inf)
+		F, bestDecision = _vectorizedStage(k, table.grid(k).points(), table.decisions(k), nextCost, elementaryCost, inf, chunkSize)
+
+		_saveStage(k, table.grid(k), table.decisions(k), F, bestDecision, FMap, policy, store)
+
+		FNext = F
+		logging.info(f"Stage {k} elapsed {time.time() - start_time} sec")
+
+		if instrumentation is not None:
+			counters.stageSolved(k, nextIndex.shape[0], nextIndex.shape[1])
+
+	if instrumentation is not None:
+		counters.solveFinished()
 	
+	if store is not None:
+		return (store.accOptimalCost(), store.allPolicy())
 	return (FMap, policy)
 
+def _saveFinalStage(numberOfStages, grid, finalStateCost, FMap, store):
+	"""
+	Saves the cost of the final states on the store or FMap
+
+	Returns:
+		np.array: cost of each final state
+	"""
+	FFinal = np.broadcast_to(np.asarray(finalStateCost(grid.points()), dtype=float), (grid.size(),))
+	if store is not None:
+		store.setValues(numberOfStages, FFinal)
+	else:
+		FMap.update(zip(((numberOfStages, xk) for xk in grid.states()), FFinal.tolist()))
+
+	return FFinal
+
+def _saveStage(k, grid, decisions, F, bestDecision, FMap, policy, store):
+	"""
+	Saves the result of a stage solved with arrays on the store or on the FMap and policy dicts
+	"""
+	if store is not None:
+		store.setValues(k, F)
+		store.setPolicy(k, bestDecision, decisions)
+	else:
+		stateKeys = grid.states()
+		decisionValues = decisions.tolist() if decisions.ndim == 1 else [tuple(u) for u in decisions.tolist()]
+		FMap.update(zip(((k, xk) for xk in stateKeys), F.tolist()))
+		policy.update(((k, xk), None if u < 0 else decisionValues[u]) for (xk, u) in zip(stateKeys, bestDecision.tolist()))
+
+def _nextCost(nextState, FNext, inf):
+	"""
+	Returns the cost of the next states from their (index on FNext, feasible)
+	"""
+	index, feasible = nextState
+	return np.where(feasible, FNext[index], inf)
+
+def _countedNextCost(nextCost, counters, inf):
+	"""
+	Returns nextCost counting on counters the (state, decision) pairs that it evaluates, that are less than
+	states*decisions with decisionBounds, and their infeasible next states
+	"""
+	def countedNextCost(block, X, U):
+		cost = nextCost(block, X, U)
+		counters.counts['evaluations'] += int(np.size(cost))
+		return counters.countInfeasible(cost, inf)
+
+	return countedNextCost
+
+def _vectorizedStage(k, states, decisions, nextCost, elementaryCost, inf, chunkSize, decisionBounds=None):
+	"""
+	Evaluates the Bellman equation of stage k for all states, in blocks of states
+
+	nextCost is a function of (block, states, decisions) that returns the cost of stage k+1
+	of the next states, inf if they are infeasible. When less than 1/8 of the pairs of a block lead to
+	feasible next states, the elementary cost is only evaluated on these pairs. With decisionBounds, the pairs
+	out of the bounds are infeasible, and only the pairs inside of them are evaluated if they are less than half
+
+	Returns:
+		F: optimal cost of each state
+		bestDecision: index of the optimal decision of each state, -1 if there is no feasible decision
+	"""
+	F = np.empty(len(states))
+	bestDecision = np.empty(len(states), dtype=np.int64)
+	blockSize = max(1, chunkSize // max(1, len(decisions)))
+	U = decisions[np.newaxis, ...]
+
+	for start in range(0, len(states), blockSize):
+		block = slice(start, start + blockSize)
+		X = states[block][:, np.newaxis, ...]
+		shape = (len(X), len(decisions))
+
+		bounded = None if decisionBounds is None else _boundedPairs(decisionBounds(k, X), U, shape)
+		if bounded is not None and 2*np.count_nonzero(bounded) < bounded.size:
+			cost = _boundedCost(k, block, X, decisions, np.nonzero(bounded), nextCost, elementaryCost, inf)
+		else:
+			cost = np.broadcast_to(nextCost(block, X, U), shape)
+			feasible = cost < inf if bounded is None else (cost < inf) & bounded
+			if 8*np.count_nonzero(feasible) < cost.size:
+				cost = _prunedCost(k, X, decisions, np.nonzero(feasible), cost, elementaryCost, inf)
+			else:
+				cost = np.broadcast_to(elementaryCost(k, X, U), shape) + cost
+				if bounded is not None:
+					cost = np.where(bounded, cost, inf)
+
+		best = np.argmin(cost, axis=1)
+		bestCost = cost[np.arange(len(X)), best]
+		isFeasible = bestCost < inf
+
+		F[block] = np.where(isFeasible, bestCost, inf)
+		bestDecision[block] = np.where(isFeasible, best, -1)
+	
+	return (F, bestDecision)
+
+def _prunedCost(k, X, decisions, feasible, nextCost, elementaryCost, inf):
+	"""
+	Returns the cost of a block evaluating the elementary cost only on the feasible (rows, columns)
+	pairs of (state, decision), that have a feasible next state, the other pairs cost inf
+	"""
+	rows, columns = feasible
+	cost = np.full(nextCost.shape, inf, dtype=float)
+	if len(rows) > 0:
+		pairs = elementaryCost(k, X[rows], decisions[columns][:, np.newaxis, ...])
+		cost[rows, columns] = np.broadcast_to(pairs, (len(rows), 1)).ravel() + nextCost[rows, columns]
+
+	return cost
+
+def _boundedPairs(bounds, U, shape):
+	"""
+	Returns the mask of the (state, decision) pairs of a block between the (low, high) bounds of the states,
+	None if there are no bounds
+	"""
+	if bounds is None:
+		return None
+
+	low, high = bounds
+	inside = (U >= low) & (U <= high)
+	if inside.ndim > 2:
+		inside = np.all(inside, axis=-1)
+
+	return np.broadcast_to(inside, shape)
+
+def _boundedCost(k, block, X, decisions, bounded, nextCost, elementaryCost, inf):
+	"""
+	Returns the cost of a block evaluating the next states and the elementary cost only on the
+	(rows, columns) pairs of (state, decision) inside of the bounds, the other pairs cost inf
+	"""
+	rows, columns = bounded
+	cost = np.full((len(X), len(decisions)), inf, dtype=float)
+	if len(rows) > 0:
+		XPairs, UPairs = (X[rows], decisions[columns][:, np.newaxis, ...])
+		pairs = np.broadcast_to(nextCost(block, XPairs, UPairs), (len(rows), 1)) + elementaryCost(k, XPairs, UPairs)
+		cost[rows, columns] = np.broadcast_to(pairs, (len(rows), 1)).ravel()
+
+	return cost
+
 def optimalTrajectory(initialState, numberOfStages, policy, transitionFunction):
 		"""
 		Calculates the optimal trajectory given a initial state
@@ -2,17 +2,23 @@ import abc
 import logging
 import numpy as np
 from dypro.dypro.randomVariable import RandomVariable
+from .instrumentation import Instrumentation, StageCounters
 
 logging.basicConfig(level=logging.ERROR)
 
 class StochasticDiscreteDynamicProblem(metaclass=abc.ABCMeta):
     
-    def __init__(self, numberOfStages:int, inf=np.inf, F=dict(), policy=dict()):
+    def __init__(self, numberOfStages:int, inf=np.inf, F=dict(), policy=dict(), store=None):
         self.__numberOfStages = numberOfStages
         self.__inf = inf
         self.__F = F # accumulated optimal cost
         self.__policy = policy # best decision on stage k, state u_k
 
+        if store is not None:
+            # array backed views, states must be on the grids of the store
+            self.__F = store.accOptimalCost()
+            self.__policy = store.allPolicy()
+
     def inf(self):
         """
         Return the used infinite value
@@ -29,11 +35,7 @@ class StochasticDiscreteDynamicProblem(metaclass=abc.ABCMeta):
         Returns:
             float: the accumulated optimal cost
         """
-        if (k, state) in self.__F:
-            return self.__F[k, state]
-        else:
-            self.__F[k, state] = self.inf()
-            return self.inf()
+        return self.__F.get((k, state), self.inf())
     
     def allPolicy(self):
         return self.__policy
@@ -152,25 +154,46 @@ class StochasticDiscreteDynamicProblem(metaclass=abc.ABCMeta):
         """
         pass
 
-    def solve(self):
+    def solve(self, instrumentation:Instrumentation=None):
         """
         Solves the optimality recursive equation using a backward strategy
-        """
-        for xk in self.state(self.numberOfStages()):
-            self.__F[self.numberOfStages(), xk] = self.finalStateCost(xk)
+
+        Args:
+            instrumentation (Instrumentation, optional): receives the metrics of each stage. Defaults to None.
+        """
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        state, decision, finalStateCost = (self.state, self.decision, self.finalStateCost)
+        transitionFunction, elementaryCost, realizableRandomValues = (self.transitionFunction, self.elementaryCost, self.realizableRandomValues)
+        if instrumentation is not None:
+            counters = StageCounters(instrumentation, type(self).__name__, self.numberOfStages())
+            state, decision, finalStateCost = (counters.timed(state), counters.timed(decision), counters.timed(finalStateCost))
+            transitionFunction, elementaryCost = (counters.timed(transitionFunction), counters.timed(elementaryCost))
+            realizableRandomValues = counters.timed(realizableRandomValues)
+
+        for xk in state(self.numberOfStages()):
+            self.__F[self.numberOfStages(), xk] = finalStateCost(xk)
         
         for k in self.__stagesGenerator(): #n-1 to 0
-            for xk in self.state(k):
+            states, evaluations, infeasible = (0, 0, 0)
+            randomVariable = realizableRandomValues(k)
+            randomValues = list(zip(randomVariable.valueList(), randomVariable.probabilities().tolist()))
+            for xk in state(k):
+                states += 1
                 F_aux = self.inf()
                 u_aux = None
                 # Calculates the best decision on stage k and state uk
-                for uk in self.decision(k):
+                for uk in decision(k):
                     # Expected value of accumulated cost for decision uk and state xk
                     E_F_aux = 0.0
-                    for wk in self.realizableRandomValues(k).randomValueIterator():
-                        xk_next = self.transitionFunction(k, xk, uk, wk.getValue())
-                        E_F_aux += wk.getProbability() * (self.elementaryCost(k, xk, uk, wk.getValue()) + self.F(k+1, xk_next))
-                        logging.debug(f"    k: {k} xk: {xk} uk: {uk} wk: {wk.getValue()} xk_next: {xk_next} ele_cost: {self.elementaryCost(k, xk, uk, wk.getValue())}")
+                    for wk, probability in randomValues:
+                        xk_next = transitionFunction(k, xk, uk, wk)
+                        F_next = self.F(k+1, xk_next)
+                        ele_cost = elementaryCost(k, xk, uk, wk)
+                        E_F_aux += probability * (ele_cost + F_next)
+                        evaluations += 1
+                        infeasible += F_next >= self.inf()
+                        if debug:
+                            logging.debug(f"    k: {k} xk: {xk} uk: {uk} wk: {wk} xk_next: {xk_next} ele_cost: {ele_cost}")
 
                     if F_aux > E_F_aux:
                         F_aux = E_F_aux
@@ -178,6 +201,13 @@ class StochasticDiscreteDynamicProblem(metaclass=abc.ABCMeta):
                 self.__F[k, xk] = F_aux
                 self.__policy[k, xk] = u_aux
 
+            if instrumentation is not None:
+                counters.stageSolved(k, states, len(list(decision(k))), evaluations=evaluations,
+                    infeasibleTransitions=int(infeasible))
+
+        if instrumentation is not None:
+            counters.solveFinished()
+
     def __stagesGenerator(self):
         """
         Generates integers from numberOfStages-1 to 0
@@ -0,0 +1,154 @@
+import csv
+import itertools
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+import numpy as np
+
+from .parallel import canFork
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, the peak memory is not measured
+    resource = None
+
+DURATION = 'duration'
+PEAK_MEMORY = 'peakMemory'
+
+def configurationGrid(**parameters) -> list:
+    """
+    Return all the combinations of the values of each parameter, e.g.
+    configurationGrid(stateSampling=[10, 100], decisionSampling=[100]) has 2 configurations
+    """
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[name] for name in names))]
+
+def _toCell(value):
+    """
+    Converts a value to be written on a csv cell, lists and dicts are written as json
+    """
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    elif isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, default=lambda v: v.item() if isinstance(v, np.generic) else str(v))
+
+    return value
+
+def _key(configuration:dict, names:list) -> tuple:
+    return tuple(str(_toCell(configuration.get(name))) for name in names)
+
+def peakMemory() -> int:
+    """
+    Return the peak resident memory of this process in bytes, or None if it can not be measured
+    """
+    if resource is None:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return maxrss if sys.platform == 'darwin' else maxrss*1024
+
+def _measuredRun(run, configuration:dict, connection):
+    """
+    Sends (configuration, results, error) of a run by the connection, results is None if the run failed
+    """
+    start = time.time()
+    try:
+        result = run(**configuration)
+        connection.send((configuration, dict(result, **{DURATION: time.time() - start, PEAK_MEMORY: peakMemory()}), None))
+    except Exception as exception:
+        connection.send((configuration, None, repr(exception)))
+    finally:
+        connection.close()
+
+def readResults(path:str) -> list:
+    """
+    Return the rows of a results file as dicts of strings, an empty list if it does not exist
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, newline='') as file:
+        return list(csv.DictReader(file))
+
+def sweep(run, configurations:list, path:str, workers:int=1, failed:list=None) -> list:
+    """
+    Runs each configuration on its own process, and appends a row with the configuration,
+    the results, the duration and the peak memory of the run to a csv file as soon as it finishes.
+    Configurations that are already on the file are skipped, so an interrupted sweep can be resumed.
+    The processes are not daemons, so a run can start its own pool of workers.
+
+    Args:
+        run (function of **configuration): returns a dict of results, e.g. cost and trajectory, with the same
+            keys for all configurations. Lists are written as json. It must be a module level function.
+        configurations (list): dicts of the parameters of each run, e.g. from configurationGrid
+        path (str): csv file of the results
+        workers (int, optional): number of runs at the same time. Defaults to 1.
+        failed (list, optional): receives the (configuration, error) of the failed runs, that are not written
+
+    Returns:
+        list: rows written by this sweep
+    """
+    if len(configurations) == 0:
+        return []
+
+    names = list(configurations[0])
+    done = {_key(row, names) for row in readResults(path)}
+    pending = [c for c in configurations if _key(c, names) not in done]
+
+    # a new process per run, so the peak memory of a run does not include the previous ones
+    context = multiprocessing.get_context('fork') if canFork() else multiprocessing.get_context()
+    rows = list()
+    running = dict()
+    while pending or running:
+        while pending and len(running) < max(1, workers):
+            configuration = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_measuredRun, args=(run, configuration, sender))
+            process.start()
+            sender.close()
+            running[receiver] = (process, configuration)
+
+        for receiver in multiprocessing.connection.wait(list(running)):
+            process, configuration = running.pop(receiver)
+            try:
+                configuration, result, error = receiver.recv()
+            except EOFError:
+                result, error = (None, "the process died")
+            process.join()
+            receiver.close()
+
+            if result is None:
+                error = error if process.exitcode == 0 else f"{error}, exit code {process.exitcode}"
+                logging.error(f"Configuration {configuration} failed: {error}")
+                if failed is not None:
+                    failed.append((configuration, error))
+                continue
+
+            row = {name: _toCell(value) for (name, value) in itertools.chain(configuration.items(), result.items())}
+            _appendRow(path, row)
+            rows.append(row)
+
+    return rows
+
+def _appendRow(path:str, row:dict):
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    if exists:
+        with open(path, newline='') as file:
+            fieldnames = next(csv.reader(file))
+    else:
+        fieldnames = list(row)
+
+    with open(path, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        if not exists:
+            writer.writeheader()
+        writer.writerow(row)
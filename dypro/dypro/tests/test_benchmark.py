@@ -0,0 +1,35 @@
+import os
+import unittest
+import tempfile
+
+from ..benchmark import measure, writeReport, readReport, compareReports, benchmarkName
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_measure(self):
+        result = measure(lambda: sum(range(100)), repeat=3, number=10)
+
+        self.assertEqual(result['number'], 10)
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertLessEqual(result['median'], result['max'])
+    
+    def test_report_round_trip(self):
+        results = [{'name': 'sampling', 'parameters': {'size': 10}, 'min': 1e-3}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reports', 'micro.json')
+            writeReport(path, results, suite='micro')
+            report = readReport(path)
+
+        self.assertEqual(report['suite'], 'micro')
+        self.assertListEqual(report['results'], results)
+        self.assertIn('numpy', report['environment'])
+
+    def test_compare_reports(self):
+        base = {'results': [{'name': 'a', 'parameters': {'size': 10}, 'min': 4.0}, {'name': 'b', 'min': 1.0}]}
+        report = {'results': [{'name': 'a', 'parameters': {'size': 10}, 'min': 2.0}, {'name': 'c', 'min': 1.0}]}
+
+        self.assertListEqual(compareReports(base, report), [('a[size=10]', 4.0, 2.0, 2.0)])
+        self.assertEqual(benchmarkName({'name': 'b'}), 'b[]')
+
+if __name__ == '__main__':
+    unittest.main()
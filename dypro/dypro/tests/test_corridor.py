@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+from ..corridor import corridorGrids, solveCorridor
+from ..grid import Grid
+from .test_solve import InventoryProblem, solveScalar
+
+class CorridorTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.problem = InventoryProblem()
+
+    def test_corridor_grids(self):
+        grids = corridorGrids([2, 1, 4], 0, 4, 1, corridorWidth=1)
+
+        self.assertEqual(grids[0], Grid(2, 2, 1))
+        self.assertEqual(grids[1], Grid(0, 2, 1))
+        self.assertEqual(grids[2], Grid(3, 4, 1))
+    
+    def test_corridor_grids_tuple(self):
+        grids = corridorGrids([(0, 4), (1, 1)], (0, 0), (4, 4), (1, 2), corridorWidth=1)
+
+        self.assertEqual(grids[0].states(), [(0, 4)])
+        self.assertEqual(grids[1], Grid((0, 0), (2, 3), (1, 2)))
+
+    def test_scalar_equal_full_grid(self):
+        p = self.problem
+        FFull, _ = solveScalar(p)
+        F, policy, history = solveCorridor(p.numberOfStages, 0, 4, [2, 1], 2, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.transitionFunction, p.elementaryCost, corridorWidth=1, inf=p.inf)
+
+        self.assertEqual(F[0, 2], FFull[0, 2])
+        self.assertEqual([h['period'] for h in history], [2, 1, 1])
+        self.assertEqual(len(history[-1]['trajectory']), p.numberOfStages + 1)
+    
+    def test_vectorized_equal_scalar(self):
+        p = self.problem
+        _, _, scalarHistory = solveCorridor(p.numberOfStages, 0, 4, [2, 1], 2, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.transitionFunction, p.elementaryCost, corridorWidth=1, inf=p.inf)
+        _, _, history = solveCorridor(p.numberOfStages, 0, 4, [2, 1], 2, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, corridorWidth=1, vectorized=True, inf=p.inf)
+
+        self.assertEqual([h['cost'] for h in scalarHistory], [h['cost'] for h in history])
+        self.assertEqual(scalarHistory[-1]['trajectory'], history[-1]['trajectory'])
+    
+    def test_initial_state_out_of_the_coarse_grid(self):
+        p = self.problem
+        FFull, _ = solveScalar(p)
+        # 1 is not on the coarse grid of period 2, the cost is of 1 on all the iterations
+        F, policy, history = solveCorridor(p.numberOfStages, 0, 4, [2, 1], 1, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.transitionFunction, p.elementaryCost, corridorWidth=1, inf=p.inf)
+
+        self.assertEqual(F[0, 1], FFull[0, 1])
+        self.assertTrue(all(h['trajectory'][0] == 1 for h in history if h['trajectory'] is not None))
+
+    def test_widen_infeasible_corridor(self):
+        p = self.problem
+        # a corridor of 0 samples only has the coarse trajectory, that is widened if it is infeasible
+        FFull, _ = solveScalar(p)
+        F, policy, history = solveCorridor(p.numberOfStages, 0, 4, [2, 1], 2, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.transitionFunction, p.elementaryCost, corridorWidth=0, inf=p.inf)
+
+        self.assertIsNone(history[1]['trajectory'])
+        self.assertEqual(F[0, 2], FFull[0, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,4 +56,9 @@ class DynamicProblemTestCase(unittest.TestCase):
         a = range(5)
         gen = generatorFromLIst([0,1,2,3,4])
         self.assertNotEqual(a, gen)
-    
\ No newline at end of file
+    
+    def test_F_of_unknown_state_is_inf_without_insert(self):
+        dp = self.DP(5, 100, F=dict())
+
+        self.assertEqual(dp.F(0, 1), 100)
+        self.assertEqual(dp.accOptimalCost(), dict())
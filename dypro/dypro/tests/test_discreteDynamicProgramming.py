@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+
+from ..discreteDynamicProgramming import DiscreteDynamicProgramming
+from ..solve import solve
+from .test_solve import InventoryProblem
+
+class ScalarInventoryProblem(InventoryProblem, DiscreteDynamicProgramming):
+    """
+    InventoryProblem with only the scalar callbacks
+    """
+    def __init__(self):
+        DiscreteDynamicProgramming.__init__(self, numberOfStages=3, inf=1000)
+
+    def initialState(self):
+        return 0
+
+class BatchInventoryProblem(ScalarInventoryProblem):
+    """
+    InventoryProblem with batch callbacks
+    """
+    def elementaryCostBatch(self, k, states, decisions):
+        return [3, 5, 3][k]*decisions + states + 2*(decisions>0)
+
+    def transitionBatch(self, k, states, decisions):
+        return states + decisions - self.demand(k)
+
+class DelayProblem(ScalarInventoryProblem):
+    """
+    Tuple states of (stock, last decision), that pay to change the decision
+    """
+    def state(self, k):
+        return [(x, u) for x in range(0, 5) for u in range(0, 4)]
+
+    def elementaryCost(self, k, state, decision):
+        return super().elementaryCost(k, state[0], decision) + abs(decision - state[1])
+
+    def transitionFunction(self, k, state, decision):
+        return (state[0] + decision - self.demand(k), decision)
+
+    def finalStateCost(self, state):
+        return super().finalStateCost(state[0])
+
+    def solveInfeasibility(self, k, state, FMap):
+        return (state, self.inf) if (k, state) not in FMap else (state, FMap[k, state])
+
+def solveProblem(problem, **options):
+    return solve(problem.state, problem.numberOfStages, lambda x: float(problem.finalStateCost(x)), problem.decision,
+        problem.solveInfeasibility, problem.transitionFunction, problem.elementaryCost, inf=problem.inf, **options)
+
+class DiscreteDynamicProgrammingTestCase(unittest.TestCase):
+
+    def test_batchCallbacks_only_returns_overridden(self):
+        self.assertEqual(ScalarInventoryProblem().batchCallbacks(), dict())
+        self.assertEqual(set(BatchInventoryProblem().batchCallbacks()), {'elementaryCostBatch', 'transitionBatch'})
+
+    def test_default_batch_calls_scalar_callbacks(self):
+        scalar, batch = (ScalarInventoryProblem(), BatchInventoryProblem())
+        states, decisions = (np.arange(5)[:, np.newaxis], np.arange(4)[np.newaxis, :])
+
+        for k in range(3):
+            np.testing.assert_array_equal(scalar.elementaryCostBatch(k, states, decisions), batch.elementaryCostBatch(k, states, decisions))
+            np.testing.assert_array_equal(scalar.transitionBatch(k, states, decisions), batch.transitionBatch(k, states, decisions))
+        np.testing.assert_array_equal(scalar.finalStateCostBatch(np.arange(5)), [1000, 0, 0, 0, 0])
+
+    def test_default_batch_of_tuple_states(self):
+        problem = DelayProblem()
+        states = np.array([(1, 0), (2, 3)])[:, np.newaxis, :]
+
+        nextStates = problem.transitionBatch(0, states, np.arange(4)[np.newaxis, :])
+        self.assertEqual(nextStates.shape, (2, 4, 2))
+        np.testing.assert_array_equal(nextStates[1, 3], problem.transitionFunction(0, (2, 3), 3))
+        np.testing.assert_array_equal(problem.finalStateCostBatch(np.array([(0, 1), (1, 1)])), [1000, 0])
+
+    def test_solve_with_batch_callbacks(self):
+        problem = BatchInventoryProblem()
+        FMap, policy = solveProblem(problem)
+
+        self.assertEqual(solveProblem(problem, **problem.batchCallbacks()), (FMap, policy))
+
+    def test_solve_with_default_batch_of_tuple_states(self):
+        problem = DelayProblem()
+        FMap, policy = solveProblem(problem)
+
+        self.assertEqual(solveProblem(problem, transitionBatch=problem.transitionBatch,
+            elementaryCostBatch=problem.elementaryCostBatch), (FMap, policy))
+
+if __name__ == '__main__':
+    unittest.main()
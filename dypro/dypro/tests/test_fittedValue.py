@@ -0,0 +1,92 @@
+import functools
+import unittest
+import numpy as np
+
+from ..fittedValue import FittedValue, PolynomialBasis, RadialBasis
+from ..productSpace import ProductSpace
+
+class FittedValueTestCase(unittest.TestCase):
+    """
+    Linear quadratic problem x_{k+1} = x_k + u_k with cost x_k^2 + u_k^2 and final cost x_n^2,
+    whose cost-to-go is p_k x^2 with p_n = 1 and p_k = 1 + p_{k+1}/(1 + p_{k+1})
+    """
+
+    def setUp(self):
+        self.numberOfStages = 3
+        self.p = [1.0]
+        for _ in range(self.numberOfStages):
+            self.p.insert(0, 1 + self.p[0]/(1 + self.p[0]))
+
+    def fittedValue(self, bounds=(-2, 2), decisions=np.linspace(-3, 3, 601), square=lambda x: x*x, **options):
+        return FittedValue(lambda k: bounds, self.numberOfStages, square, lambda k: decisions, lambda k, x, u: x + u,
+            lambda k, x, u: square(x) + square(u), samples=200, seed=342, **options)
+
+    def test_quadratic_cost_to_go(self):
+        fittedValue = self.fittedValue()
+        history = fittedValue.solve()
+
+        self.assertEqual([h['stage'] for h in history], [0, 1, 2])
+        self.assertTrue(all(h['feasible'] == 200 and h['rmse'] < 1e-3 for h in history))
+        for k in range(self.numberOfStages + 1):
+            self.assertAlmostEqual(fittedValue.F(k, 1.5), self.p[k]*1.5**2, delta=1e-3)
+
+        # coefficients of 1, z and z^2, of the state scaled to z = x/2
+        np.testing.assert_allclose(fittedValue.coefficients(0), [0, 0, self.p[0]*4], atol=1e-3)
+
+    def test_policy_and_trajectory(self):
+        fittedValue = self.fittedValue()
+        fittedValue.solve()
+        states, decisions = fittedValue.optimalTrajectory(1.5)
+
+        self.assertAlmostEqual(fittedValue.policy(0, 1.5), -self.p[1]/(1 + self.p[1])*1.5, delta=0.01)
+        self.assertEqual(len(states), self.numberOfStages + 1)
+        self.assertEqual(decisions[0], fittedValue.policy(0, 1.5))
+        self.assertAlmostEqual(states[1], 1.5 + decisions[0])
+
+    def test_states_out_of_the_bounds(self):
+        fittedValue = self.fittedValue()
+        fittedValue.solve()
+
+        self.assertEqual(fittedValue.F(1, 2.5), np.inf)
+        np.testing.assert_array_equal(fittedValue.values(1, np.array([0, 3])) == np.inf, [False, True])
+        # no decision keeps 2 inside of the bounds with these decisions
+        self.assertIsNone(FittedValue(lambda k: (-2, 2), 1, lambda x: x*x, lambda k: [1], lambda k, x, u: x + u,
+            lambda k, x, u: u, seed=342).policy(0, 2))
+
+    def test_tuple_states(self):
+        d = np.linspace(-3, 3, 61)
+        fittedValue = self.fittedValue(bounds=((-2, -2), (2, 2)), decisions=ProductSpace(d, d),
+            square=lambda x: np.sum(x*x, axis=-1))
+        fittedValue.solve()
+
+        self.assertAlmostEqual(fittedValue.F(0, (1.5, -1)), self.p[0]*(1.5**2 + 1), delta=0.05)
+        self.assertIsInstance(fittedValue.policy(0, (1.5, -1)), tuple)
+
+    def test_radial_basis(self):
+        fittedValue = self.fittedValue(basis=functools.partial(RadialBasis, centers=20, seed=342))
+        fittedValue.solve()
+
+        self.assertAlmostEqual(fittedValue.F(0, 1.5), self.p[0]*1.5**2, delta=0.05)
+
+    def test_state_sampler(self):
+        sampled = list()
+        def sampler(k, samples, rng):
+            sampled.append(k)
+            return np.linspace(-2, 2, samples)
+
+        fittedValue = self.fittedValue(stateSampler=sampler)
+        fittedValue.solve()
+
+        self.assertEqual(sampled, [2, 1, 0])
+        self.assertAlmostEqual(fittedValue.F(0, 1.5), self.p[0]*1.5**2, delta=1e-3)
+
+class PolynomialBasisTestCase(unittest.TestCase):
+
+    def test_monomials(self):
+        basis = PolynomialBasis((0, 0), (2, 4), degree=2)
+        # scaled to (0, 0.5): 1, z1, z2, z1^2, z1 z2, z2^2
+        np.testing.assert_allclose(basis(np.array([[1, 3]])), [[1, 0, 0.5, 0, 0, 0.25]])
+        self.assertEqual(basis.size(), 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+
+from ..grid import Grid
+from ..utils import sampling, nearestSample
+
+class GridTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        pass
+
+    def test_points_equal_sampling(self):
+        grid = Grid(12800, 21200, 300)
+
+        self.assertListEqual(list(sampling(12800, 21200, 300)), grid.states())
+    
+    def test_points_of_2_variables(self):
+        grid = Grid((0, 0), (1, 2), (1, 1))
+        result = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+
+        self.assertEqual(grid.shape(), (2, 3))
+        self.assertListEqual(result, grid.states())
+
+    def test_snap_equal_nearestSample(self):
+        grid = Grid(0, 10, 3)
+        values = [0, 1.4, 1.5, 4.5, 8.9, 9.7, 10]
+        index, feasible = grid.snap(values)
+
+        self.assertListEqual([nearestSample(v, 0, 10, 3) for v in values], [grid.state(i) for i in index])
+        self.assertTrue(feasible.all())
+    
+    def test_snap_outside_is_infeasible(self):
+        grid = Grid((0, 0), (1, 1), (0.5, 0.5))
+        index, feasible = grid.snap([[-0.1, 0.5], [0.5, 0.5], [0.5, 1.2]])
+
+        self.assertListEqual([False, True, False], feasible.tolist())
+        self.assertEqual(grid.state(index[1]), (0.5, 0.5))
+    
+    def test_interpolate_equal_interp(self):
+        grid = Grid(0, 10, 4)
+        values = np.array([0., 8., 4., 1.])
+        points = [0, 2.5, 7, 9.5, 10]
+
+        np.testing.assert_allclose(grid.interpolate(values, points), np.interp(points, grid.axis(), values))
+        self.assertEqual(grid.interpolate(values, 10.5), np.inf)
+    
+    def test_interpolate_bilinear(self):
+        grid = Grid((0, 0), (1, 2), (1, 1))
+        values = np.arange(6.)
+
+        np.testing.assert_allclose(grid.interpolate(values, [(0.5, 0.5), (1, 2), (0, 1.5)]), [2, 5, 1.5])
+    
+    def test_interpolate_infeasible_neighbor(self):
+        grid = Grid(0, 2, 1)
+
+        self.assertListEqual(grid.interpolate([0, 100, 1], [0.5, 2, 1.5], inf=100).tolist(), [100, 1, 100])
+
+    def test_index_of_state(self):
+        grid = Grid(0, 1, 0.1)
+
+        self.assertEqual(grid.index(0.3), 3)
+        self.assertEqual(grid.index(0.35), -1)
+        self.assertEqual(grid.index(2), -1)
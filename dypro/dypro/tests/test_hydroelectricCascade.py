@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+
+from ..hydroelectricCascade import HydroelectricCascade
+from ..hydroelectricProduction import HydroelectricProduction
+
+def plant(minVolume, maxVolume, capacity=1000):
+    return HydroelectricProduction(efficiency=0.9, gravity=10, minReservatoryVolume=minVolume, maxReservatoryVolume=maxVolume,
+        minTurbineFlow=100, maxTurbineFlow=1000, maxProductionCapacity=capacity,
+        uprightPolinomy=lambda x: 300 + 0.001*x, downstreamPolinomy=lambda x: 250 + 0.01*x)
+
+class HydroelectricCascadeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # 0 and 1 flow into 2
+        self.cascade = HydroelectricCascade([plant(0, 1000), plant(0, 2000), plant(0, 3000)], [2, 2, None],
+            lambda k: (10, 20, 30), lambda k: 1e6)
+
+    def test_order_is_upstream_first(self):
+        self.assertEqual(self.cascade.order()[-1], 2)
+        self.assertEqual(set(self.cascade.order()), {0, 1, 2})
+        self.assertEqual(HydroelectricCascade([plant(0, 1), plant(0, 1)], [None, 0], lambda k: (0, 0), lambda k: 1).order(), [1, 0])
+
+    def test_invalid_topology(self):
+        with self.assertRaisesRegex(Exception, "cycle"):
+            HydroelectricCascade([plant(0, 1), plant(0, 1)], [1, 0], lambda k: (0, 0), lambda k: 1)
+        with self.assertRaisesRegex(Exception, "Unknown downstream plant 5"):
+            HydroelectricCascade([plant(0, 1)], [5], lambda k: (0,), lambda k: 1)
+
+    def test_routed_inflow(self):
+        np.testing.assert_array_equal(self.cascade.routedInflow(0, [1, 2, 3]), [10, 20, 33])
+
+    def test_next_volumes_of_all_states_and_decisions(self):
+        volumes = np.array([[100, 200, 300], [400, 500, 600]])[:, np.newaxis, :]
+        releases = np.array([[0, 0, 0], [10, 20, 60]])[np.newaxis, :, :]
+
+        nextVolumes = self.cascade.nextVolumes(0, volumes, releases)
+        self.assertEqual(nextVolumes.shape, (2, 2, 3))
+        np.testing.assert_array_equal(nextVolumes[0, 0], [110, 220, 330])
+        # the releases of plants 0 and 1 are routed to plant 2
+        np.testing.assert_array_equal(nextVolumes[1, 1], [400, 500, 600])
+
+    def test_generated_energy_is_the_sum_of_the_plants(self):
+        volumes = np.array([[100, 200, 300], [400, 500, 600]])[:, np.newaxis, :]
+        releases = np.array([[150, 300, 500], [900, 900, 900]])[np.newaxis, :, :]
+
+        energy = self.cascade.plantEnergy(volumes, releases)
+        expected = [[[min(1000, self.cascade.plant(i).generatedEnergy(volumes[s, 0, i], releases[0, d, i])) for i in range(3)]
+                     for d in range(2)] for s in range(2)]
+
+        np.testing.assert_allclose(energy, expected)
+        np.testing.assert_allclose(self.cascade.generatedEnergy(volumes, releases), np.sum(expected, axis=-1))
+        self.assertEqual(self.cascade.maxProductionCapacity(), 3000)
+
+    def test_release_bounds_keep_the_feasible_releases(self):
+        volumes = self.cascade.stateGrid((250, 500, 750)).points()[:, np.newaxis, :]
+        flows = np.linspace(0, 300, 7)
+        releases = np.stack(np.meshgrid(flows, flows, flows, indexing='ij'), axis=-1).reshape(1, -1, 3)
+
+        nextVolumes = self.cascade.nextVolumes(0, volumes, releases)
+        feasible = np.all((nextVolumes >= 0) & (nextVolumes <= (1000, 2000, 3000)), axis=-1)
+        low, high = self.cascade.releaseBounds(0, volumes)
+        inside = np.all((releases >= low) & (releases <= high), axis=-1)
+
+        self.assertTrue(np.all(inside[feasible]))
+        self.assertLess(np.count_nonzero(inside), inside.size)
+        # the plants upstream are not bounded by the releases of other plants
+        np.testing.assert_allclose(low[..., 0], 10 + volumes[..., 0] - 1000 - 1e-6)
+
+    def test_state_grid(self):
+        grid = self.cascade.stateGrid((500, 1000, 1500))
+
+        self.assertEqual(grid.shape(), (3, 3, 3))
+        self.assertEqual(grid.states()[-1], (1000, 2000, 3000))
+
+class HydroelectricProductionTestCase(unittest.TestCase):
+
+    def plant(self, uprightPolinomy, downstreamPolinomy=(250, 0.01)):
+        return HydroelectricProduction(efficiency=0.9, gravity=10, minReservatoryVolume=0, maxReservatoryVolume=1000,
+            minTurbineFlow=100, maxTurbineFlow=1000, maxProductionCapacity=1000,
+            uprightPolinomy=uprightPolinomy, downstreamPolinomy=downstreamPolinomy)
+
+    def test_coefficients_equal_function(self):
+        volumes, flows = np.array([0, 250, 1000]), np.array([100, 400, 1000])
+
+        np.testing.assert_allclose(self.plant((300, 0.001, -1e-7)).generatedEnergyBatch(volumes, flows),
+            plant(0, 1000).generatedEnergyBatch(volumes, flows) - 0.9*10*1e-3*1e-7*volumes**2*flows)
+        self.assertEqual(self.plant((300, 0.001)).uprightHeight(500), 300.5)
+
+    def test_parameters_of_the_coefficients(self):
+        # the second polinomy adds 1e-9*x*(x - 500)*(x - 1000), equal on the bounds and the middle of the volumes
+        self.assertNotEqual(self.plant((300, 0.001)).parameters(), self.plant((300, 0.0015, -1.5e-6, 1e-9)).parameters())
+        self.assertEqual(self.plant((300, 0.001)).parameters()['uprightPolinomy'], [300, 0.001])
+        with self.assertRaises(TypeError):
+            plant(0, 1000).parameters()
+
+if __name__ == '__main__':
+    unittest.main()
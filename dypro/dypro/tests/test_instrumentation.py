@@ -0,0 +1,138 @@
+import io
+import json
+import unittest
+import numpy as np
+
+from ..instrumentation import MetricsRecorder, StageCallback, JsonSink
+from ..solve import solve, solveVectorized, solveStochastic
+from ..discreteDynamicProblem import DiscreteDynamicProblem
+from .test_solve import InventoryProblem, StochasticInventoryProblem
+
+class ClassInventoryProblem(DiscreteDynamicProblem):
+    """
+    InventoryProblem solved by DiscreteDynamicProblem
+    """
+
+    def __init__(self):
+        self.problem = InventoryProblem()
+        DiscreteDynamicProblem.__init__(self, self.problem.numberOfStages, inf=self.problem.inf, F=dict(), policy=dict())
+
+    def state(self, k):
+        return self.problem.state(k)
+
+    def decision(self, k):
+        return self.problem.decision(k)
+
+    def elementaryCost(self, k, state, decision):
+        return self.problem.elementaryCost(k, state, decision)
+
+    def finalStateCost(self, state):
+        return float(self.problem.finalStateCost(state))
+
+    def transitionFunction(self, k, state, decision):
+        return self.problem.transitionFunction(k, state, decision)
+
+    def initialState(self):
+        return 2
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.problem = InventoryProblem()
+
+    def solve(self, instrumentation=None):
+        p = self.problem
+        return solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, instrumentation=instrumentation)
+
+    def test_same_solution(self):
+        self.assertEqual(self.solve(MetricsRecorder()), self.solve())
+
+    def test_stage_metrics(self):
+        recorder = MetricsRecorder()
+        self.solve(recorder)
+
+        self.assertEqual([m['stage'] for m in recorder.stages], [2, 1, 0])
+        for metrics in recorder.stages:
+            self.assertEqual(metrics['solver'], 'solve')
+            self.assertEqual(metrics['evaluations'], 5*4)
+            self.assertLessEqual(metrics['infeasibleMapMisses'], metrics['infeasibleTransitions'])
+            self.assertGreaterEqual(metrics['callbackTime'], 0)
+            self.assertAlmostEqual(metrics['engineTime'] + metrics['callbackTime'], metrics['elapsed'])
+            self.assertIsNone(metrics['storeBytes'])
+
+        # stage 2 has demand 1, next stocks below 0 or above 4 are out of the map and an empty stock costs inf
+        self.assertEqual(recorder.stages[0]['infeasibleTransitions'], 6)
+        self.assertEqual(recorder.stages[0]['infeasibleMapMisses'], 3)
+
+        self.assertEqual(len(recorder.solves), 1)
+        self.assertEqual(recorder.solves[0]['evaluations'], 3*5*4)
+        self.assertEqual(recorder.solves[0]['numberOfStages'], 3)
+
+    def test_vectorized(self):
+        p = self.problem
+        recorder = MetricsRecorder()
+        FMap, policy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, instrumentation=recorder)
+
+        self.assertEqual([m['evaluations'] for m in recorder.stages], [20, 20, 20])
+        self.assertEqual(recorder.stages[0]['infeasibleTransitions'], 6)
+        self.assertEqual(FMap, self.solve()[0])
+
+    def test_vectorized_counts_the_evaluated_pairs(self):
+        p = self.problem
+        recorder = MetricsRecorder()
+        # only the decision equal to the state is inside of the bounds, of the states 0 to 3
+        solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision, p.transitionFunction, p.elementaryCost,
+            inf=p.inf, instrumentation=recorder, decisionBounds=lambda k, X: (X, X))
+        solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision, p.transitionFunction, p.elementaryCost,
+            inf=p.inf, instrumentation=recorder, reachable=[np.array([1, 2])]*p.numberOfStages)
+
+        self.assertEqual([m['evaluations'] for m in recorder.stages], [4, 4, 4, 2*4, 2*4, 2*4])
+
+    def test_stochastic(self):
+        p = StochasticInventoryProblem()
+        recorder = MetricsRecorder()
+        solveStochastic(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.realizableRandomValues, p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf,
+            instrumentation=recorder)
+
+        self.assertEqual([m['evaluations'] for m in recorder.stages], [5*4*2]*3)
+
+    def test_class_solver(self):
+        recorder = MetricsRecorder()
+        problem = ClassInventoryProblem()
+        problem.solve(instrumentation=recorder)
+
+        self.assertEqual(problem.accOptimalCost(), self.solve()[0])
+        # stage 2: 20 transitions, 6 of them infeasible, whose elementary cost is not evaluated
+        self.assertEqual(recorder.stages[0]['evaluations'], 20)
+        self.assertEqual(recorder.stages[0]['infeasibleTransitions'], 6)
+        for metrics in recorder.stages:
+            self.assertEqual(metrics['solver'], 'ClassInventoryProblem')
+            self.assertGreater(metrics['callbackTime'], 0)
+            self.assertAlmostEqual(metrics['engineTime'] + metrics['callbackTime'], metrics['elapsed'])
+        self.assertEqual(recorder.solves[0]['infeasibleMapMisses'], 0)
+
+    def test_class_solver_with_workers(self):
+        recorder = MetricsRecorder()
+        ClassInventoryProblem().solve(workers=2, instrumentation=recorder)
+
+        self.assertTrue(all(m['evaluations'] is None and m['callbackTime'] is None for m in recorder.stages))
+        self.assertEqual([m['states'] for m in recorder.stages], [5, 5, 5])
+
+    def test_stage_callback(self):
+        stages = list()
+        self.solve(StageCallback(lambda metrics: stages.append(metrics['stage'])))
+        self.assertEqual(stages, [2, 1, 0])
+
+    def test_json_sink(self):
+        file = io.StringIO()
+        self.solve(JsonSink(file))
+
+        events = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([e['event'] for e in events], ['solveStarted'] + ['stageSolved']*3 + ['solveFinished'])
+        self.assertEqual(events[-1]['evaluations'], 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from ..parallel import splitChunks, parallelStage
+
+class ParallelTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        pass
+
+    def test_split_chunks_keep_order(self):
+        chunks = splitChunks(list(range(10)), 3)
+
+        self.assertListEqual([[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]], chunks)
+    
+    def test_split_chunks_more_chunks_than_itens(self):
+        chunks = splitChunks([1, 2], 4)
+
+        self.assertListEqual([[1], [2]], chunks)
+
+    def test_parallel_stage_equal_sequential(self):
+        offset = 3
+        evaluate = lambda x: (x*x + offset, x - 1)
+        states = list(range(20))
+
+        self.assertListEqual([evaluate(x) for x in states], parallelStage(evaluate, states, workers=3))
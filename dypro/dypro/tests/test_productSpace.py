@@ -0,0 +1,58 @@
+import itertools
+import unittest
+import numpy as np
+
+from ..productSpace import ProductSpace
+from ..solve import solve
+from .test_solve import InventoryProblem
+
+class ProductSpaceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.axes = [range(0, 3), [10, 20], [0.5, 1.5, 2.5, 3.5]]
+        self.space = ProductSpace(*self.axes)
+        self.tuples = list(itertools.product(*self.axes))
+
+    def test_iteration_is_row_major(self):
+        self.assertEqual(list(self.space), self.tuples)
+        self.assertEqual(len(self.space), 24)
+        self.assertEqual(self.space.shape(), (3, 2, 4))
+        self.assertEqual(self.space.ndim(), 3)
+
+    def test_index_and_tuple(self):
+        for i, value in enumerate(self.tuples):
+            self.assertEqual(self.space[i], value)
+            self.assertEqual(self.space.index(value), i)
+
+        self.assertEqual(self.space[-1], self.tuples[-1])
+        with self.assertRaises(IndexError):
+            self.space[24]
+
+    def test_tuple_out_of_the_space(self):
+        self.assertEqual(self.space.index((0, 15, 0.5)), -1)
+        self.assertEqual(self.space.index((0, 10)), -1)
+        self.assertIn((2, 20, 3.5), self.space)
+        self.assertNotIn((3, 20, 3.5), self.space)
+
+    def test_points(self):
+        points = self.space.points()
+
+        np.testing.assert_array_equal(points, np.array(self.tuples))
+        np.testing.assert_array_equal(np.asarray(self.space), points)
+        np.testing.assert_array_equal(self.space.coordinates()[1], points[:, 1])
+
+    def test_solve_with_product_space_of_decisions(self):
+        p = InventoryProblem()
+        decisions = ProductSpace(range(0, 4))
+        solveWith = lambda decision, transitionFunction, elementaryCost: solve(p.state, p.numberOfStages,
+            lambda x: float(p.finalStateCost(x)), decision, p.solveInfeasibility, transitionFunction, elementaryCost, inf=p.inf)
+
+        FMap, policy = solveWith(p.decision, p.transitionFunction, p.elementaryCost)
+        spaceFMap, spacePolicy = solveWith(lambda k: decisions, lambda k, x, u: p.transitionFunction(k, x, u[0]),
+            lambda k, x, u: p.elementaryCost(k, x, u[0]))
+
+        self.assertEqual(spaceFMap, FMap)
+        self.assertEqual({key: None if u is None else u[0] for (key, u) in spacePolicy.items()}, policy)
+
+if __name__ == '__main__':
+    unittest.main()
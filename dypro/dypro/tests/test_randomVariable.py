@@ -1,4 +1,6 @@
+import pickle
 import unittest
+import numpy as np
 
 from ..randomVariable import RandomVariable
 from ..randomVariable import ValueProbability
@@ -84,4 +86,38 @@ class RandomVariableTestCase(unittest.TestCase):
         probs = [1]
         with self.assertRaisesRegex(Exception, "Number of values is not equal probabilities"):
             a = RandomVariable(values, probs)
-    
+
+    def test_random_variable_arrays(self):
+        a = RandomVariable([(1, 2), (3, 4)], [0.25, 0.75])
+
+        np.testing.assert_array_equal(a.values(), [[1, 2], [3, 4]])
+        np.testing.assert_array_equal(a.probabilities(), [0.25, 0.75])
+        self.assertEqual(a.valueList(), [(1, 2), (3, 4)])
+        self.assertEqual(a.randomValue()[1].getValue(), (3, 4))
+        self.assertEqual(len(a), 2)
+
+    def test_random_variable_is_immutable(self):
+        a = RandomVariable([1, 2], [0.5, 0.5])
+
+        with self.assertRaises(AttributeError):
+            a.x = 1
+        with self.assertRaises(ValueError):
+            a.probabilities()[0] = 1
+
+    def test_random_variable_invalid_atom_probability(self):
+        with self.assertRaises(TypeError):
+            a = RandomVariable([1, 2], [1.5, -0.5])
+
+    def test_random_variable_expectation(self):
+        a = RandomVariable([1, 2, 3], [0.2, 0.5, 0.3])
+        outcomes = np.arange(12).reshape(2, 2, 3)
+
+        np.testing.assert_allclose(a.expectation(outcomes), outcomes @ [0.2, 0.5, 0.3])
+        np.testing.assert_allclose(a.expectation(outcomes.transpose(2, 0, 1), axis=0), outcomes @ [0.2, 0.5, 0.3])
+        self.assertAlmostEqual(a.mean(), 2.1)
+
+    def test_random_variable_pickle(self):
+        a = pickle.loads(pickle.dumps(RandomVariable([1, 2], [0.3, 0.7])))
+
+        self.assertEqual(a.valueList(), [1, 2])
+        np.testing.assert_array_equal(a.probabilities(), [0.3, 0.7])
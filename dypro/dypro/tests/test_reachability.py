@@ -0,0 +1,152 @@
+import unittest
+import numpy as np
+
+from ..grid import Grid
+from ..reachability import reachableIndexes, reachableStates, reachableBounds, feasibleIndexes
+from ..solve import solve, solveVectorized
+from .test_solve import InventoryProblem
+
+class ReachabilityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.problem = InventoryProblem()
+        self.initialState = 2
+
+    def reachable(self, vectorized=False):
+        p = self.problem
+        return reachableStates(self.initialState, p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction,
+            vectorized=vectorized)
+
+    def test_reachable_states(self):
+        self.assertEqual(self.reachable(), [[2], [0, 1, 2, 3], [0, 1, 2], [0, 1, 2, 3, 4]])
+        self.assertEqual(self.reachable(vectorized=True), self.reachable())
+
+    def test_reachable_bounds(self):
+        p = self.problem
+        reachable = reachableIndexes(self.initialState, p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction)
+
+        self.assertEqual(reachableBounds(p.stateGrid, reachable), [(2, 2), (0, 3), (0, 2), (0, 4)])
+        self.assertEqual(reachableBounds(p.stateGrid, [np.array([], dtype=np.int64)]), [None])
+
+    def test_interpolated_next_states_reach_the_corners(self):
+        stateGrid = lambda k: Grid(0, 4, 2)
+        transition = lambda k, x, u: x + u
+        nearest = reachableIndexes(0, 1, stateGrid, lambda k: [1.5], transition)
+        corners = reachableIndexes(0, 1, stateGrid, lambda k: [1.5], transition, interpolate=True)
+
+        np.testing.assert_array_equal(nearest[1], [1])
+        np.testing.assert_array_equal(corners[1], [0, 1])
+
+    def test_initial_state_outside_of_the_grid(self):
+        p = self.problem
+        with self.assertRaisesRegex(Exception, "outside of the grid"):
+            reachableIndexes(7, p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction)
+
+    def test_solve_only_reachable_states(self):
+        p = self.problem
+        solveWith = lambda reachable: solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, reachable=reachable)
+        FMap, policy = solveWith(None)
+        reachableFMap, reachablePolicy = solveWith(self.reachable())
+
+        self.assertEqual(reachableFMap[0, self.initialState], FMap[0, self.initialState])
+        self.assertEqual(reachablePolicy[0, self.initialState], policy[0, self.initialState])
+        self.assertNotIn((1, 4), reachableFMap)
+        self.assertEqual(len([key for key in reachableFMap if key[0] == 1]), 4)
+
+    def test_solve_vectorized_only_reachable_states(self):
+        p = self.problem
+        reachable = reachableIndexes(self.initialState, p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction,
+            vectorized=True)
+        solveWith = lambda reachable: solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, reachable=reachable)
+        FMap, policy = solveWith(None)
+        reachableFMap, reachablePolicy = solveWith(reachable)
+
+        for k in range(p.numberOfStages):
+            for xk in self.reachable()[k]:
+                self.assertEqual(reachableFMap[k, xk], FMap[k, xk])
+                self.assertEqual(reachablePolicy[k, xk], policy[k, xk])
+
+        self.assertEqual(reachableFMap[1, 4], p.inf)
+        self.assertIsNone(reachablePolicy[1, 4])
+
+class FeasibilityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.problem = InventoryProblem()
+
+    def assertFeasibleStatesHaveFiniteCost(self, transitionFunction, interpolate):
+        p = self.problem
+        feasible = feasibleIndexes(p.numberOfStages, p.stateGrid, p.finalStateCost, p.decision, transitionFunction,
+            vectorized=True, interpolate=interpolate, inf=p.inf)
+        FMap, _ = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision, transitionFunction,
+            p.elementaryCost, inf=p.inf, interpolate=interpolate)
+
+        for k in range(p.numberOfStages + 1):
+            finite = [i for (i, xk) in enumerate(p.stateGrid(k).states()) if FMap[k, xk] < p.inf]
+            self.assertEqual(feasible[k].tolist(), finite)
+
+    def test_feasible_states(self):
+        p = self.problem
+        feasible = feasibleIndexes(p.numberOfStages, p.stateGrid, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.transitionFunction, inf=p.inf)
+
+        self.assertEqual([f.tolist() for f in feasible], [[0, 1, 2, 3, 4], [1, 2, 3, 4], [0, 1, 2, 3, 4], [1, 2, 3, 4]])
+        self.assertFeasibleStatesHaveFiniteCost(p.transitionFunction, interpolate=False)
+
+    def test_interpolated_feasible_states(self):
+        p = self.problem
+        self.assertFeasibleStatesHaveFiniteCost(lambda k, x, u: p.transitionFunction(k, x, u) - 0.5, interpolate=True)
+
+    def test_solve_only_feasible_states(self):
+        p = self.problem
+        feasible = feasibleIndexes(p.numberOfStages, p.stateGrid, p.finalStateCost, p.decision, p.transitionFunction,
+            vectorized=True, inf=p.inf)
+        states = [[p.stateGrid(k).state(i) for i in indexes.tolist()] for (k, indexes) in enumerate(feasible)]
+        solveWith = lambda reachable: solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, reachable=reachable)
+        FMap, policy = solveWith(None)
+        feasibleFMap, feasiblePolicy = solveWith(states)
+        vectorizedFMap, vectorizedPolicy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, reachable=feasible)
+
+        self.assertNotIn((1, 0), feasibleFMap)
+        for k in range(p.numberOfStages):
+            for xk in states[k]:
+                self.assertEqual(feasibleFMap[k, xk], FMap[k, xk])
+                self.assertEqual(feasiblePolicy[k, xk], policy[k, xk])
+                self.assertEqual(vectorizedFMap[k, xk], FMap[k, xk])
+                self.assertEqual(vectorizedPolicy[k, xk], policy[k, xk])
+
+    def test_elementary_cost_is_not_evaluated_on_infeasible_decisions(self):
+        p = self.problem
+        pairs = list()
+        def elementaryCost(k, x, u):
+            pairs.append((k, x, u))
+            return p.elementaryCost(k, x, u)
+
+        FMap, _ = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, elementaryCost, inf=p.inf)
+
+        self.assertTrue(all(0 <= p.transitionFunction(k, x, u) <= 4 and FMap[k+1, p.transitionFunction(k, x, u)] < p.inf
+            for (k, x, u) in pairs))
+        self.assertEqual(FMap[1, 0], p.inf)
+
+    def test_vectorized_pruned_blocks(self):
+        p = self.problem
+        # less than 1/8 of the pairs are feasible on the last stage
+        finalStateCost = lambda x: np.where(np.asarray(x) == 4, 0, p.inf)
+        decision = lambda k: range(0, 10)
+        solveWith = lambda chunkSize: solveVectorized(p.stateGrid, p.numberOfStages, finalStateCost, decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, chunkSize=chunkSize)
+        FScalar, policyScalar = solve(p.state, p.numberOfStages, lambda x: float(finalStateCost(x)), decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf)
+
+        for chunkSize in [4, 2**22]:
+            FMap, policy = solveWith(chunkSize)
+            self.assertDictEqual(FMap, FScalar)
+            self.assertDictEqual(policy, policyScalar)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+
+from ..randomVariable import RandomVariable
+from ..scenarioReduction import reduceScenarios
+
+class ScenarioReductionTestCase(unittest.TestCase):
+
+    def test_reduce_to_1_atom_is_the_median(self):
+        reduced, error = reduceScenarios(RandomVariable([1, 2, 10], [0.3, 0.4, 0.3]), 1)
+
+        self.assertEqual(reduced.valueList(), [2])
+        np.testing.assert_allclose(reduced.probabilities(), [1])
+        self.assertAlmostEqual(error, 0.3*1 + 0.3*8)
+
+    def test_probabilities_go_to_the_nearest_atom(self):
+        samples = [0, 1, 2, 100, 101]
+        reduced, error = reduceScenarios(samples, 2)
+
+        self.assertEqual(reduced.valueList(), [2, 100])
+        np.testing.assert_allclose(reduced.probabilities(), [0.6, 0.4])
+        self.assertAlmostEqual(error, 4/5)
+
+    def test_error_decreases_with_atoms(self):
+        samples = np.random.default_rng(342).lognormal(8, 0.3, 300)
+        errors = [reduceScenarios(samples, n)[1] for n in [1, 2, 5, 10, 50]]
+
+        self.assertTrue(all(a > b for (a, b) in zip(errors, errors[1:])))
+        self.assertEqual(len(reduceScenarios(samples, 10)[0]), 10)
+
+    def test_no_reduction(self):
+        reduced, error = reduceScenarios([3, 1, 3, 2], 5)
+
+        self.assertEqual(reduced.valueList(), [1, 2, 3])
+        np.testing.assert_allclose(reduced.probabilities(), [0.25, 0.25, 0.5])
+        self.assertEqual(error, 0)
+
+    def test_tuple_values_and_order(self):
+        samples = [(0, 0), (0, 1), (10, 10), (10, 11)]
+        reduced, error = reduceScenarios(samples, 2, order=2)
+
+        self.assertEqual(len(reduced), 2)
+        self.assertIsInstance(reduced.valueList()[0], tuple)
+        self.assertAlmostEqual(error, np.sqrt(0.5))
+
+    def test_invalid_number_of_atoms(self):
+        with self.assertRaisesRegex(Exception, "at least 1"):
+            reduceScenarios([1, 2], 0)
+
+if __name__ == '__main__':
+    unittest.main()
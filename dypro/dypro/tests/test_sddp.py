@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+
+from ..hydroelectricCascade import HydroelectricCascade
+from ..randomVariable import RandomVariable
+from ..sddp import SDDP, linprog
+from .test_hydroelectricCascade import plant
+
+@unittest.skipIf(linprog is None, "scipy is not installed")
+class SDDPTestCase(unittest.TestCase):
+
+    def sddp(self, inflows, plants=1, **options):
+        # 1 m^3/s changes the volume by 10^6 m^3 on a stage
+        cascade = HydroelectricCascade([plant(0, 1000) for _ in range(plants)], [i + 1 for i in range(plants - 1)] + [None],
+            lambda k: (0,)*plants, lambda k: 1e6)
+
+        return SDDP(cascade, 3, inflows, lambda k: [300, 500, 400][k], lambda g: 1e-3*g*g, (500,)*plants, seed=342, **options)
+
+    def test_deterministic_bounds_converge(self):
+        sddp = self.sddp(lambda k: RandomVariable([200], [1]))
+        history = sddp.solve(iterations=20, forwardScenarios=1, tolerance=1e-6)
+        lowerBounds = [h['lowerBound'] for h in history]
+
+        self.assertLess(len(history), 20)
+        self.assertTrue(all(a <= b + 1e-6 for (a, b) in zip(lowerBounds, lowerBounds[1:])))
+        self.assertAlmostEqual(history[-1]['lowerBound'], history[-1]['upperBound'], delta=1e-6*history[-1]['upperBound'])
+        self.assertEqual(sddp.lowerBound(), history[-1]['lowerBound'])
+
+    def test_stochastic_lower_bound(self):
+        inflows = RandomVariable([50, 200, 400], [0.3, 0.4, 0.3])
+        sddp = self.sddp(lambda k: inflows)
+        history = sddp.solve(iterations=30, forwardScenarios=20, tolerance=1e-2)
+
+        # expected cost of the policy on all the 27 scenarios, an upper bound of the optimal cost
+        def policyCost(k, volumes):
+            if k == 3:
+                return 0
+            decisions = [sddp.policy(k, volumes, inflow) for inflow in inflows.valueList()]
+            return inflows.expectation(np.array([d['cost'] + policyCost(k + 1, d['nextVolumes']) for d in decisions]))
+
+        upperBound = float(policyCost(0, (500,)))
+        self.assertLessEqual(history[-1]['lowerBound'], upperBound + 1e-6)
+        self.assertGreater(history[-1]['lowerBound'], 0.98*upperBound)
+
+        costs, volumes = sddp.simulate(30)
+        self.assertEqual(volumes.shape, (30, 4, 1))
+        np.testing.assert_array_equal(volumes[:, 0, 0], 500)
+
+    def test_water_value(self):
+        sddp = self.sddp(lambda k: RandomVariable([100, 200], [0.5, 0.5]))
+        sddp.solve(iterations=10, forwardScenarios=5)
+
+        self.assertGreaterEqual(sddp.costToGo(1, (100,)), sddp.costToGo(1, (900,)))
+        self.assertEqual(sddp.costToGo(3, (100,)), 0)
+
+    def test_cascade_routes_the_releases(self):
+        sddp = self.sddp(lambda k: RandomVariable([(200, 100)], [1]), plants=2)
+        sddp.solve(iterations=5, forwardScenarios=1)
+        decision = sddp.policy(0, (500, 500), (200, 100))
+
+        released = decision['turbinedFlows'] + decision['spilledFlows']
+        np.testing.assert_allclose(decision['nextVolumes'], [500 + 200 - released[0], 500 + 100 + released[0] - released[1]])
+        self.assertGreaterEqual(decision['thermalEnergy'], 0)
+
+    def test_final_volumes_and_cuts(self):
+        sddp = self.sddp(lambda k: RandomVariable([200], [1]), finalVolumes=(600,), finalCuts=[(0, (-1,))])
+        sddp.solve(iterations=20, forwardScenarios=1, tolerance=1e-6)
+        _, volumes = sddp.simulate(1)
+
+        self.assertGreaterEqual(volumes[0, -1, 0], 600 - 1e-6)
+        self.assertEqual(sddp.costToGo(3, (700,)), 0)
+
+    def test_inflows_of_other_plants(self):
+        sddp = self.sddp(lambda k: RandomVariable([(200, 100)], [1]))
+        with self.assertRaisesRegex(Exception, "2 plants, the cascade has 1"):
+            sddp.solve(iterations=1)
+
+if __name__ == '__main__':
+    unittest.main()
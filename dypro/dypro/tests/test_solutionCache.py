@@ -0,0 +1,61 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+from ..grid import Grid
+from ..valueStore import ValueStore
+from ..solutionCache import SolutionCache, fingerprint
+
+def smallStore(value):
+    store = ValueStore(1, Grid(0, 99, 1))
+    store.setValues(0, np.full(100, value))
+    store.setValues(1, np.zeros(100))
+    store.setPolicy(0, np.zeros(100, dtype=int), [7])
+    return store
+
+class SolutionCacheTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SolutionCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fingerprint_of_equal_definitions(self):
+        a = fingerprint(Grid(0, 10, 2), inflow=[1, 2.5], inf=np.inf, table=np.arange(3))
+        b = fingerprint(Grid(0, 10, 2), table=np.arange(3), inf=float('inf'), inflow=(1, 2.5))
+
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, fingerprint(Grid(0, 10, 2), inflow=[1, 2.5], inf=np.inf, table=np.arange(4)))
+    
+    def test_fingerprint_does_not_accept_functions(self):
+        with self.assertRaises(TypeError):
+            fingerprint(cost=lambda x: x)
+
+    def test_solve_only_on_miss(self):
+        calls = list()
+        solveFunction = lambda: calls.append(1) or smallStore(3)
+
+        first = self.cache.solve('a', solveFunction)
+        second = self.cache.solve('a', solveFunction)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.value(0, 5), 3)
+        self.assertEqual(second.policy(0, 5), 7)
+    
+    def test_evict_least_recently_used(self):
+        self.cache.put('a', smallStore(1))
+        entrySize = self.cache.size()
+        cache = SolutionCache(self.directory.name, maxBytes=int(2.5*entrySize))
+
+        cache.put('b', smallStore(2))
+        os.utime(os.path.join(self.directory.name, 'b', 'metadata.json'), (0, 0))
+        cache.get('a')
+        cache.put('c', smallStore(3))
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertLessEqual(cache.size(), int(2.5*entrySize))
@@ -0,0 +1,66 @@
+import unittest
+import tempfile
+import numpy as np
+
+from ..grid import Grid
+from ..valueStore import ValueStore
+from ..solutionFile import saveSolution, loadSolution, SolutionFile
+from ..solve import solveVectorized, optimalTrajectory
+from .test_solve import InventoryProblem
+
+class SolutionFileTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.problem = InventoryProblem()
+        p = self.problem
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf)
+        self.F, self.policy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, store=self.store)
+        saveSolution(self.directory.name, self.store, metadata={'name': 'inventory'})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_equal_saved(self):
+        store = loadSolution(self.directory.name)
+
+        self.assertDictEqual(dict(self.F), dict(store.accOptimalCost()))
+        self.assertDictEqual(dict(self.policy), dict(store.allPolicy()))
+        self.assertEqual(store.inf(), self.problem.inf)
+    
+    def test_load_is_lazy_and_memory_mapped(self):
+        store = loadSolution(self.directory.name)
+        self.assertEqual(store.nbytes(), 0)
+
+        self.assertEqual(store.value(0, 1), self.F[0, 1])
+        self.assertIsInstance(store.values(0), np.memmap)
+        self.assertEqual(store.nbytes(), store.values(0).nbytes)
+    
+    def test_optimal_trajectory_from_file(self):
+        p = self.problem
+        policy = loadSolution(self.directory.name).allPolicy()
+
+        self.assertEqual(optimalTrajectory(1, p.numberOfStages, self.policy, p.transitionFunction), 
+            optimalTrajectory(1, p.numberOfStages, policy, p.transitionFunction))
+    
+    def test_metadata_and_grid(self):
+        solution = SolutionFile(self.directory.name)
+
+        self.assertEqual(solution.metadata(), {'name': 'inventory'})
+        self.assertEqual(solution.grid(0), Grid(0, 4, 1))
+    
+    def test_rolling_store_saves_kept_stages(self):
+        p = self.problem
+        store = ValueStore(p.numberOfStages, Grid((0, 0), (1, 1), (1, 1)), rolling=True, compactPolicy=True)
+        store.setValues(1, [1, 2, 3, 4])
+        store.setPolicy(0, [0, -1, 1, 0], [(0, 1), (1, 0)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            saveSolution(directory, store)
+            loaded = loadSolution(directory)
+
+            self.assertFalse(loaded.hasValues(0))
+            self.assertEqual(loaded.value(1, (1, 0)), 3)
+            self.assertEqual(loaded.policy(0, (1, 0)), (1, 0))
+            self.assertIsNone(loaded.policy(0, (0, 1)))
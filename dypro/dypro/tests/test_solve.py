@@ -0,0 +1,300 @@
+import unittest
+import numpy as np
+
+from ..grid import Grid
+from ..solve import solve, solveVectorized, solveStochastic
+from ..randomVariable import RandomVariable
+from ..valueStore import ValueStore
+from ..utils import limit
+
+class InventoryProblem:
+    """
+    Stock between 0 and 4, buys 0 to 3 itens per stage to meet a demand
+    """
+    numberOfStages = 3
+    inf = 1000
+
+    def demand(self, k):
+        return [2, 4, 1][k]
+
+    def state(self, k):
+        return range(0, 5)
+
+    def stateGrid(self, k):
+        return Grid(0, 4, 1)
+
+    def decision(self, k):
+        return range(0, 4)
+
+    def elementaryCost(self, k, state, decision):
+        return [3, 5, 3][k]*decision + state + 2*(decision>0)
+
+    def finalStateCost(self, state):
+        return np.where(np.asarray(state)<1, self.inf, 0)
+
+    def transitionFunction(self, k, state, decision):
+        return state + decision - self.demand(k)
+
+    def decisionBounds(self, k, state):
+        # keeps the next stock between 0 and 4
+        return (self.demand(k) - state, 4 + self.demand(k) - state)
+
+    def solveInfeasibility(self, k, state, FMap):
+        if state<0 or state>4:
+            return (limit(state, 0, 4), self.inf)
+        return (state, FMap[k, state])
+
+class StochasticInventoryProblem(InventoryProblem):
+    """
+    Same problem with a random demand
+    """
+    def realizableRandomValues(self, k):
+        return RandomVariable([self.demand(k) - 1, self.demand(k)], [0.3, 0.7])
+
+    def transitionFunction(self, k, state, decision, demand):
+        return state + decision - demand
+
+def solveScalar(problem):
+    return solve(problem.state, problem.numberOfStages, lambda x: float(problem.finalStateCost(x)), problem.decision,
+        problem.solveInfeasibility, problem.transitionFunction, problem.elementaryCost, inf=problem.inf)
+
+class SolveTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.problem = InventoryProblem()
+
+    def test_vectorized_equal_scalar(self):
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        FVector, policyVector = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf)
+
+        self.assertDictEqual(FScalar, FVector)
+        self.assertDictEqual(policyScalar, policyVector)
+    
+    def test_vectorized_in_blocks(self):
+        p = self.problem
+        FVector, policyVector = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, chunkSize=4)
+        FScalar, policyScalar = solveScalar(p)
+
+        self.assertDictEqual(FScalar, FVector)
+        self.assertDictEqual(policyScalar, policyVector)
+    
+    def test_vectorized_tuple_states(self):
+        grid = Grid((0, 0), (2, 2), (1, 1))
+        transition = lambda k, x, u: x + u - 2
+        cost = lambda k, x, u: x[..., 0] + 2*x[..., 1] + 0*u[..., 0]
+        final = lambda x: np.zeros(len(x))
+        decisions = lambda k: [(0, 1), (1, 0), (1, 1)]
+
+        F, policy = solveVectorized(lambda k: grid, 1, final, decisions, transition, cost, inf=100)
+
+        self.assertEqual(F[0, (0, 0)], 100)
+        self.assertIsNone(policy[0, (0, 0)])
+        self.assertEqual(F[0, (1, 2)], 5)
+        self.assertEqual(policy[0, (2, 1)], (0, 1))
+
+    def test_interpolation_on_grid_equal_nearest(self):
+        # the next states are on the grid, so the interpolation equals their costs
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        F, policy = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, interpolationGrid=p.stateGrid)
+        FVector, policyVector = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, interpolate=True)
+
+        self.assertDictEqual(FScalar, F)
+        self.assertDictEqual(policyScalar, policy)
+        self.assertDictEqual(FScalar, FVector)
+    
+    def test_interpolation_scalar_equal_vectorized(self):
+        p = self.problem
+        grid = lambda k: Grid(0, 4, 0.5)
+        transition = lambda k, x, u: x + 0.7*u - p.demand(k)
+        F, policy = solve(lambda k: grid(k).states(), p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            None, transition, p.elementaryCost, inf=p.inf, interpolationGrid=grid)
+        FVector, policyVector = solveVectorized(grid, p.numberOfStages, p.finalStateCost, p.decision,
+            transition, p.elementaryCost, inf=p.inf, interpolate=True)
+
+        self.assertEqual(F.keys(), FVector.keys())
+        for key in F:
+            self.assertAlmostEqual(F[key], FVector[key])
+        self.assertDictEqual(policy, policyVector)
+
+    def test_monotone_equal_full_scan(self):
+        # the stock bought decreases with the stock
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost)
+
+        for workers in [1, 2]:
+            F, policy = solve(*arguments, inf=p.inf, monotone='decreasing', workers=workers)
+            self.assertDictEqual(FScalar, F)
+            self.assertDictEqual(policyScalar, policy)
+    
+    def test_monotone_scans_less_decisions(self):
+        # tracks the state with a quadratic cost, the optimal decision increases with the state
+        calls = list()
+        def cost(k, x, u):
+            calls.append(u)
+            return (u - x)**2
+        arguments = (lambda k: range(0, 64), 1, lambda x: 0, lambda k: range(0, 64), None, lambda k, x, u: 0, cost)
+
+        FFull, policyFull = solve(*arguments, interpolationGrid=lambda k: Grid(0, 63, 1))
+        fullCalls = len(calls)
+        calls.clear()
+        F, policy = solve(*arguments, interpolationGrid=lambda k: Grid(0, 63, 1), monotone='increasing')
+
+        self.assertDictEqual(FFull, F)
+        self.assertDictEqual(policyFull, policy)
+        self.assertLess(len(calls), fullCalls/4)
+
+    def test_unknown_monotone(self):
+        p = self.problem
+        with self.assertRaisesRegex(Exception, "Unknown monotone"):
+            solve(p.state, p.numberOfStages, p.finalStateCost, p.decision, p.solveInfeasibility,
+                p.transitionFunction, p.elementaryCost, monotone=True)
+
+    def test_decision_bounds_equal_full_scan(self):
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        calls = list()
+        def cost(k, x, u):
+            calls.append((k, x, u))
+            return p.elementaryCost(k, x, u)
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, cost)
+
+        for monotone in [None, 'decreasing']:
+            F, policy = solve(*arguments, inf=p.inf, monotone=monotone, decisionBounds=p.decisionBounds)
+            self.assertDictEqual(FScalar, F)
+            self.assertDictEqual(policyScalar, policy)
+
+        self.assertTrue(all(0 <= p.transitionFunction(k, x, u) <= 4 for (k, x, u) in calls))
+
+    def test_vectorized_decision_bounds(self):
+        p = self.problem
+        for decision in [p.decision, lambda k: range(0, 20)]:
+            FScalar, policyScalar = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), decision,
+                p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf)
+            for chunkSize in [4, 2**22]:
+                F, policy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, decision, p.transitionFunction,
+                    p.elementaryCost, inf=p.inf, chunkSize=chunkSize, decisionBounds=p.decisionBounds)
+                self.assertDictEqual(FScalar, F)
+                self.assertDictEqual(policyScalar, policy)
+
+    def test_decision_bounds_of_tuples(self):
+        grid = Grid((0, 0), (2, 2), (1, 1))
+        transition = lambda k, x, u: x + u - 2
+        cost = lambda k, x, u: x[..., 0] + 2*x[..., 1] + 0*u[..., 0]
+        decisions = lambda k: [(0, 1), (1, 0), (1, 1)]
+        # only (1, 1) is inside of the bounds
+        bounds = lambda k, x: ((1, 1), (2, 2))
+
+        F, policy = solveVectorized(lambda k: grid, 1, lambda x: np.zeros(len(x)), decisions, transition, cost, inf=100,
+            decisionBounds=bounds)
+        FScalar, policyScalar = solve(lambda k: grid.states(), 1, lambda x: 0, decisions, None,
+            lambda k, x, u: tuple(transition(k, np.array(x), np.array(u)).tolist()),
+            lambda k, x, u: float(cost(k, np.array(x), np.array(u))), inf=100, interpolationGrid=lambda k: grid,
+            decisionBounds=bounds)
+
+        self.assertEqual(F[0, (1, 2)], 5)
+        self.assertEqual(policy[0, (1, 2)], (1, 1))
+        self.assertEqual(F[0, (2, 0)], 100)
+        self.assertDictEqual(F, FScalar)
+        self.assertDictEqual(policy, policyScalar)
+
+    def test_interpolated_state_without_bounded_decisions(self):
+        grid = Grid((0, 0), (2, 2), (1, 1))
+        transition = lambda k, x, u: tuple(np.array(x) + np.array(u) - 1)
+        decisions = lambda k: [(0, 0), (1, 1), (2, 2)]
+        # the states with a component 2 have no decision inside of the bounds
+        bounds = lambda k, x: ((0, 0), (1, 1)) if max(x) < 2 else ((1, 1), (0, 0))
+
+        F, policy = solve(lambda k: grid.states(), 1, lambda x: 0, decisions, None, transition,
+            lambda k, x, u: float(sum(u)), inf=100, interpolationGrid=lambda k: grid, decisionBounds=bounds)
+
+        self.assertEqual(F[0, (2, 0)], 100)
+        self.assertIsNone(policy[0, (2, 0)])
+        self.assertEqual(F[0, (1, 1)], 0)
+        self.assertEqual(policy[0, (0, 0)], (1, 1))
+
+    def test_stochastic_interpolation_workers_equal_sequential(self):
+        p = StochasticInventoryProblem()
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision, p.realizableRandomValues,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost)
+        FNearest, _ = solveStochastic(*arguments, inf=p.inf)
+        FSequential, policySequential = solveStochastic(*arguments, inf=p.inf, interpolationGrid=p.stateGrid)
+        FParallel, policyParallel = solveStochastic(*arguments, inf=p.inf, workers=2, interpolationGrid=p.stateGrid,
+            store=ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf))
+
+        self.assertDictEqual(FNearest, FSequential)
+        self.assertDictEqual(FSequential, dict(FParallel))
+        self.assertDictEqual(policySequential, dict(policyParallel))
+
+    def test_workers_equal_sequential(self):
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        FParallel, policyParallel = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, workers=2)
+
+        self.assertDictEqual(FScalar, FParallel)
+        self.assertDictEqual(policyScalar, policyParallel)
+
+    def test_stochastic_workers_equal_sequential(self):
+        p = StochasticInventoryProblem()
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision, p.realizableRandomValues,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost)
+        FSequential, policySequential = solveStochastic(*arguments, inf=p.inf)
+        FParallel, policyParallel = solveStochastic(*arguments, inf=p.inf, workers=2,
+            store=ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf))
+
+        self.assertDictEqual(FSequential, dict(FParallel))
+        self.assertDictEqual(policySequential, dict(policyParallel))
+    
+    def test_stochastic_monotone_equal_full_scan(self):
+        p = StochasticInventoryProblem()
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision, p.realizableRandomValues,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost)
+        FFull, policyFull = solveStochastic(*arguments, inf=p.inf)
+
+        for workers in [1, 2]:
+            F, policy = solveStochastic(*arguments, inf=p.inf, monotone='decreasing', workers=workers,
+                store=ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf))
+            self.assertEqual(FFull.keys(), dict(F).keys())
+            for key in FFull:
+                self.assertAlmostEqual(FFull[key], F[key])
+            self.assertDictEqual(policyFull, dict(policy))
+
+    def test_stochastic_decision_bounds_equal_full_scan(self):
+        p = StochasticInventoryProblem()
+        calls = list()
+        elementaryCost = lambda k, x, u: calls.append(u) or p.elementaryCost(k, x, u)
+        arguments = (p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision, p.realizableRandomValues,
+            p.solveInfeasibility, p.transitionFunction, elementaryCost)
+        FFull, policyFull = solveStochastic(*arguments, inf=p.inf)
+        fullCalls = len(calls)
+        # keeps the next stock between 0 and 4 for some demand
+        bounds = lambda k, x: (p.demand(k) - 1 - x, 4 + p.demand(k) - x)
+
+        for monotone in [None, 'decreasing']:
+            calls.clear()
+            F, policy = solveStochastic(*arguments, inf=p.inf, monotone=monotone, decisionBounds=bounds)
+            for key in FFull:
+                self.assertAlmostEqual(FFull[key], F[key])
+            self.assertDictEqual(policyFull, policy)
+            self.assertLess(len(calls), fullCalls)
+
+    def test_stochastic_unknown_monotone(self):
+        p = StochasticInventoryProblem()
+        with self.assertRaisesRegex(Exception, "Unknown monotone"):
+            solveStochastic(p.state, p.numberOfStages, p.finalStateCost, p.decision, p.realizableRandomValues,
+                p.solveInfeasibility, p.transitionFunction, p.elementaryCost, monotone='bogus')
+
+    def test_stochastic_workers_require_store(self):
+        p = StochasticInventoryProblem()
+        with self.assertRaisesRegex(Exception, "ValueStore is required"):
+            solveStochastic(p.state, p.numberOfStages, p.finalStateCost, p.decision, p.realizableRandomValues,
+                p.solveInfeasibility, p.transitionFunction, p.elementaryCost, workers=2)
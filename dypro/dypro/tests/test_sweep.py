@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import unittest
+import tempfile
+import numpy as np
+
+from ..sweep import sweep, configurationGrid, readResults
+
+def runInventory(stock, demand):
+    if demand < 0:
+        raise ValueError("negative demand")
+    return {'cost': 2*abs(stock - demand), 'trajectory': np.array([stock, demand])}
+
+def square(x):
+    return x*x
+
+def runWithWorkers(workers):
+    with multiprocessing.get_context().Pool(workers) as pool:
+        return {'cost': sum(pool.map(square, range(4)))}
+
+class SweepTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_configuration_grid(self):
+        configurations = configurationGrid(stock=[0, 1], demand=[2])
+
+        self.assertListEqual(configurations, [{'stock': 0, 'demand': 2}, {'stock': 1, 'demand': 2}])
+
+    def test_sweep_writes_rows(self):
+        rows = sweep(runInventory, configurationGrid(stock=[0, 1, 2], demand=[2]), self.path, workers=2)
+        results = {row['stock']: row for row in readResults(self.path)}
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(results['0']['cost'], '4')
+        self.assertEqual(results['1']['trajectory'], '[1, 2]')
+        self.assertGreater(float(results['2']['duration']), 0)
+        self.assertGreater(int(results['2']['peakMemory']), 0)
+    
+    def test_sweep_skips_done_configurations(self):
+        sweep(runInventory, configurationGrid(stock=[0, 1], demand=[2]), self.path)
+        rows = sweep(runInventory, configurationGrid(stock=[0, 1, 2], demand=[2]), self.path)
+
+        self.assertListEqual([row['stock'] for row in rows], [2])
+        self.assertEqual(len(readResults(self.path)), 3)
+    
+    def test_failed_run_is_not_written(self):
+        failed = list()
+        rows = sweep(runInventory, [{'stock': 0, 'demand': -1}, {'stock': 0, 'demand': 1}], self.path, failed=failed)
+
+        self.assertEqual(len(rows), 1)
+        self.assertListEqual(failed, [({'stock': 0, 'demand': -1}, "ValueError('negative demand')")])
+        self.assertListEqual([row['demand'] for row in readResults(self.path)], ['1'])
+
+    def test_run_starts_its_own_workers(self):
+        failed = list()
+        rows = sweep(runWithWorkers, configurationGrid(workers=[1, 2]), self.path, failed=failed)
+
+        self.assertListEqual(failed, [])
+        self.assertListEqual(sorted(row['cost'] for row in rows), [14, 14])
+
+if __name__ == '__main__':
+    unittest.main()
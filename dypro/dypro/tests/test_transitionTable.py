@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+from ..transitionTable import TransitionTable
+from ..solve import solveTable
+from .test_solve import InventoryProblem, solveScalar
+
+class TransitionTableTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.problem = InventoryProblem()
+        p = self.problem
+        self.table = TransitionTable(p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction)
+
+    def test_next_index(self):
+        # stage 0 has demand 2, stock 1 buying 3 goes to stock 2
+        self.assertEqual(self.table.nextIndex(0)[1, 3], 2)
+        self.assertEqual(self.table.nextIndex(0).dtype, np.int32)
+        self.assertTrue(self.table.infeasibleMask(0)[0, 0])
+    
+    def test_scalar_transition_equal_vectorized(self):
+        p = self.problem
+        table = TransitionTable(p.numberOfStages, p.stateGrid, p.decision, p.transitionFunction, vectorized=False)
+
+        for k in range(p.numberOfStages):
+            np.testing.assert_array_equal(self.table.nextIndex(k), table.nextIndex(k))
+    
+    def test_stage_invariant_share_table(self):
+        p = self.problem
+        table = TransitionTable(p.numberOfStages, p.stateGrid, p.decision, lambda k, x, u: x + u - 1, stageInvariant=True)
+
+        self.assertIs(table.nextIndex(0), table.nextIndex(2))
+        self.assertEqual(table.nbytes(), table.nextIndex(0).nbytes)
+    
+    def test_solve_table_equal_scalar(self):
+        p = self.problem
+        FScalar, policyScalar = solveScalar(p)
+        F, policy = solveTable(self.table, p.finalStateCost, p.elementaryCost, inf=p.inf)
+
+        self.assertDictEqual(FScalar, F)
+        self.assertDictEqual(policyScalar, policy)
+    
+    def test_solve_table_again_with_other_costs(self):
+        p = self.problem
+        F, policy = solveTable(self.table, p.finalStateCost, lambda k, x, u: 0*x + 0*u, inf=p.inf)
+
+        self.assertEqual(F[0, 1], 0)
+        self.assertEqual(F[0, 0], 0)
@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+
+from ..grid import Grid
+from ..valueStore import ValueStore
+from ..solve import solve, solveVectorized
+from .test_solve import InventoryProblem, solveScalar
+
+class ValueStoreTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.store = ValueStore(2, Grid(0, 1, 0.5), inf=100)
+
+    def test_not_computed_states_are_inf(self):
+        self.assertEqual(self.store.value(0, 0.5), 100)
+        self.assertTrue(self.store.infeasibleMask(1).all())
+    
+    def test_view_like_dict(self):
+        FMap = self.store.accOptimalCost()
+        FMap[1, 0.5] = 3
+
+        self.assertEqual(FMap[1, 0.5], 3)
+        self.assertIn((1, 0.5), FMap)
+        self.assertNotIn((1, 0.7), FMap)
+        self.assertNotIn((3, 0.5), FMap)
+        self.assertEqual(len(FMap), 9)
+        with self.assertRaises(KeyError):
+            FMap[1, 0.7]
+    
+    def test_policy_view(self):
+        policy = self.store.allPolicy()
+        policy[0, 1] = (1, 2)
+        policy[0, 0] = None
+
+        self.assertEqual(policy[0, 1], (1, 2))
+        self.assertIsNone(policy[0, 0])
+        self.assertListEqual(self.store.policyIndex(0).tolist(), [-1, -1, 0])
+    
+    def test_solve_with_store_equal_dict(self):
+        p = InventoryProblem()
+        FScalar, policyScalar = solveScalar(p)
+        store = ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf)
+        F, policy = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, store=store)
+
+        self.assertDictEqual(FScalar, dict(F))
+        self.assertDictEqual(policyScalar, dict(policy))
+    
+    def test_solveVectorized_with_store_equal_dict(self):
+        p = InventoryProblem()
+        FScalar, policyScalar = solveScalar(p)
+        store = ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf)
+        F, policy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, store=store)
+
+        self.assertDictEqual(FScalar, dict(F))
+        self.assertDictEqual(policyScalar, dict(policy))
+
+    def test_rolling_store_keeps_two_stages(self):
+        p = InventoryProblem()
+        store = ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf, dtype=np.float32, rolling=True, compactPolicy=True)
+        FScalar, policyScalar = solveScalar(p)
+        F, policy = solveVectorized(p.stateGrid, p.numberOfStages, p.finalStateCost, p.decision,
+            p.transitionFunction, p.elementaryCost, inf=p.inf, store=store)
+
+        self.assertTrue(store.hasValues(0) and store.hasValues(1))
+        self.assertFalse(store.hasValues(2) or store.hasValues(3))
+        self.assertNotIn((3, 1), F)
+        self.assertEqual(F[0, 1], FScalar[0, 1])
+        self.assertDictEqual(policyScalar, dict(policy))
+    
+    def test_rolling_store_with_scalar_solve(self):
+        p = InventoryProblem()
+        store = ValueStore(p.numberOfStages, p.stateGrid, inf=p.inf, rolling=True)
+        FScalar, policyScalar = solveScalar(p)
+        F, policy = solve(p.state, p.numberOfStages, lambda x: float(p.finalStateCost(x)), p.decision,
+            p.solveInfeasibility, p.transitionFunction, p.elementaryCost, inf=p.inf, store=store)
+
+        self.assertEqual(F[0, 2], FScalar[0, 2])
+        self.assertDictEqual(policyScalar, dict(policy))
+    
+    def test_compact_policy(self):
+        store = ValueStore(1, Grid(0, 2, 1), compactPolicy=True)
+        store.setPolicy(0, [1, -1, 0], [(0, 1), (1, 1)])
+
+        self.assertEqual(store.policyIndex(0).dtype, np.uint16)
+        self.assertListEqual([(1, 1), None, (0, 1)], [store.policy(0, x) for x in (0, 1, 2)])
+    
+    def test_compact_policy_grows_dtype(self):
+        store = ValueStore(1, Grid(0, 1, 1), compactPolicy=True)
+        policy = store.allPolicy()
+        policy[0, 0] = None
+        for u in range(70000):
+            policy[0, 1] = u
+
+        self.assertEqual(store.policyIndex(0).dtype, np.uint32)
+        self.assertIsNone(policy[0, 0])
+        self.assertEqual(policy[0, 1], 69999)
@@ -0,0 +1,100 @@
+import numpy as np
+
+from .grid import Grid
+
+INFEASIBLE = -1
+
+class TransitionTable:
+    """
+    Index of the next state on stateGrid(k+1) of each (k, state index, decision index), compiled once
+    from the transition function and kept as int32 arrays. Infeasible transitions are -1.
+    It does not depend on the costs, so a problem can be solved again with other costs by solve.solveTable
+    """
+
+    def __init__(self, numberOfStages:int, stateGrid, decision, transitionFunction, stageInvariant:bool=False,
+                    vectorized:bool=True, chunkSize:int=2**22):
+        """
+        Args:
+            numberOfStages (int): number of stages
+            stateGrid (Grid or function of k): grid of states of each stage
+            decision (function of k): returns all possible decisions for each stage
+            transitionFunction (function of (k, states, decisions)): returns the next states, with the 
+                shapes used by solve.solveVectorized, or of a single pair if vectorized is False
+            stageInvariant (bool, optional): if the grid, decisions and transition are equal on all stages,
+                the table of stage 0 is shared by all of them. Defaults to False.
+            vectorized (bool, optional): if transitionFunction works with arrays. Defaults to True.
+            chunkSize (int, optional): maximum number of pairs evaluated at once. Defaults to 2**22.
+        """
+        self.__numberOfStages = numberOfStages
+        self.__grids = [stateGrid if isinstance(stateGrid, Grid) else stateGrid(k) for k in range(numberOfStages + 1)]
+        self.__decisions = list()
+        self.__nextIndex = list()
+
+        for k in range(numberOfStages):
+            if stageInvariant and k > 0:
+                self.__decisions.append(self.__decisions[0])
+                self.__nextIndex.append(self.__nextIndex[0])
+                continue
+
+            decisions = np.asarray(list(decision(k)))
+            self.__decisions.append(decisions)
+            self.__nextIndex.append(self.__compileStage(k, decisions, transitionFunction, vectorized, chunkSize))
+
+    def __compileStage(self, k:int, decisions:np.array, transitionFunction, vectorized:bool, chunkSize:int) -> np.array:
+        states = self.__grids[k].points()
+        nextGrid = self.__grids[k+1]
+        table = np.empty((len(states), len(decisions)), dtype=np.int32)
+        blockSize = max(1, chunkSize // max(1, len(decisions)))
+
+        for start in range(0, len(states), blockSize):
+            block = slice(start, start + blockSize)
+            X = states[block][:, np.newaxis, ...]
+            U = decisions[np.newaxis, ...]
+
+            if vectorized:
+                nextStates = transitionFunction(k, X, U)
+            else:
+                nextStates = np.array([[transitionFunction(k, self.__toState(x), self.__toState(u)) for u in decisions] 
+                    for x in states[block]], dtype=float)
+
+            index, feasible = nextGrid.snap(np.broadcast_to(nextStates, table[block].shape + np.shape(nextStates)[2:]))
+            table[block] = np.where(feasible, index, INFEASIBLE)
+
+        return table
+
+    @staticmethod
+    def __toState(value):
+        return tuple(value.tolist()) if np.ndim(value) > 0 else value.item()
+
+    def numberOfStages(self) -> int:
+        return self.__numberOfStages
+
+    def grid(self, k:int) -> Grid:
+        """
+        Return the grid of states of stage k
+        """
+        return self.__grids[k]
+
+    def decisions(self, k:int) -> np.array:
+        """
+        Return the decisions of stage k, in the order of the columns of the table
+        """
+        return self.__decisions[k]
+
+    def nextIndex(self, k:int) -> np.array:
+        """
+        Return the int32 array (states, decisions) of the index of the next state on grid(k+1), -1 if infeasible
+        """
+        return self.__nextIndex[k]
+
+    def infeasibleMask(self, k:int) -> np.array:
+        """
+        Return a boolean array (states, decisions) that is True for infeasible transitions
+        """
+        return self.__nextIndex[k] == INFEASIBLE
+
+    def nbytes(self) -> int:
+        """
+        Return the memory used by the tables, shared tables are counted once
+        """
+        return sum(table.nbytes for table in {id(t): t for t in self.__nextIndex}.values())
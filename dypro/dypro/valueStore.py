@@ -0,0 +1,311 @@
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+from .grid import Grid
+
+NO_DECISION = -1
+
+def compactIndexDtype(numberOfDecisions:int):
+    """
+    Return the smallest unsigned dtype that indexes numberOfDecisions and keeps its maximum as NO_DECISION
+    """
+    return np.uint16 if numberOfDecisions < np.iinfo(np.uint16).max else np.uint32
+
+class ValueStore:
+    """
+    Stores the accumulated optimal cost and the policy of each stage in arrays indexed
+    by the flat index of the state on the stage Grid, instead of dicts keyed by (k, state)
+
+    The backward recursion only reads the costs of stage k+1 to solve stage k, so a rolling
+    store keeps only two stages of costs, and a compact policy keeps the index of the
+    decisions as uint16 or uint32. The policy of all stages is kept, so optimalTrajectory
+    still works, and the costs of stage 0 are available at the end of the solve.
+    """
+
+    def __init__(self, numberOfStages:int, stateGrid, inf=np.inf, dtype=np.float64, rolling:bool=False, compactPolicy:bool=False,
+                    source=None):
+        """
+        Args:
+            numberOfStages (int): number of stages
+            stateGrid (Grid or function of k): grid of states of each stage
+            inf (float, optional): value of infeasible states. Defaults to np.inf.
+            dtype (optional): dtype of the stored costs, e.g. np.float32. Defaults to np.float64.
+            rolling (bool, optional): keeps only the costs of the last two stages. Defaults to False.
+            compactPolicy (bool, optional): keeps the policy as uint16 or uint32 arrays. Defaults to False.
+            source (optional): object with stagesWithValues() and load(kind, k) that returns the 'values', 
+                'policy' or 'decisions' of stage k, e.g. a SolutionFile. The arrays of a stage are only 
+                loaded when they are used. Defaults to None.
+        """
+        self.__numberOfStages = numberOfStages
+        self.__inf = inf
+        self.__dtype = dtype
+        self.__rolling = rolling
+        self.__compactPolicy = compactPolicy
+        self.__grids = [stateGrid if isinstance(stateGrid, Grid) else stateGrid(k) for k in range(numberOfStages + 1)]
+        self.__source = source
+        self.__decisionIndex = [dict() for _ in range(numberOfStages)]
+
+        if source is not None:
+            self.__rolling = False
+            self.__slots = [k if k in source.stagesWithValues() else None for k in range(numberOfStages + 1)]
+            self.__values = [None]*(numberOfStages + 1)
+            self.__policy = [None]*numberOfStages
+            self.__decisions = [None]*numberOfStages
+            return
+
+        # stage of the costs kept on each slot, with a slot for each stage if it is not rolling
+        self.__slots = [None, None] if rolling else list(range(numberOfStages + 1))
+        self.__values = [None, None] if rolling else [np.full(grid.size(), inf, dtype=dtype) for grid in self.__grids]
+
+        self.__policy = [self.__emptyPolicy(grid.size(), 0) for grid in self.__grids[:-1]]
+        self.__decisions = [list() for _ in range(numberOfStages)]
+
+    def numberOfStages(self) -> int:
+        return self.__numberOfStages
+
+    def inf(self):
+        return self.__inf
+
+    def isRolling(self) -> bool:
+        return self.__rolling
+
+    def grid(self, k:int) -> Grid:
+        """
+        Return the grid of states of stage k
+        """
+        return self.__grids[k]
+
+    def hasValues(self, k:int) -> bool:
+        """
+        Return False if the costs of stage k were discarded by a rolling store
+        """
+        return 0 <= k <= self.__numberOfStages and self.__slots[self.__slot(k)] == k
+
+    def values(self, k:int) -> np.array:
+        """
+        Return the array of accumulated optimal costs of stage k
+        """
+        if not self.hasValues(k):
+            raise KeyError(f"Costs of stage {k} are not kept by the rolling store")
+        if self.__values[self.__slot(k)] is None:
+            self.__values[k] = self.__source.load('values', k)
+        return self.__values[self.__slot(k)]
+
+    def setValues(self, k:int, values:np.array):
+        self.__claim(k)[:] = values
+
+    def policyIndex(self, k:int) -> np.array:
+        """
+        Return the array with the index of the optimal decision of each state of stage k, noDecision(k) if there is none
+        """
+        if self.__policy[k] is None:
+            self.__policy[k] = self.__source.load('policy', k)
+        return self.__policy[k]
+
+    def noDecision(self, k:int) -> int:
+        """
+        Return the value of policyIndex(k) for states without a feasible decision
+        """
+        dtype = self.policyIndex(k).dtype
+        return np.iinfo(dtype).max if np.issubdtype(dtype, np.unsignedinteger) else NO_DECISION
+
+    def decisions(self, k:int) -> list:
+        """
+        Return the decisions of stage k referenced by policyIndex
+        """
+        if self.__decisions[k] is None:
+            decisions = self.__source.load('decisions', k).tolist()
+            self.__decisions[k] = [tuple(u) if isinstance(u, list) else u for u in decisions]
+        return self.__decisions[k]
+
+    def setPolicy(self, k:int, policyIndex:np.array, decisions):
+        """
+        Args:
+            k (int): stage
+            policyIndex (np.array): index of the optimal decision of each state, -1 if there is none
+            decisions: decisions of the stage, as a list or an array with one decision per row
+        """
+        decisions = decisions.tolist() if isinstance(decisions, np.ndarray) else list(decisions)
+        self.__decisions[k] = [tuple(u) if isinstance(u, list) else u for u in decisions]
+        self.__decisionIndex[k] = dict()
+
+        policyIndex = np.asarray(policyIndex)
+        self.__policy[k] = self.__emptyPolicy(len(policyIndex), len(decisions))
+        self.__policy[k][:] = np.where(policyIndex < 0, self.noDecision(k), policyIndex)
+
+    def infeasibleMask(self, k:int) -> np.array:
+        """
+        Return a boolean array that is True for the states of stage k without a feasible solution
+        """
+        return self.values(k) >= self.__inf
+
+    def value(self, k:int, state) -> float:
+        """
+        Return the accumulated optimal cost of a state, inf if it is not on the grid
+        """
+        i = self.__grids[k].index(state)
+        return self.__inf if i < 0 else self.values(k)[i].item()
+
+    def policy(self, k:int, state):
+        """
+        Return the optimal decision of a state, None if there is none
+        """
+        i = self.__index(k, state)
+        u = self.policyIndex(k)[i]
+        return None if u == self.noDecision(k) else self.decisions(k)[u]
+
+    def setValue(self, k:int, state, value:float):
+        i = self.__index(k, state)
+        values = self.values(k) if self.hasValues(k) else self.__claim(k)
+        values[i] = value
+
+    def setDecision(self, k:int, state, decision):
+        i = self.__index(k, state)
+        if decision is None:
+            self.__policy[k][i] = self.noDecision(k)
+            return
+
+        decisionIndex = self.__decisionIndex[k]
+        if len(decisionIndex) != len(self.__decisions[k]):
+            decisionIndex.update((u, j) for (j, u) in enumerate(self.__decisions[k]))
+        if decision not in decisionIndex:
+            decisionIndex[decision] = len(self.__decisions[k])
+            self.__decisions[k].append(decision)
+            self.__growPolicy(k)
+
+        self.__policy[k][i] = decisionIndex[decision]
+
+    def accOptimalCost(self) -> "FMapView":
+        """
+        Returns a dict-like view of the accumulated optimal cost keyed by (k, state)
+        """
+        return FMapView(self)
+
+    def allPolicy(self) -> "PolicyView":
+        """
+        Returns a dict-like view of the policy keyed by (k, state)
+        """
+        return PolicyView(self)
+
+    def nbytes(self) -> int:
+        """
+        Return the memory used by the arrays of the store that are loaded
+        """
+        return sum(v.nbytes for v in self.__values if v is not None) + sum(p.nbytes for p in self.__policy if p is not None)
+
+    def __slot(self, k:int) -> int:
+        return k % 2 if self.__rolling else k
+
+    def __claim(self, k:int) -> np.array:
+        """
+        Return the array of costs of stage k, reusing the slot of stage k+2 on a rolling store
+        """
+        slot = self.__slot(k)
+        if self.__slots[slot] != k:
+            self.__slots[slot] = k
+            self.__values[slot] = np.full(self.__grids[k].size(), self.__inf, dtype=self.__dtype)
+        return self.__values[slot]
+
+    def __emptyPolicy(self, size:int, numberOfDecisions:int) -> np.array:
+        dtype = compactIndexDtype(numberOfDecisions) if self.__compactPolicy else np.int64
+        return np.full(size, np.iinfo(dtype).max if self.__compactPolicy else NO_DECISION, dtype=dtype)
+
+    def __growPolicy(self, k:int):
+        """
+        Changes the dtype of a compact policy when the decisions of stage k do not fit on it anymore
+        """
+        dtype = compactIndexDtype(len(self.__decisions[k])) if self.__compactPolicy else np.int64
+        if dtype != self.__policy[k].dtype:
+            oldNoDecision = self.noDecision(k)
+            policy = self.__policy[k].astype(dtype)
+            self.__policy[k] = policy
+            policy[policy == oldNoDecision] = self.noDecision(k)
+
+    def __index(self, k:int, state) -> int:
+        if k < 0 or k >= len(self.__grids):
+            raise KeyError((k, state))
+
+        i = self.__grids[k].index(state)
+        if i < 0:
+            raise KeyError((k, state))
+        return i
+
+
+class FMapView(MutableMapping):
+    """
+    View of a ValueStore with the same interface of the FMap dict used by the solvers
+    """
+
+    def __init__(self, store:ValueStore):
+        self._store = store
+
+    def _stages(self):
+        return [k for k in range(self._store.numberOfStages() + 1) if self._store.hasValues(k)]
+
+    def __getitem__(self, key):
+        k, state = key
+        if not self._store.hasValues(k):
+            raise KeyError(key)
+
+        i = self._store.grid(k).index(state)
+        if i < 0:
+            raise KeyError(key)
+        return self._store.values(k)[i].item()
+
+    def __setitem__(self, key, value):
+        self._store.setValue(key[0], key[1], value)
+
+    def __delitem__(self, key):
+        raise TypeError("States of a ValueStore can not be removed")
+
+    def __iter__(self):
+        for k in self._stages():
+            for state in self._store.grid(k).states():
+                yield (k, state)
+
+    def __len__(self):
+        return sum(self._store.grid(k).size() for k in self._stages())
+
+
+class PolicyView(FMapView):
+    """
+    View of a ValueStore with the same interface of the policy dict used by the solvers
+    """
+
+    def _stages(self):
+        return range(self._store.numberOfStages())
+
+    def __getitem__(self, key):
+        k, state = key
+        if not 0 <= k < self._store.numberOfStages():
+            raise KeyError(key)
+        return self._store.policy(k, state)
+
+    def __setitem__(self, key, value):
+        self._store.setDecision(key[0], key[1], value)
+
+
+class StageView(Mapping):
+    """
+    Read only view of the costs of a single stage, keyed by (k, state) like the FMap dict.
+    It is used by workers that receive only the array of the stage they need
+    """
+
+    def __init__(self, k:int, grid:Grid, values:np.array):
+        self._k = k
+        self._grid = grid
+        self._values = values
+
+    def __getitem__(self, key):
+        k, state = key
+        i = self._grid.index(state) if k == self._k else -1
+        if i < 0:
+            raise KeyError(key)
+        return self._values[i].item()
+
+    def __iter__(self):
+        for state in self._grid.states():
+            yield (self._k, state)
+
+    def __len__(self):
+        return self._grid.size()
@@ -0,0 +1,171 @@
+from dypro.dypro.discreteDynamicProgramming import DiscreteDynamicProgramming
+from dypro.dypro.hydroelectricCascade import HydroelectricCascade
+
+from dypro.dypro.utils import sampling, secondsOfMonth
+from dypro.dypro.solve import solveVectorized, optimalTrajectory
+from dypro.dypro.reachability import reachableIndexes
+from dypro.dypro.valueStore import ValueStore
+from dypro.dypro.randomVariable import RandomVariable
+from dypro.dypro.sddp import SDDP
+from dypro.dypro.fittedValue import FittedValue
+
+from twoHydroelectricProductionProblem import HydroelectricAguaVermelha, HydroelectricIlhaSolteira
+
+import numpy as np
+
+from time import time
+
+class HydroelectricCascadeProblem(DiscreteDynamicProgramming):
+    """
+    Água Vermelha and Ilha Solteira on the Paraná river, the release of Água Vermelha flows into Ilha Solteira.
+    Each stage is solved for all the volumes and flows of both plants at once.
+    """
+    def __init__(self, numberOfStages:int=12, year:int=2021, maxFlow=(5000, 10000), stateSampling=(100, 100),
+                    decisionSampling=(100, 200), inf=np.inf):
+        DiscreteDynamicProgramming.__init__(self, numberOfStages=numberOfStages, inf=inf)
+
+        aguaVermelha, ilhaSolteira = (HydroelectricAguaVermelha(), HydroelectricIlhaSolteira())
+        # the average flow of Ilha Solteira includes the release of Água Vermelha
+        incrementalInflow = lambda k: (aguaVermelha.monthlyAvgFlow(k), ilhaSolteira.monthlyAvgFlow(k) - aguaVermelha.monthlyAvgFlow(k))
+
+        self.__cascade = HydroelectricCascade([aguaVermelha, ilhaSolteira], [1, None], incrementalInflow,
+            lambda k: secondsOfMonth(year, k))
+        self.__maxFlow = maxFlow
+        self.__stateSampling = stateSampling
+        self.__decisionSampling = decisionSampling
+
+    def cascade(self) -> HydroelectricCascade:
+        return self.__cascade
+
+    def monthlyPowerDemand(self, month:int) -> float:
+        """Returns the expected demand of each month"""
+
+        monthlyPowerDemandMap = {
+            0: 3600,
+            1: 3300,
+            2: 3000,
+            3: 3200,
+            4: 3400,
+            5: 3600,
+            6: 3700,
+            7: 3300,
+            8: 3400,
+            9: 3600,
+            10: 3900,
+            11: 4000
+            }
+
+        if (month in monthlyPowerDemandMap):
+            return monthlyPowerDemandMap.get(month)
+        else:
+            raise KeyError(f"dont exist month {month}")
+
+    def thermalProductionCost(self, energy) -> float:
+        return 64.8 * energy*energy*1e-6
+
+    # ---------------------------------------------------------------------------------------------------------------
+
+    def state(self, k:int) -> np.array:
+        return self.stateGrid(k).states()
+
+    def decision(self, k:int) -> np.array:
+        flows = [list(sampling(self.__cascade.plant(i).minTurbineFlow(), self.__maxFlow[i], self.__decisionSampling[i]))
+                 for i in range(self.__cascade.numberOfPlants())]
+
+        return [(a, b) for a in flows[0] for b in flows[1]]
+
+    def elementaryCostBatch(self, k:int, state:np.array, decision:np.array) -> np.array:
+        deficit = self.monthlyPowerDemand(k) - self.__cascade.generatedEnergy(state, decision)
+
+        return np.where(deficit > 0, self.thermalProductionCost(deficit), 0)
+
+    def elementaryCost(self, k:int, state:np.array, decision:np.array) -> float:
+        return float(self.elementaryCostBatch(k, np.asarray(state), np.asarray(decision)))
+
+    def finalStateCostBatch(self, state:np.array) -> np.array:
+        return np.where((state[..., 0] < 8000) | (state[..., 1] < 15000), self.inf, 0)
+
+    def finalStateCost(self, state:np.array) -> float:
+        return float(self.finalStateCostBatch(np.asarray(state)))
+
+    def transitionBatch(self, k:int, state:np.array, decision:np.array) -> np.array:
+        return self.__cascade.nextVolumes(k, state, decision)
+
+    def transitionFunction(self, k:int, state:np.array, decision:np.array) -> np.array:
+        return tuple(self.transitionBatch(k, np.asarray(state), np.asarray(decision)).tolist())
+
+    def decisionBounds(self, k:int, state:np.array) -> tuple:
+        return self.__cascade.releaseBounds(k, state)
+
+    def stateGrid(self, k:int):
+        return self.__cascade.stateGrid(self.__stateSampling)
+
+    def initialState(self) -> np.array:
+        return (8000, 15000)
+
+    def valueStore(self) -> ValueStore:
+        return ValueStore(self.numberOfStages, self.stateGrid, inf=self.inf)
+
+    def solve(self, store=None, interpolate=False, reachable=False):
+        """
+        With reachable, only the volumes that can be reached from the initial state are solved
+        """
+        return solveVectorized(self.stateGrid, self.numberOfStages, self.finalStateCostBatch, self.decision,
+            self.transitionBatch, self.elementaryCostBatch, inf=self.inf, store=store, interpolate=interpolate,
+            reachable=self.reachableIndexes(interpolate) if reachable else None, decisionBounds=self.decisionBounds)
+
+    def reachableIndexes(self, interpolate=False) -> list:
+        """
+        Flat indexes on stateGrid(k) of the pairs of volumes of each stage that can be reached from the initial state
+        """
+        return reachableIndexes(self.initialState(), self.numberOfStages, self.stateGrid, self.decision,
+            self.transitionBatch, vectorized=True, interpolate=interpolate)
+
+    def sddp(self, inflows=None, **options) -> SDDP:
+        """
+        Returns the SDDP of the cascade, whose volumes are not sampled on a grid. inflows is a function of k that
+        returns the RandomVariable of the incremental inflows of both plants, defaults to the average inflows.
+        The options are passed to SDDP, e.g. seed
+        """
+        if inflows is None:
+            inflows = lambda k: RandomVariable([tuple(self.__cascade.incrementalInflow(k).tolist())], [1])
+
+        return SDDP(self.__cascade, self.numberOfStages, inflows, self.monthlyPowerDemand, self.thermalProductionCost,
+            self.initialState(), maxFlows=self.__maxFlow, **options)
+
+    def fittedValue(self, **options) -> FittedValue:
+        """
+        Returns the FittedValue of the cascade, that samples the volumes inside of the bounds of the grid instead of
+        solving all of them. The options are passed to FittedValue, e.g. samples, basis and seed
+        """
+        bounds = lambda k: tuple(tuple(b.tolist()) for b in (self.stateGrid(k).min(), self.stateGrid(k).max()))
+
+        return FittedValue(bounds, self.numberOfStages, self.finalStateCostBatch, self.decision, self.transitionBatch,
+            self.elementaryCostBatch, inf=self.inf, decisionBounds=self.decisionBounds, **options)
+
+    def nearestVolume(self, state):
+        grid = self.stateGrid(0)
+        return grid.state(grid.snap(state)[0].item())
+
+    def optimalTrajectoryHidro(self, policy, initialState):
+        transitionWithNearest = lambda k, state, decision: self.nearestVolume(self.transitionFunction(k, state, decision))
+
+        return optimalTrajectory(self.nearestVolume(initialState), self.numberOfStages, policy, transitionWithNearest)
+
+    def costOfSolution(self, initialState, FMap):
+        return (self.nearestVolume(initialState), FMap[0, self.nearestVolume(initialState)])
+
+if __name__ == "__main__":
+    h = HydroelectricCascadeProblem(inf=1000000)
+
+    start = time()
+    Fmap, policy = h.solve(store=h.valueStore())
+    print(f"Solved in {time() - start:.1f} sec")
+
+    nearestInitial, cost = h.costOfSolution(h.initialState(), Fmap)
+    print(f"initialVolume: {nearestInitial}\nCost: {cost} M de reais\n")
+
+    u_optimal, policy_optimal = h.optimalTrajectoryHidro(policy, nearestInitial)
+
+    print(f"u_optimal: {u_optimal}")
+    print(f"policy_optimal: {policy_optimal}")
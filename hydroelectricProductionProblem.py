@@ -2,13 +2,21 @@ from dypro.dypro.discreteDynamicProgramming import DiscreteDynamicProgramming
 from dypro.dypro.hydroelectricProduction import HydroelectricProduction
 
 from dypro.dypro.utils import limit, sampling, secondsOfMonth, nearestSample
-from dypro.dypro.solve import solve, optimalTrajectory
+from dypro.dypro.solve import solve, solveVectorized, solveTable, optimalTrajectory
+from dypro.dypro.reachability import reachableIndexes, reachableStates
+from dypro.dypro.transitionTable import TransitionTable
+from dypro.dypro.grid import Grid
+from dypro.dypro.valueStore import ValueStore
+from dypro.dypro.solutionCache import SolutionCache, fingerprint
+from dypro.dypro.corridor import solveCorridor
+from dypro.dypro.sweep import sweep, configurationGrid
 
 import numpy as np
 
 from time import time
 
 import concurrent.futures
+import os
 
 class HydroelectricProductionProblem(DiscreteDynamicProgramming, HydroelectricProduction):
     def __init__(self, numberOfStages:int, year:int, maxFlow, stateSampling=100, decisionSampling=100, inf=np.inf):
@@ -16,8 +24,8 @@ class HydroelectricProductionProblem(DiscreteDynamicProgramming, HydroelectricPr
 
         HydroelectricProduction.__init__(self, efficiency=0.88, gravity=10, minReservatoryVolume=12800,
             maxReservatoryVolume=21200, minTurbineFlow=1400, maxTurbineFlow=7955, maxProductionCapacity=3230,
-            uprightPolinomy=lambda x: (303.04+(0.0015519*x) - (0.17377e-7)*(x**2)),
-            downstreamPolinomy=lambda x: (279.84 +(0.22130e-3)*x))
+            uprightPolinomy=(303.04, 0.0015519, -0.17377e-7),
+            downstreamPolinomy=(279.84, 0.22130e-3))
 
         self.__maxFlow = maxFlow
         self.__year = year
@@ -94,6 +102,14 @@ class HydroelectricProductionProblem(DiscreteDynamicProgramming, HydroelectricPr
         
         return cost
 
+    def elementaryCostBatch(self, k:int, state:np.array, decision:np.array) -> np.array:
+        demand = self.monthlyPowerDemand(k)
+        generatedEnergy = self.generatedEnergyBatch(state, decision)
+
+        return np.where((generatedEnergy >= demand) & (generatedEnergy < self.maxProductionCapacity()), 0,
+            np.where(generatedEnergy > self.maxProductionCapacity(), self.thermalProductionCost(demand - self.maxProductionCapacity()),
+                self.thermalProductionCost(demand - generatedEnergy)))
+
     def finalStateCost(self, state:np.array) -> float:
         if state<15000:
             cost = self.inf
@@ -102,9 +118,19 @@ class HydroelectricProductionProblem(DiscreteDynamicProgramming, HydroelectricPr
 
         return cost
 
+    def finalStateCostBatch(self, state:np.array) -> np.array:
+        return np.where(state<15000, self.inf, 0)
+
     def transitionFunction(self, k:int, state:np.array, decision:np.array) -> np.array:
         return state + (self.monthlyAvgFlow(k) - decision)*secondsOfMonth(self.__year, k)*1e-6
+
+    def transitionBatch(self, k:int, state:np.array, decision:np.array) -> np.array:
+        # transitionFunction only uses arithmetic, so it already works with arrays
+        return self.transitionFunction(k, state, decision)
     
+    def decisionBounds(self, k:int, state:np.array) -> tuple:
+        return self.turbinedFlowBounds(state, self.monthlyAvgFlow(k), secondsOfMonth(self.__year, k))
+
     def solveInfeasibility(self, k:int, state:np.array, FMap:dict):
         if state<self.minReservatoryVolume() or state>self.maxReservatoryVolume():
             return (limit(state, self.minReservatoryVolume(), self.maxReservatoryVolume()), self.inf)
@@ -113,12 +139,80 @@ class HydroelectricProductionProblem(DiscreteDynamicProgramming, HydroelectricPr
             sampledState = nearestSample(state, self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
             return (sampledState, FMap[(k, sampledState)])
 
+    def stateGrid(self, k:int) -> Grid:
+        return Grid(self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
+
     def initialState(self) -> np.array:
         return 15000
     
-    def solve(self):
+    def valueStore(self, lowMemory=False) -> ValueStore:
+        if lowMemory:
+            return ValueStore(self.numberOfStages, self.stateGrid, inf=self.inf, dtype=np.float32, rolling=True, compactPolicy=True)
+        return ValueStore(self.numberOfStages, self.stateGrid, inf=self.inf)
+
+    def solve(self, store=None, workers=1, interpolate=False, monotone=False, reachable=False):
+        """
+        With interpolate, the cost of the next volumes is interpolated between the samples instead of using the nearest one.
+        With monotone, the turbined flow is assumed to increase with the volume, so each volume only scans the flows
+        between the ones of its neighbors. The policy on the grid is not exactly monotone, so it is an approximation.
+        With reachable, only the volumes that can be reached from the initial state are solved.
+        """
         return solve(self.state, self.numberOfStages, self.finalStateCost, self.decision, self.solveInfeasibility,
-        self.transitionFunction, self.elementaryCost, inf=self.inf)
+        self.transitionFunction, self.elementaryCost, inf=self.inf, store=store, workers=workers,
+        interpolationGrid=self.stateGrid if interpolate else None, monotone='increasing' if monotone else None,
+        reachable=reachableStates(self.initialState(), self.numberOfStages, self.stateGrid, self.decision,
+        self.transitionBatch, vectorized=True, interpolate=interpolate) if reachable else None,
+        decisionBounds=self.decisionBounds, **self.batchCallbacks())
+    
+    def solveVectorized(self, store=None, interpolate=False, reachable=False):
+        return solveVectorized(self.stateGrid, self.numberOfStages, self.finalStateCostBatch, self.decision,
+        self.transitionBatch, self.elementaryCostBatch, inf=self.inf, store=store, interpolate=interpolate,
+        reachable=self.reachableIndexes(interpolate) if reachable else None, decisionBounds=self.decisionBounds)
+
+    def reachableIndexes(self, interpolate=False) -> list:
+        """
+        Flat indexes on stateGrid(k) of the volumes of each stage that can be reached from the initial state
+        """
+        return reachableIndexes(self.initialState(), self.numberOfStages, self.stateGrid, self.decision,
+        self.transitionBatch, vectorized=True, interpolate=interpolate)
+
+    def solveCorridor(self, periods:list=None, corridorWidth=5, tolerance=1e-6):
+        """
+        Solves with a coarse-to-fine corridor around the optimal trajectory, refining until the step of stateSampling.
+        Returns (FMap, policy, history) of solveCorridor.
+        """
+        periods = [16*self.__stateSampling, 4*self.__stateSampling, self.__stateSampling] if periods is None else periods
+
+        return solveCorridor(self.numberOfStages, self.minReservatoryVolume(), self.maxReservatoryVolume(), periods, self.initialState(),
+            self.finalStateCostBatch, self.decision, self.transitionFunction, self.elementaryCostBatch, corridorWidth=corridorWidth,
+            tolerance=tolerance, vectorized=True, inf=self.inf)
+
+    def fingerprint(self, **solverOptions) -> str:
+        return fingerprint(type(self), self.parameters(), numberOfStages=self.numberOfStages, year=self.__year, 
+            maxFlow=self.__maxFlow, stateSampling=self.__stateSampling, decisionSampling=self.__decisionSampling, inf=self.inf,
+            monthlyAvgFlow=[self.monthlyAvgFlow(k) for k in range(self.numberOfStages)], 
+            monthlyPowerDemand=[self.monthlyPowerDemand(k) for k in range(self.numberOfStages)],
+            finalState=self.finalStateCostBatch(self.stateGrid(self.numberOfStages).points()), **solverOptions)
+    
+    def solveCached(self, cache:SolutionCache, lowMemory=False):
+        """
+        Returns the solution of the cache, solving it with solveVectorized if it is not there
+        """
+        def solveStore():
+            store = self.valueStore(lowMemory)
+            self.solveVectorized(store=store)
+            return store
+
+        store = cache.solve(self.fingerprint(solver='vectorized', lowMemory=lowMemory), solveStore)
+        return (store.accOptimalCost(), store.allPolicy())
+
+    def transitionTable(self) -> TransitionTable:
+        return TransitionTable(self.numberOfStages, self.stateGrid, self.decision, self.transitionFunction)
+    
+    def solveTable(self, table=None, store=None):
+        table = self.transitionTable() if table is None else table
+
+        return solveTable(table, self.finalStateCostBatch, self.elementaryCostBatch, inf=self.inf, store=store)
     
     def optimalTrajectoryHidro(self, policy, initialState):
         nearestVolume = lambda vol: nearestSample(vol, self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
@@ -156,12 +250,25 @@ def run(pairOfSamplings):
     print(f"duration: {time() - start} \nsampling: state:{_stateSampling} x decision: {_decisionSampling}\n\n")
     print("-------------------------------------------")
 
+def runConfiguration(stateSampling, decisionSampling):
+    """
+    Run of the sampling sweep, returns the cost and the optimal trajectory of the initial volume
+    """
+    hidro = HydroelectricProductionProblem(numberOfStages=12, year=2021, maxFlow=10000, 
+                stateSampling=stateSampling, decisionSampling=decisionSampling, inf=10000)
+
+    fmap, policy = hidro.solveVectorized()
+    nearestInitial, cost = hidro.costOfSolution(hidro.initialState(), fmap)
+    u_optimal, policy_optimal = hidro.optimalTrajectoryHidro(policy, hidro.initialState())
+
+    return {'initialVolume': nearestInitial, 'cost': cost, 'u_optimal': u_optimal, 'policy_optimal': policy_optimal}
+
 if __name__ == '__main__':
     
-    # samplings = [10, 100, 200, 400, 500, 750, 1000, 2000, 5000]
-    # samplingPairs = [(a, b) for a in samplings for b in samplings]
-
-    # with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+    # runs the configurations that are not on the results file yet, on all cores
+    samplings = [10, 100, 200, 400, 500, 750, 1000, 2000, 5000]
+    rows = sweep(runConfiguration, configurationGrid(stateSampling=samplings, decisionSampling=samplings),
+        'hydroelectricProductionProblem.csv', workers=os.cpu_count())
 
-    #     executor.map(run, samplingPairs)
-    run((100, 100))
\ No newline at end of file
+    for row in rows:
+        print(f"sampling: state:{row['stateSampling']} x decision: {row['decisionSampling']} Cost: {row['cost']} M de reais duration: {row['duration']}")
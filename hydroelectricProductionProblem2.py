@@ -1,5 +1,9 @@
 from dypro.dypro.utils import limit, sampling, secondsOfMonth, nearestSample
 from dypro.dypro.solve import solve, optimalTrajectory
+from dypro.dypro.corridor import solveCorridor
+from dypro.dypro.reachability import reachableStates
+from dypro.dypro.grid import Grid
+from dypro.dypro.productSpace import ProductSpace
 import numpy as np
 import logging
 from time import time
@@ -65,6 +69,12 @@ class HydroelectricAguaVermelha:
 
         return _generatedEnergy
     
+    def minReservatoryVolume(self) -> float:
+        return self.__minReservatoryVolume
+
+    def maxReservatoryVolume(self) -> float:
+        return self.__maxReservatoryVolume
+
     def state(self, k:int) -> np.array:
         return sampling(self.__minReservatoryVolume, self.__maxReservatoryVolume, self.__stateSampling)
     
@@ -153,6 +163,12 @@ class HydroelectricIlhaSolteira:
 
         return _generatedEnergy
     
+    def minReservatoryVolume(self) -> float:
+        return self.__minReservatoryVolume
+
+    def maxReservatoryVolume(self) -> float:
+        return self.__maxReservatoryVolume
+
     def state(self, k:int) -> np.array:
         return sampling(self.__minReservatoryVolume, self.__maxReservatoryVolume, self.__stateSampling)
     
@@ -192,6 +208,9 @@ class HydroelectricProductionProblem2:
         self.__numberOfStages = 12
         self.__inf = inf
         self.__year = 2021
+        # the volumes and flows are the same on all stages, so the spaces are built once
+        self.__states = ProductSpace(self.__aguaVermelha.state(0), self.__ilhaSolteira.state(0))
+        self.__decisions = ProductSpace(self.__aguaVermelha.decision(0), self.__ilhaSolteira.decision(0))
     
     def inf(self):
         return self.__inf
@@ -234,17 +253,11 @@ class HydroelectricProductionProblem2:
     
     # ---------------------------------------------------------------------------------------------------------------    
 
-    def state(self, k:int) -> np.array:
-        samples_agua_vermelha = list(self.__aguaVermelha.state(k))
-        samples_ilha_solteira = list(self.__ilhaSolteira.state(k))
+    def state(self, k:int) -> ProductSpace:
+        return self.__states
 
-        return [(a, b) for a in samples_agua_vermelha for b in samples_ilha_solteira]
-
-    def decision(self, k:int) -> np.array:
-        samples_agua_vermelha = list(self.__aguaVermelha.decision(k))
-        samples_ilha_solteira = list(self.__ilhaSolteira.decision(k))
-
-        return [(a, b) for a in samples_agua_vermelha for b in samples_ilha_solteira]
+    def decision(self, k:int) -> ProductSpace:
+        return self.__decisions
 
     def elementaryCost(self, k:int, state:np.array, decision:np.array) -> float:
         demand = self.monthlyPowerDemand(k)
@@ -272,6 +285,19 @@ class HydroelectricProductionProblem2:
 
         return (aguaVermelhaState, ilhaSolteiraState)
     
+    def decisionBounds(self, k:int, state:np.array) -> tuple:
+        """
+        Turbined flows of each plant that keep its next volume between its min and max volumes, widened by 1e-6 m^3/s
+        for the rounding of the transition
+        """
+        flowOfVolume = 1e6/secondsOfMonth(self.__year, k)
+        plants = (self.__aguaVermelha, self.__ilhaSolteira)
+
+        low = [plant.monthlyAvgFlow(k) + (volume - plant.maxReservatoryVolume())*flowOfVolume - 1e-6 for (plant, volume) in zip(plants, state)]
+        high = [plant.monthlyAvgFlow(k) + (volume - plant.minReservatoryVolume())*flowOfVolume + 1e-6 for (plant, volume) in zip(plants, state)]
+
+        return (np.array(low), np.array(high))
+
     def solveInfeasibility(self, k:int, state:np.array, FMap:dict):
         aguaVermelhaState, aguaVermelhaWasInfeasible = self.__aguaVermelha.solveInfeasibility(k, state[0])
         ilhaSolteiraState, ilhaSolteiraWasInfeasible = self.__ilhaSolteira.solveInfeasibility(k, state[1])
@@ -282,13 +308,36 @@ class HydroelectricProductionProblem2:
         else:
             return ((aguaVermelhaState, ilhaSolteiraState), FMap[(k, (aguaVermelhaState, ilhaSolteiraState))])
 
+    def stateGrid(self, k:int) -> Grid:
+        minState = (self.__aguaVermelha.minReservatoryVolume(), self.__ilhaSolteira.minReservatoryVolume())
+        maxState = (self.__aguaVermelha.maxReservatoryVolume(), self.__ilhaSolteira.maxReservatoryVolume())
+
+        return Grid(minState, maxState, self.stateSampling)
+
     def initialState(self) -> np.array:
         return (8000, 15000)
     
-    def solveHidro(self):
+    def solveHidro(self, workers=1, interpolate=False, reachable=False):
+        """
+        With interpolate, the cost of the next volumes is interpolated bilinearly between the samples instead of using the nearest one.
+        With reachable, only the pairs of volumes that can be reached from the initial state are solved
+        """
         return solve(self.state, self.__numberOfStages, self.finalStateCost, self.decision, self.solveInfeasibility,
-        self.transitionFunction, self.elementaryCost, inf=self.__inf)
+        self.transitionFunction, self.elementaryCost, inf=self.__inf, workers=workers, 
+        interpolationGrid=self.stateGrid if interpolate else None,
+        reachable=reachableStates(self.initialState(), self.__numberOfStages, self.stateGrid, self.decision,
+        self.transitionFunction, interpolate=interpolate) if reachable else None, decisionBounds=self.decisionBounds)
     
+    def solveCorridor(self, periods:list, corridorWidth=5, tolerance=1e-6):
+        """
+        Solves with a coarse-to-fine corridor around the optimal trajectory, e.g. periods=[(800, 800), (400, 400), (self.stateSampling, self.stateSampling)]
+        """
+        minState = (self.__aguaVermelha.minReservatoryVolume(), self.__ilhaSolteira.minReservatoryVolume())
+        maxState = (self.__aguaVermelha.maxReservatoryVolume(), self.__ilhaSolteira.maxReservatoryVolume())
+
+        return solveCorridor(self.__numberOfStages, minState, maxState, periods, self.initialState(), self.finalStateCost,
+            self.decision, self.transitionFunction, self.elementaryCost, corridorWidth=corridorWidth, tolerance=tolerance, inf=self.__inf)
+
     def optimalTrajectoryHidro(self, policy, initialState):
         transitionWithNearest = lambda k, state, decision: self.nearestVolume(self.transitionFunction(k, state, decision))
 
@@ -6,6 +6,11 @@ from dypro.dypro.stochasticProblem import StochasticProblem
 from dypro.dypro.utils import limit, sampling, secondsOfMonth, nearestSample
 from dypro.dypro.solve import solveStochastic
 from dypro.dypro.randomVariable import RandomVariable
+from dypro.dypro.scenarioReduction import reduceScenarios
+from dypro.dypro.hydroelectricCascade import HydroelectricCascade
+from dypro.dypro.sddp import SDDP
+from dypro.dypro.grid import Grid
+from dypro.dypro.valueStore import ValueStore
 
 import numpy as np
 
@@ -14,7 +19,12 @@ from time import time
 import concurrent.futures
 
 class HydroelectricStochasticProductionProblem(HydroelectricProduction,  StochasticProblem, DiscreteDynamicProgramming):
-    def __init__(self, numberOfStages:int, year:int, maxFlow, stateSampling=100, decisionSampling=100, inf=np.inf):
+    def __init__(self, numberOfStages:int, year:int, maxFlow, stateSampling=100, decisionSampling=100, inf=np.inf,
+                    inflowScenarios=None, numberOfAtoms=None):
+        """
+        inflowScenarios are equiprobable inflows of each month, e.g. historical records, that replace the
+        distributions of 5 inflows. With numberOfAtoms, the inflows of each month are reduced to numberOfAtoms inflows.
+        """
 
         HydroelectricProduction.__init__(self, efficiency=0.88, gravity=10, minReservatoryVolume=12800,
             maxReservatoryVolume=21200, minTurbineFlow=1400, maxTurbineFlow=7955, maxProductionCapacity=3230,
@@ -43,10 +53,25 @@ class HydroelectricStochasticProductionProblem(HydroelectricProduction,  Stochas
             [(2926, 0.1), (3553, 0.2), (4180, 0.4), (4807, 0.2), (5434, 0.1)]
             ]
 
-        self.__realizableRandomValues = {k:RandomVariable([i[0] for i in el], [i[1] for i in el]) for k, el in enumerate(flowDistribution)}
+        if inflowScenarios is None:
+            inflowScenarios = [RandomVariable([i[0] for i in el], [i[1] for i in el]) for el in flowDistribution]
+        else:
+            inflowScenarios = [RandomVariable(list(samples), [1/len(samples)]*len(samples)) for samples in inflowScenarios]
+
+        self.__reductionError = [0.0]*len(inflowScenarios)
+        if numberOfAtoms is not None:
+            inflowScenarios, self.__reductionError = map(list, zip(*(reduceScenarios(w, numberOfAtoms) for w in inflowScenarios)))
+
+        self.__realizableRandomValues = dict(enumerate(inflowScenarios))
     
     def realizableRandomValues(self, k:int) -> RandomVariable:
         return self.__realizableRandomValues[k]
+
+    def reductionError(self, k:int) -> float:
+        """
+        Return the Wasserstein distance of the reduced inflows of month k to the original ones [m^3/s]
+        """
+        return self.__reductionError[k]
     
     def monthlyPowerDemand(self, month:int) -> float:
         """Returns the expected demand of each month"""
@@ -103,6 +128,15 @@ class HydroelectricStochasticProductionProblem(HydroelectricProduction,  Stochas
     def transitionFunction(self, k:int, state:np.array, decision:np.array, randomValue:np.array) -> np.array:
         return state + (randomValue - decision)*secondsOfMonth(self.__year, k)*1e-6
     
+    def decisionBounds(self, k:int, state:np.array) -> tuple:
+        """
+        Turbined flows that keep the next volume feasible for some inflow of the stage
+        """
+        inflows = self.realizableRandomValues(k).values()
+        low, high = self.turbinedFlowBounds(state, inflows, secondsOfMonth(self.__year, k))
+
+        return (float(np.min(low)), float(np.max(high)))
+
     def solveInfeasibility(self, k:int, state:np.array, FMap:dict):
         if state<self.minReservatoryVolume() or state>self.maxReservatoryVolume():
             return (limit(state, self.minReservatoryVolume(), self.maxReservatoryVolume()), self.inf)
@@ -111,13 +145,39 @@ class HydroelectricStochasticProductionProblem(HydroelectricProduction,  Stochas
             sampledState = nearestSample(state, self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
             return (sampledState, FMap[(k, sampledState)])
 
+    def stateGrid(self, k:int) -> Grid:
+        return Grid(self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
+
     def initialState(self) -> np.array:
         return 15000
+
+    def valueStore(self, lowMemory=False) -> ValueStore:
+        if lowMemory:
+            return ValueStore(self.numberOfStages, self.stateGrid, inf=self.inf, dtype=np.float32, rolling=True, compactPolicy=True)
+        return ValueStore(self.numberOfStages, self.stateGrid, inf=self.inf)
     
-    def solve(self):
+    def solve(self, store=None, workers=1, interpolate=False):
+        """
+        With interpolate, the cost of the next volumes is interpolated between the samples instead of using the nearest one
+        """
+        if workers > 1 and store is None:
+            store = self.valueStore()
+
         return solveStochastic(self.state, self.numberOfStages, self.finalStateCost, self.decision, self.realizableRandomValues, self.solveInfeasibility,
-        self.transitionFunction, self.elementaryCost, inf=self.inf)
+        self.transitionFunction, self.elementaryCost, inf=self.inf, store=store, workers=workers, 
+        interpolationGrid=self.stateGrid if interpolate else None, decisionBounds=self.decisionBounds)
     
+    def sddp(self, **options) -> SDDP:
+        """
+        Returns the SDDP of the reservoir with the same inflows, the linear final cost is its own cut.
+        The options are passed to SDDP, e.g. seed
+        """
+        cascade = HydroelectricCascade([self], [None], lambda k: (0,), lambda k: secondsOfMonth(self.__year, k))
+        finalCut = (self.finalStateCost(0), (self.finalStateCost(1) - self.finalStateCost(0),))
+
+        return SDDP(cascade, self.numberOfStages, self.realizableRandomValues, self.monthlyPowerDemand, self.thermalProductionCost,
+            (self.initialState(),), maxFlows=(self.__maxFlow,), finalCuts=[finalCut], **options)
+
     def costOfSolution(self, initialState, FMap):
         nearestVolume = lambda vol: nearestSample(vol, self.minReservatoryVolume(), self.maxReservatoryVolume(), self.__stateSampling)
 
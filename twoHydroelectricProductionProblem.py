@@ -47,7 +47,7 @@ class HydroelectricIlhaSolteira(HydroelectricProduction):
                          minTurbineFlow=1400,
                          maxTurbineFlow=7955,
                          maxProductionCapacity=1380,
-                         uprightPolinomy=lambda x: 303.04 + (0.0015519*x) - (0.17377e-7)*(x),
+                         uprightPolinomy=lambda x: 303.04 + (0.0015519*x) - (0.17377e-7)*(x**2),
                          downstreamPolinomy=lambda x: 279.84 + (0.22130e-3)*x
                         )
 